@@ -1,4 +1,5 @@
 
+import multiprocessing
 import os
 
 import webview
@@ -6,6 +7,8 @@ from src.gui_main import ProjectFileChecker
 
 
 if __name__ == "__main__":
+    # 打包后的exe启动填写进程时（system.json 的 pipeline.fill_processes 大于1）直接进入工作进程，不再打开界面
+    multiprocessing.freeze_support()
     # 创建API实例
     api = ProjectFileChecker()
 
@@ -1,13 +1,21 @@
 """
 ActiveX控件位置扫描脚本
 扫描Word模板文件，找到所有ActiveX控件的位置，并生成配置文件
+.docx 模板直接解析 document.xml，不需要Word；.doc 模板仍通过Word COM扫描
 """
 import os
-import json
-import win32com.client as win32
 from pathlib import Path
 import sys
 
+from src.funcs.docx_processor import scan_activex_positions_docx
+from src.funcs.template_registry import build_activex_map, get_activex_config_path, save_activex_maps
+
+try:
+    import win32com.client as win32
+except ImportError:
+    # 非Windows环境只能扫描.docx模板
+    win32 = None
+
 def scan_activex_positions(doc_path, template_name):
     """
     扫描Word文档中的ActiveX控件位置
@@ -21,12 +29,32 @@ def scan_activex_positions(doc_path, template_name):
         print(f"文件不存在: {doc_path}")
         return None
     
-    config = {
-        template_name: {
-            "description": f"{template_name}模板ActiveX控件位置配置",
-            "scanned_from": doc_path
-        }
-    }
+    if str(doc_path).lower().endswith('.docx'):
+        try:
+            positions = scan_activex_positions_docx(doc_path)
+        except Exception as e:
+            print(f"扫描过程中出错: {str(e)}")
+            return None
+        for table_key, table_config in positions.items():
+            print(f"{table_key} 共找到 {len(table_config)} 个ActiveX控件")
+    else:
+        positions = scan_activex_positions_com(doc_path)
+        if positions is None:
+            return None
+    # 与启动时自动重新生成使用相同的配置格式（相对路径、模板哈希）
+    return {template_name: build_activex_map(template_name, Path(doc_path), positions)}
+
+def scan_activex_positions_com(doc_path):
+    """
+    通过Word COM逐个单元格扫描ActiveX控件位置（用于.doc模板）
+    :param doc_path: Word文档路径
+    :return: 位置字典 {"table_N": {"行号": {"row": 行号, "column": 列号}}}
+    """
+    if win32 is None:
+        print(f"没有安装pywin32，无法扫描.doc文档: {doc_path}")
+        return None
+    
+    positions = {}
     
     try:
         # 启动Word应用
@@ -42,7 +70,7 @@ def scan_activex_positions(doc_path, template_name):
         for table_index in range(word_doc.Tables.Count):
             table = word_doc.Tables[table_index]
             table_key = f"table_{table_index}"
-            config[template_name][table_key] = {}
+            positions[table_key] = {}
             
             print(f"扫描表格 {table_index}: {table.Rows.Count} 行 x {table.Columns.Count} 列")
             
@@ -62,7 +90,7 @@ def scan_activex_positions(doc_path, template_name):
                                     if hasattr(shape, 'OLEFormat') and shape.OLEFormat is not None:
                                         # 找到ActiveX控件
                                         row_key = str(row)
-                                        config[template_name][table_key][row_key] = {
+                                        positions[table_key][row_key] = {
                                             "row": row,
                                             "column": col
                                         }
@@ -73,7 +101,7 @@ def scan_activex_positions(doc_path, template_name):
                                     continue
                             
                             # 如果在这个单元格找到了ActiveX控件，跳到下一行
-                            if str(row) in config[template_name][table_key]:
+                            if str(row) in positions[table_key]:
                                 break
                                 
                     except Exception as e:
@@ -90,7 +118,7 @@ def scan_activex_positions(doc_path, template_name):
         word_doc.Close(False)
         word.Quit()
         
-        return config
+        return positions
         
     except Exception as e:
         print(f"扫描过程中出错: {str(e)}")
@@ -102,23 +130,12 @@ def scan_activex_positions(doc_path, template_name):
                 pass
         return None
 
-def save_config(config, output_file):
-    """保存配置到JSON文件"""
+def save_config(config):
+    """保存配置到 activex_config.json（与现有配置合并）"""
     try:
-        # 如果文件已存在，先读取现有配置
-        existing_config = {}
-        if os.path.exists(output_file):
-            with open(output_file, 'r', encoding='utf-8') as f:
-                existing_config = json.load(f)
-        
-        # 合并配置
-        existing_config.update(config)
-        
-        # 保存配置
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(existing_config, f, indent=2, ensure_ascii=False)
+        save_activex_maps(config)
         
-        print(f"配置已保存到: {output_file}")
+        print(f"配置已保存到: {get_activex_config_path()}")
         return True
         
     except Exception as e:
@@ -128,7 +145,7 @@ def save_config(config, output_file):
 def scan_templates():
     """扫描模板文件夹中的所有模板"""
     templates_dir = Path.cwd() / 'templates'
-    config_file = Path.cwd() / 'activex_config.json'
+    config_file = get_activex_config_path()
     
     if not templates_dir.exists():
         print(f"模板文件夹不存在: {templates_dir}")
@@ -161,7 +178,7 @@ def scan_templates():
     
     # 保存所有配置
     if all_config:
-        if save_config(all_config, str(config_file)):
+        if save_config(all_config):
             print(f"\n✅ 所有模板扫描完成，配置已保存到: {config_file}")
         else:
             print(f"\n❌ 保存配置文件失败")
@@ -175,8 +192,8 @@ def scan_specific_file(file_path, template_name=None):
     
     config = scan_activex_positions(file_path, template_name)
     if config:
-        config_file = Path.cwd() / 'activex_config.json'
-        if save_config(config, str(config_file)):
+        config_file = get_activex_config_path()
+        if save_config(config):
             print(f"\n✅ 扫描完成，配置已保存到: {config_file}")
             
             # 显示扫描结果
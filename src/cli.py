@@ -0,0 +1,170 @@
+"""
+命令行入口
+不启动界面直接批量处理任务列表，用于定时批处理、性能测试和回归测试
+
+用法:
+    python -m src.cli run --tasks list.xlsx --team LUM --workers 8 --report out.json
+    python -m src.cli run --tasks list.xlsx --engine docx --processes 8
+    python -m src.cli run --tasks list.xlsx --engine word --profile-com --report out.json
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+from collections import Counter
+
+from src.config.config_manager import ConfigManager, config_manager
+from src.data.data_manager import data_manager
+from src.funcs.com_profiler import com_profiler
+from src.funcs.pipeline import (STAGE_FILL, STAGE_RESOLVE, build_checklist_pipeline, get_pipeline_config,
+                                 log_pipeline_report)
+from src.funcs.task_utils import STATUS_COMPLETED, STATUS_UNCHANGED, read_tasks_from_excel
+from src.funcs.template_registry import check_activex_maps
+from src.logger.logger import log_error, log_info
+
+# 退出码
+EXIT_OK = 0            # 所有任务都已完成（包括检查清单未变化而跳过的任务）
+EXIT_JOBS_FAILED = 1   # 有任务未完成（未找到目录、预检查失败、填写失败等）
+EXIT_ERROR = 2         # 参数或配置错误，未能开始处理
+
+
+def run_batch(tasks, base_dir, team, workers=None, engine=None, force_rescan=False, processes=None):
+    """
+    批量处理任务：路径解析、子文件夹检测、填写检查清单分阶段并行进行
+    :param workers: 路径解析的线程数，为None时读取 system.json
+    :param engine: 填写引擎（word/docx），为None时读取用户配置
+    :param processes: 填写进程数（仅docx引擎），为None时读取 system.json
+    :return: (任务结果列表, 各阶段耗时字典)，启用COM调用统计时耗时字典中包含 com
+    """
+    sub_folder_config = config_manager.get_subfolder_config(team)
+    pipeline_config = get_pipeline_config()
+    if workers:
+        pipeline_config['resolve_workers'] = workers
+    if processes is not None:
+        pipeline_config['fill_processes'] = processes
+    data_manager.clear_results()
+    data_manager.set_tasks(tasks)
+    data_manager.set_processing_status(True)
+    com_profiler.reset()
+    try:
+        pipeline = build_checklist_pipeline(base_dir, team, sub_folder_config, data_manager.add_result,
+                                            engine=engine, force_rescan=force_rescan,
+                                            pipeline_config=pipeline_config)
+        report = pipeline.run(tasks)
+        log_pipeline_report(report)
+        stages = report['stages']
+        timing = {
+            'resolve_seconds': stages[STAGE_RESOLVE]['busy_seconds'],
+            'fill_seconds': stages[STAGE_FILL]['busy_seconds'],
+            'filled_jobs': stages[STAGE_FILL]['processed'],
+            'total_seconds': report['total_seconds'],
+            'stages': stages
+        }
+        if com_profiler.enabled:
+            timing['com'] = com_profiler.summary()
+    finally:
+        data_manager.set_processing_status(False)
+    return data_manager.get_results(), timing
+
+
+def _print_summary(results, timing):
+    counts = Counter(result['status'] for result in results)
+    total_seconds = timing['total_seconds']
+    throughput = len(results) / total_seconds * 60 if total_seconds > 0 else 0.0
+    print(f"共 {len(results)} 个任务: " + "，".join(f"{status} {count}" for status, count in counts.items()))
+    print(f"路径解析累计耗时 {timing['resolve_seconds']:.2f} 秒，"
+          f"填写 {timing['filled_jobs']} 个检查清单累计耗时 {timing['fill_seconds']:.2f} 秒，"
+          f"总耗时 {total_seconds:.2f} 秒")
+    print(f"吞吐量: {throughput:.1f} 个任务/分钟")
+    com = timing.get('com')
+    if com and com['checklists']:
+        print(f"COM调用: {com['checklists']} 个检查清单共 {com['calls']} 次，"
+              f"平均每个检查清单 {com['calls_per_checklist']} 次 / {com['seconds_per_checklist']:.3f} 秒")
+        for row in com['sites'][:5]:
+            print(f"  {row['site']} {row['member']}({row['kind']}): {row['calls']} 次，{row['seconds']:.3f} 秒")
+
+
+def _write_report(report_path, args, base_dir, results, timing):
+    report = {
+        'tasks_file': args.tasks,
+        'team': args.team,
+        'base_dir': base_dir,
+        'engine': args.engine or config_manager.get_user_config('fill_engine', 'word'),
+        'workers': args.workers,
+        'processes': args.processes,
+        'summary': dict(Counter(result['status'] for result in results)),
+        'timing': timing,
+        'results': results
+    }
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"报告已保存到 {report_path}")
+
+
+def command_run(args):
+    """run 子命令"""
+    team = args.team or config_manager.get_team()
+    if team not in ConfigManager.USER_CONFIG_SCHEMA['team']['allowed_values']:
+        print(f"无效的团队: {team}", file=sys.stderr)
+        return EXIT_ERROR
+    base_dir = args.base_dir or config_manager.get_base_dir()
+    if not base_dir:
+        print("未配置基础目录，请在 user.json 中设置 base_dir 或使用 --base-dir", file=sys.stderr)
+        return EXIT_ERROR
+    # 只在本次运行中覆盖团队，不写入 user.json（覆盖模式按团队选择模板）
+    config_manager.set_user_config('team', team)
+
+    try:
+        tasks = read_tasks_from_excel(args.tasks, config_manager.get_user_config('task_list_map', {}))
+    except Exception as e:
+        log_error(f"读取Excel文件失败: {e}")
+        print(f"读取任务列表失败: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    log_info(f"成功读取 {len(tasks)} 个任务", "CLI")
+    if not tasks:
+        print("没有找到任务数据", file=sys.stderr)
+        return EXIT_ERROR
+
+    check_activex_maps()
+    if args.profile_com:
+        com_profiler.enabled = True
+    results, timing = run_batch(tasks, base_dir, team, args.workers, args.engine, args.force_rescan,
+                               args.processes)
+    _print_summary(results, timing)
+    if args.report:
+        _write_report(args.report, args, base_dir, results, timing)
+    if all(result['status'] in (STATUS_COMPLETED, STATUS_UNCHANGED) for result in results):
+        return EXIT_OK
+    return EXIT_JOBS_FAILED
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m src.cli', description='Checklist 自动填写工具（命令行）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='批量处理任务列表')
+    run_parser.add_argument('--tasks', required=True, help='任务列表Excel文件')
+    run_parser.add_argument('--team', choices=ConfigManager.USER_CONFIG_SCHEMA['team']['allowed_values'],
+                            help='团队，默认读取 user.json')
+    run_parser.add_argument('--base-dir', help='项目基础目录（PPT为快捷方式文件夹），默认读取 user.json')
+    run_parser.add_argument('--workers', type=int, help='路径解析的线程数，默认读取 system.json')
+    run_parser.add_argument('--processes', type=int, help='多进程填写的进程数（仅docx引擎），默认读取 system.json')
+    run_parser.add_argument('--engine', choices=ConfigManager.USER_CONFIG_SCHEMA['fill_engine']['allowed_values'],
+                            help='填写引擎，默认读取 user.json 的 fill_engine')
+    run_parser.add_argument('--report', help='将结果和耗时保存为JSON报告')
+    run_parser.add_argument('--force-rescan', action='store_true', help='忽略子文件夹检测缓存和填写状态记录，重新检测所有子文件夹并重新填写检查清单')
+    run_parser.add_argument('--profile-com', action='store_true',
+                            help='统计每个检查清单的COM调用次数和耗时（Word引擎），结果写入报告的 timing.com')
+    run_parser.set_defaults(handler=command_run)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    # 打包后启动填写进程时直接进入工作进程
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""
+文件原子写入
+先在目标文件夹写临时文件，写完后用 os.replace 替换目标文件，写入中断时不会留下不完整的文件，
+其他进程读取时只会看到旧文件或完整的新文件
+编译结果缓存、activex_config.json、检查清单和签名图片共用
+"""
+import os
+import tempfile
+from pathlib import Path
+
+# 临时文件以"."开头、以.tmp结尾，写在项目文件夹中时不会被当作检查清单
+_TEMP_PREFIX = '.~'
+_TEMP_SUFFIX = '.tmp'
+
+
+def write_file_atomic(path, write):
+    """
+    先在同一文件夹写临时文件，完成后替换目标文件
+    :param path: 目标文件路径
+    :param write: 写入函数，参数为以二进制方式打开的文件对象
+    """
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(prefix=_TEMP_PREFIX + path.stem + '-', suffix=_TEMP_SUFFIX,
+                                     dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
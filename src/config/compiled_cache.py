@@ -0,0 +1,119 @@
+"""
+编译结果缓存
+把每次启动都要重新生成的结果（system.json 验证结果、填写计划等）以JSON保存在配置目录下的一个文件中，
+每一项记录其来源文件（system.json、activex_config.json、模板.docx）的内容哈希，
+哈希一致时一次读取即可使用，来源文件变化或缓存版本不同时自动重新生成
+缓存中只保存普通数据（列表、字典、字符串、数字），由使用方读取后重新构造对象
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config.atomic_file import write_file_atomic
+
+CACHE_FILE_NAME = 'compiled_cache.json'
+# 缓存内容的结构变化时增加版本号，旧缓存自动失效
+CACHE_VERSION = 2
+
+# 文件内容哈希的进程内缓存：路径 -> ((修改时间, 大小), 哈希)
+_file_hashes: Dict[str, Any] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path) -> Optional[str]:
+    """
+    计算文件内容哈希，文件不存在时返回None
+    同一进程内文件未修改时不重复读取
+    """
+    path = str(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    try:
+        with open(path, 'rb') as f:
+            digest = hash_bytes(f.read())
+    except OSError:
+        return None
+    with _file_hashes_lock:
+        _file_hashes[path] = (signature, digest)
+    return digest
+
+
+class CompiledCache:
+    """按来源文件哈希保存编译结果的磁盘缓存"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: 缓存文件路径
+        """
+        self.path = Path(path)
+        self._entries: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        """一次读取整个缓存文件，版本不同或文件损坏时视为空缓存"""
+        if self._entries is not None:
+            return self._entries
+        entries = {}
+        try:
+            with open(self.path, 'rb') as f:
+                data = json.loads(f.read().decode('utf-8'))
+            if isinstance(data, dict) and data.get('version') == CACHE_VERSION:
+                entries = data.get('entries', {})
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # 缓存文件损坏或由不兼容的版本写入，重新生成即可
+            entries = {}
+        self._entries = entries
+        return entries
+
+    def get(self, section: str, hashes: Dict[str, Optional[str]]) -> Any:
+        """
+        获取编译结果
+        :param section: 缓存项名称
+        :param hashes: 来源文件哈希，与保存时完全一致才返回
+        :return: 编译结果，没有有效缓存时返回None
+        """
+        with self._lock:
+            entry = self._load().get(section)
+        if entry is None or entry['hashes'] != hashes:
+            return None
+        return entry['value']
+
+    def put(self, section: str, hashes: Dict[str, Optional[str]], value: Any):
+        """
+        保存编译结果并写入缓存文件（先写临时文件再替换，写入失败不影响使用）
+        :param value: 可以保存为JSON的普通数据
+        """
+        with self._lock:
+            entries = self._load()
+            entries[section] = {'hashes': dict(hashes), 'value': value}
+            try:
+                data = json.dumps({'version': CACHE_VERSION, 'entries': entries}, ensure_ascii=False).encode('utf-8')
+                write_file_atomic(self.path, lambda f: f.write(data))
+            except OSError:
+                pass
+
+    def clear(self):
+        """清空缓存并删除缓存文件"""
+        with self._lock:
+            self._entries = {}
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -3,6 +3,7 @@
 用于管理 system.json（只读）和 user.json（可读写）配置文件
 """
 
+import fnmatch
 import json
 import os
 import sys
@@ -10,6 +11,52 @@ from typing import Dict, Any, Optional, List
 from pathlib import Path
 import re
 
+from src.config.compiled_cache import CACHE_FILE_NAME, CompiledCache, hash_bytes
+
+
+class FileMatcher:
+    """
+    file_map 中单个类别的编译结果
+    同一类别的所有 glob 模式合并为一个不区分大小写的正则，匹配文件名时只需一次正则调用
+    """
+    
+    ANY_FILE_PATTERN = '*.*'
+    
+    def __init__(self, category: str, patterns: List[str]):
+        """
+        Args:
+            category: file_map 中的类别名
+            patterns: 该类别的 glob 模式列表，空字符串会被忽略
+        """
+        self.category = category
+        self.patterns = [pattern for pattern in patterns if pattern]
+        # 只有 "*.*" 的类别不需要正则：名称中含有"."即匹配
+        self.any_file = bool(self.patterns) and all(p == self.ANY_FILE_PATTERN for p in self.patterns)
+        # 与 glob 一致：以"."开头的隐藏文件只能被以"."开头的模式匹配
+        self._regex = self._compile([p for p in self.patterns if not p.startswith('.')])
+        self._hidden_regex = self._compile([p for p in self.patterns if p.startswith('.')])
+    
+    @staticmethod
+    def _compile(patterns: List[str]):
+        if not patterns:
+            return None
+        return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns), re.IGNORECASE)
+    
+    def match(self, name: str) -> bool:
+        """文件名是否匹配该类别中的任一模式"""
+        if name.startswith('.'):
+            return bool(self._hidden_regex and self._hidden_regex.match(name))
+        if self.any_file:
+            return '.' in name
+        return bool(self._regex and self._regex.match(name))
+    
+    def match_any(self, names) -> bool:
+        """文件名列表中是否有任一文件匹配"""
+        return any(self.match(name) for name in names)
+    
+    def __repr__(self):
+        return f"FileMatcher({self.category!r}, {self.patterns!r})"
+
 
 class ConfigManager:
     """配置管理器类"""
@@ -39,7 +86,7 @@ class ConfigManager:
     # 用户配置规范定义
     USER_CONFIG_SCHEMA = {
         'required_keys': ['team', 'base_dir','checklist', 'task_list_map'],
-        'allowed_keys': ['team', 'base_dir', 'task_list_map', 'checklist', 'efilling_tool_path', 'archive_path'],
+        'allowed_keys': ['team', 'base_dir', 'task_list_map', 'checklist', 'efilling_tool_path', 'archive_path', 'fill_engine'],
         'team': {
             'allowed_values': ['LUM','HA','TM','EMC', 'PPT']
         },
@@ -62,6 +109,10 @@ class ConfigManager:
         'efilling_tool_path': {
             'type': str,
             'must_exist': False  # 工具路径可以不存在
+        },
+        'fill_engine': {
+            'type': str,
+            'allowed_values': ['word', 'docx']  # word: Word COM；docx: 直接编辑OOXML
         }
     }
     
@@ -83,6 +134,11 @@ class ConfigManager:
         
         self._system_config: Optional[Dict[str, Any]] = None
         self._user_config: Optional[Dict[str, Any]] = None
+        # file_map 编译结果：类别 -> FileMatcher，加载/重新加载配置时生成
+        self._file_matchers: Dict[str, FileMatcher] = {}
+        # system.json 内容哈希，用于编译结果缓存
+        self.system_config_hash: Optional[str] = None
+        self.compiled_cache = CompiledCache(self.config_dir / CACHE_FILE_NAME)
         
         # 加载配置
         self._load_configs()
@@ -112,15 +168,34 @@ class ConfigManager:
         """加载配置文件"""
         self._load_system_config()
         self._load_user_config()
-        # 验证配置
-        self._validate_configs()
+        hashes = {'system.json': self.system_config_hash}
+        cached = self.compiled_cache.get('system_config', hashes)
+        if cached is not None and cached.get('validated'):
+            # system.json 未变化：已验证过，不再重复验证
+            self._validate_configs(validate_system=False)
+        else:
+            # 验证配置
+            self._validate_configs()
+            self.compiled_cache.put('system_config', hashes, {'validated': True})
+        # 编译文件映射规则（正则编译很快，不保存在缓存中）
+        self._compile_file_map()
+    
+    def _compile_file_map(self):
+        """将 file_map 中每个类别的 glob 模式编译为 FileMatcher"""
+        file_map = self._system_config.get('file_map', {}) if self._system_config else {}
+        self._file_matchers = {
+            category: FileMatcher(category, patterns)
+            for category, patterns in file_map.items()
+        }
     
     def _load_system_config(self):
         """加载系统配置（只读）"""
         try:
             if self.system_config_path.exists():
-                with open(self.system_config_path, 'r', encoding='utf-8') as f:
-                    self._system_config = json.load(f)
+                with open(self.system_config_path, 'rb') as f:
+                    data = f.read()
+                self.system_config_hash = hash_bytes(data)
+                self._system_config = json.loads(data.decode('utf-8'))
                 # 基本格式验证
                 self._validate_json_format(self._system_config, "系统配置")
             else:
@@ -155,10 +230,16 @@ class ConfigManager:
         if not config:
             raise ValueError(f"{config_name}不能为空")
     
-    def _validate_configs(self):
-        """验证配置内容的规范性"""
+    def _validate_configs(self, validate_system: bool = True):
+        """
+        验证配置内容的规范性
+        
+        Args:
+            validate_system: 是否验证系统配置，system.json 与上次验证时相同时可跳过
+        """
         try:
-            self._validate_system_config()
+            if validate_system:
+                self._validate_system_config()
             self._validate_user_config()
         except Exception as e:
             raise ValueError(f"配置验证失败: {e}")
@@ -365,6 +446,11 @@ class ConfigManager:
             except Exception as e:
                 raise ValueError(f"base_dir 路径格式无效: {e}")
         
+        # 验证 fill_engine（如果存在）
+        fill_engine = self._user_config.get('fill_engine')
+        if fill_engine is not None and fill_engine not in schema['fill_engine']['allowed_values']:
+            raise ValueError(f"无效的填写引擎: {fill_engine}. 允许的值: {schema['fill_engine']['allowed_values']}")
+        
         # 验证 task_list_map（如果存在）
         if 'task_list_map' in self._user_config:
             task_map = self._user_config['task_list_map']
@@ -392,7 +478,8 @@ class ConfigManager:
                 'job_creator': 1,
                 'engineers': 2
             },
-            'checklist': 'cover'  # 默认值为 'cover'
+            'checklist': 'cover',  # 默认值为 'cover'
+            'fill_engine': 'word'  # 默认使用Word COM填写
         }
     
     def validate_config_integrity(self) -> Dict[str, Any]:
@@ -624,6 +711,14 @@ class ConfigManager:
         """获取文件映射配置"""
         return self.get_system_config('file_map', {})
     
+    def get_file_matchers(self) -> Dict[str, FileMatcher]:
+        """获取编译后的文件映射规则，类别 -> FileMatcher"""
+        return self._file_matchers
+    
+    def get_file_matcher(self, category: str) -> Optional[FileMatcher]:
+        """获取单个类别编译后的文件映射规则，类别不存在时返回None"""
+        return self._file_matchers.get(category)
+    
     def get_base_dir(self) -> str:
         """获取基础目录"""
         return self.get_user_config('base_dir', '')
@@ -663,6 +758,21 @@ def set_user_config(key: str, value: Any):
     config_manager.save_user_config()
 
 
+def get_file_matchers() -> Dict[str, FileMatcher]:
+    """获取编译后的文件映射规则的便捷函数"""
+    return config_manager.get_file_matchers()
+
+
+def get_compiled_cache() -> CompiledCache:
+    """获取编译结果缓存的便捷函数"""
+    return config_manager.compiled_cache
+
+
+def get_system_config_hash() -> Optional[str]:
+    """获取 system.json 内容哈希的便捷函数"""
+    return config_manager.system_config_hash
+
+
 def reload_configs():
     """重新加载配置的便捷函数"""
     config_manager.reload_configs()
@@ -0,0 +1,114 @@
+"""
+检查清单填写状态记录 - 使用SQLite保存在user.json同级目录
+每个检查清单记录上次填写时的期望状态哈希和填写后文件的修改时间、大小，
+再次运行时期望状态相同且检查清单之后未被修改的任务可以跳过填写
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from src.config.config_manager import config_manager, get_system_config
+from src.logger.logger import log_warning
+
+STATE_FILE_NAME = 'fill_state.db'
+
+
+class FillStateStore:
+    """检查清单填写状态的持久化记录"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: 记录文件路径，默认为 user.json 同级目录下的 fill_state.db
+        """
+        self._db_path = db_path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self) -> str:
+        if self._db_path is None:
+            self._db_path = str(config_manager.config_dir / STATE_FILE_NAME)
+        return self._db_path
+
+    @property
+    def enabled(self) -> bool:
+        return bool(get_system_config('fill_state.enabled', True))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS fill_state ('
+                'path TEXT PRIMARY KEY, state_hash TEXT NOT NULL, mtime_ns INTEGER NOT NULL, '
+                'size INTEGER NOT NULL, filled_at REAL NOT NULL)'
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def is_current(self, path: str, state_hash: str) -> bool:
+        """
+        检查清单是否已经是期望状态：上次填写的状态哈希相同，且文件之后没有被修改
+        """
+        if not self.enabled:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    'SELECT state_hash, mtime_ns, size FROM fill_state WHERE path = ?', (self._key(path),)
+                ).fetchone()
+        except sqlite3.Error as e:
+            log_warning(f"读取填写状态记录失败: {e}", "FILE")
+            return False
+        return row is not None and tuple(row) == (state_hash, stat.st_mtime_ns, stat.st_size)
+
+    def put(self, path: str, state_hash: str):
+        """检查清单填写完成后记录其期望状态和当前的修改时间、大小"""
+        if not self.enabled:
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute(
+                    'INSERT OR REPLACE INTO fill_state (path, state_hash, mtime_ns, size, filled_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (self._key(path), state_hash, stat.st_mtime_ns, stat.st_size, time.time())
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            log_warning(f"写入填写状态记录失败: {e}", "FILE")
+
+    def clear(self):
+        """清空记录，之后所有检查清单都会重新填写"""
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute('DELETE FROM fill_state')
+                connection.commit()
+        except sqlite3.Error as e:
+            log_warning(f"清空填写状态记录失败: {e}", "FILE")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# 创建全局实例
+fill_state_store = FillStateStore()
@@ -0,0 +1,183 @@
+"""
+子文件夹检测结果缓存 - 使用SQLite保存在user.json同级目录
+每条记录保存检测时访问过的目录及其修改时间，重新检测时每个目录只需一次stat即可判断结果是否仍然有效
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from src.config.config_manager import config_manager, get_system_config
+from src.funcs.folder_snapshot import ScanRecord
+from src.logger.logger import log_debug, log_warning
+
+CACHE_FILE_NAME = 'folder_status_cache.db'
+DEFAULT_MAX_ENTRIES = 50000
+
+
+class FolderStatusCache:
+    """子文件夹检测结果的持久化缓存（按最近使用时间淘汰）"""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            db_path: 缓存文件路径，默认为 user.json 同级目录下的 folder_status_cache.db
+            max_entries: 最多保存的记录数，默认读取 system.json 的 folder_status_cache.max_entries
+        """
+        self._db_path = db_path
+        self._max_entries = max_entries
+        self._connection = None
+        # 表中的记录数，连接时统计一次，之后随写入和淘汰更新
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self) -> str:
+        if self._db_path is None:
+            self._db_path = str(config_manager.config_dir / CACHE_FILE_NAME)
+        return self._db_path
+
+    @property
+    def enabled(self) -> bool:
+        return bool(get_system_config('folder_status_cache.enabled', True))
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return get_system_config('folder_status_cache.max_entries', DEFAULT_MAX_ENTRIES)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            # 缓存内容可随时重建，不需要每次提交都落盘
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS folder_status ('
+                'path TEXT NOT NULL, config_hash TEXT NOT NULL, dirs TEXT NOT NULL, '
+                'status TEXT NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (path, config_hash))'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_folder_status_last_used ON folder_status (last_used)')
+            connection.commit()
+            self._count = connection.execute('SELECT COUNT(*) FROM folder_status').fetchone()[0]
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def _dir_mtimes(dirs: List[str]) -> Optional[List[Tuple[str, int]]]:
+        """读取目录的修改时间，任一目录无法访问时返回None"""
+        mtimes = []
+        for dir_path in dirs:
+            try:
+                mtimes.append((dir_path, os.stat(dir_path).st_mtime_ns))
+            except OSError:
+                return None
+        return mtimes
+
+    def get(self, path: str, config_hash: str) -> Any:
+        """
+        获取子文件夹的缓存结果，检测时访问过的目录都未修改时才返回
+        :return: 缓存的检测结果，没有有效缓存时返回None
+        """
+        if not self.enabled:
+            return None
+        key = self._key(path)
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    'SELECT dirs, status FROM folder_status WHERE path = ? AND config_hash = ?',
+                    (key, config_hash)
+                ).fetchone()
+            if row is None:
+                return None
+            dirs = json.loads(row[0])
+            if self._dir_mtimes([dir_path for dir_path, _ in dirs]) != [tuple(item) for item in dirs]:
+                return None
+            with self._lock:
+                connection = self._connect()
+                connection.execute(
+                    'UPDATE folder_status SET last_used = ? WHERE path = ? AND config_hash = ?',
+                    (time.time(), key, config_hash)
+                )
+                connection.commit()
+            return json.loads(row[1])
+        except (sqlite3.Error, ValueError) as e:
+            log_warning(f"读取文件夹检测缓存失败: {e}", "FILE")
+            return None
+
+    def put(self, path: str, config_hash: str, record: ScanRecord, status: Any):
+        """
+        保存子文件夹的检测结果
+        :param record: 检测时列出过的目录及列出前的修改时间，用于之后判断结果是否仍然有效
+        """
+        if not self.enabled:
+            return
+        if record.truncated:
+            # 查找在目录项上限处中断，结果不完整，不缓存
+            return
+        if any(mtime_ns is None for _, mtime_ns in record.dirs):
+            return
+        try:
+            with self._lock:
+                connection = self._connect()
+                key = self._key(path)
+                exists = connection.execute(
+                    'SELECT 1 FROM folder_status WHERE path = ? AND config_hash = ?', (key, config_hash)
+                ).fetchone()
+                connection.execute(
+                    'INSERT OR REPLACE INTO folder_status (path, config_hash, dirs, status, last_used) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, config_hash, json.dumps(record.dirs, ensure_ascii=False),
+                     json.dumps(status, ensure_ascii=False), time.time())
+                )
+                if exists is None:
+                    self._count += 1
+                if self._count > self.max_entries:
+                    self._evict(connection)
+                connection.commit()
+        except sqlite3.Error as e:
+            log_warning(f"写入文件夹检测缓存失败: {e}", "FILE")
+
+    def _evict(self, connection: sqlite3.Connection):
+        """超过最大记录数时删除最久未使用的记录"""
+        overflow = self._count - self.max_entries
+        deleted = connection.execute(
+            'DELETE FROM folder_status WHERE rowid IN '
+            '(SELECT rowid FROM folder_status ORDER BY last_used LIMIT ?)',
+            (overflow,)
+        ).rowcount
+        self._count -= deleted
+        log_debug(f"文件夹检测缓存已淘汰 {deleted} 条记录", "FILE")
+
+    def clear(self):
+        """清空缓存"""
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute('DELETE FROM folder_status')
+                connection.commit()
+                self._count = 0
+        except sqlite3.Error as e:
+            log_warning(f"清空文件夹检测缓存失败: {e}", "FILE")
+
+    def count(self) -> int:
+        """缓存中的记录数"""
+        with self._lock:
+            self._connect()
+            return self._count
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# 创建全局实例
+folder_status_cache = FolderStatusCache()
@@ -0,0 +1,246 @@
+"""
+COM调用统计
+把 Word.Application 对象包装为代理，统计每个检查清单填写过程中所有COM属性读取、属性设置和方法调用的次数和耗时，
+按调用位置（填写代码中的函数和行号）和成员分组，生成每个任务的报告和"每个检查清单的COM调用次数"指标，
+用于找出每个任务的时间花在哪里，并防止增加COM往返调用的改动
+"""
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+from src.config.config_manager import get_system_config
+from src.logger.logger import log_info
+
+# 不需要包装的返回值类型（COM属性的值）
+_PLAIN_TYPES = (str, int, float, bool, bytes, type(None))
+DEFAULT_TOP_SITES = 10
+
+KIND_GET = 'get'
+KIND_SET = 'set'
+KIND_CALL = 'call'
+
+
+def _call_site():
+    """调用COM的代码位置：本模块之外的第一个栈帧"""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return '?'
+    module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+    return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+class _JobStats:
+    """一个任务的COM调用统计：(调用位置, 成员, 类型) -> [次数, 耗时]"""
+
+    def __init__(self, job_no):
+        self.job_no = job_no
+        self.sites = {}
+        self.depth = 0
+
+    def add(self, site, member, kind, seconds):
+        stats = self.sites.get((site, member, kind))
+        if stats is None:
+            stats = self.sites[(site, member, kind)] = [0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+
+    def report(self, top_sites):
+        calls = sum(stats[0] for stats in self.sites.values())
+        seconds = sum(stats[1] for stats in self.sites.values())
+        return {
+            'job_no': self.job_no,
+            'calls': calls,
+            'seconds': round(seconds, 4),
+            'sites': _site_rows(self.sites, top_sites)
+        }
+
+
+def _site_rows(sites, limit):
+    """按耗时（其次按次数）排序的调用位置列表"""
+    rows = sorted(sites.items(), key=lambda item: (item[1][1], item[1][0]), reverse=True)
+    return [
+        {'site': site, 'member': member, 'kind': kind, 'calls': stats[0], 'seconds': round(stats[1], 4)}
+        for (site, member, kind), stats in rows[:limit]
+    ]
+
+
+class _ProfiledCom:
+    """COM对象代理：读取属性、设置属性、调用方法时记录次数和耗时，返回的COM对象同样被包装"""
+
+    __slots__ = ('_com_object', '_com_profiler', '_com_name')
+
+    def __init__(self, com_object, profiler, name):
+        object.__setattr__(self, '_com_object', com_object)
+        object.__setattr__(self, '_com_profiler', profiler)
+        object.__setattr__(self, '_com_name', name)
+
+    def __getattr__(self, name):
+        profiler = self._com_profiler
+        member = f"{self._com_name}.{name}"
+        start = time.perf_counter()
+        value = getattr(self._com_object, name)
+        elapsed = time.perf_counter() - start
+        if isinstance(value, types.MethodType):
+            # 取得方法本身不产生调用，调用时再计时
+            return _ProfiledMethod(value, profiler, member, name)
+        profiler.record(member, KIND_GET, elapsed)
+        return profiler.wrap(value, name)
+
+    def __setattr__(self, name, value):
+        start = time.perf_counter()
+        setattr(self._com_object, name, value)
+        self._com_profiler.record(f"{self._com_name}.{name}", KIND_SET, time.perf_counter() - start)
+
+    def __getitem__(self, index):
+        start = time.perf_counter()
+        value = self._com_object[index]
+        self._com_profiler.record(f"{self._com_name}[]", KIND_GET, time.perf_counter() - start)
+        return self._com_profiler.wrap(value, f"{self._com_name}[]")
+
+    def __iter__(self):
+        iterator = iter(self._com_object)
+        while True:
+            start = time.perf_counter()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._com_profiler.record(f"{self._com_name}[iter]", KIND_GET, time.perf_counter() - start)
+            yield self._com_profiler.wrap(value, f"{self._com_name}[]")
+
+    def __repr__(self):
+        return f"<profiled {self._com_name}: {self._com_object!r}>"
+
+
+class _ProfiledMethod:
+    __slots__ = ('_method', '_profiler', '_member', '_name')
+
+    def __init__(self, method, profiler, member, name):
+        self._method = method
+        self._profiler = profiler
+        self._member = member
+        self._name = name
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            value = self._method(*args, **kwargs)
+        finally:
+            self._profiler.record(self._member, KIND_CALL, time.perf_counter() - start)
+        return self._profiler.wrap(value, self._name)
+
+
+class ComProfiler:
+    """按任务统计COM调用"""
+
+    def __init__(self, enabled=None, top_sites=None):
+        """
+        :param enabled: 是否统计，为None时读取 system.json 的 com_profiler.enabled
+        :param top_sites: 报告中列出的调用位置数量，为None时读取 system.json 的 com_profiler.top_sites
+        """
+        self._enabled = enabled
+        self._top_sites = top_sites
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.jobs = []
+        self._sites = {}
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is not None:
+            return self._enabled
+        return bool(get_system_config('com_profiler.enabled', False))
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = value
+
+    @property
+    def top_sites(self) -> int:
+        if self._top_sites is not None:
+            return self._top_sites
+        return get_system_config('com_profiler.top_sites', DEFAULT_TOP_SITES)
+
+    def wrap(self, value, name='Application'):
+        """包装COM对象；未启用统计或不是COM对象时原样返回"""
+        if isinstance(value, (_PLAIN_TYPES, _ProfiledCom)) or not self.enabled:
+            return value
+        return _ProfiledCom(value, self, name)
+
+    def record(self, member, kind, seconds):
+        job = getattr(self._local, 'job', None)
+        if job is not None:
+            job.add(_call_site(), member, kind, seconds)
+
+    @contextmanager
+    def job(self, job_no):
+        """
+        统计一个检查清单填写过程中的COM调用，结束时记录并输出报告
+        嵌套调用（如回退到原方法）计入同一个任务
+        """
+        if not self.enabled:
+            yield None
+            return
+        job = getattr(self._local, 'job', None)
+        if job is not None:
+            job.depth += 1
+            try:
+                yield job
+            finally:
+                job.depth -= 1
+            return
+        job = self._local.job = _JobStats(job_no)
+        try:
+            yield job
+        finally:
+            self._local.job = None
+            self._finish(job)
+
+    def _finish(self, job):
+        report = job.report(self.top_sites)
+        with self._lock:
+            self.jobs.append(report)
+            for key, stats in job.sites.items():
+                total = self._sites.setdefault(key, [0, 0.0])
+                total[0] += stats[0]
+                total[1] += stats[1]
+        log_info(f"{job.job_no} COM调用 {report['calls']} 次，耗时 {report['seconds']:.3f} 秒", "WORD")
+        for row in report['sites'][:3]:
+            log_info(f"  {row['site']} {row['member']}({row['kind']}): {row['calls']} 次，{row['seconds']:.3f} 秒", "WORD")
+
+    def summary(self):
+        """
+        本次运行的统计
+        :return: 字典，包含 checklists（统计的检查清单数）、calls、seconds、calls_per_checklist、
+                 seconds_per_checklist、sites（所有任务合计耗时最多的调用位置）、jobs（每个任务的报告）
+        """
+        with self._lock:
+            jobs = list(self.jobs)
+            sites = dict(self._sites)
+        calls = sum(job['calls'] for job in jobs)
+        seconds = sum(job['seconds'] for job in jobs)
+        count = len(jobs)
+        return {
+            'checklists': count,
+            'calls': calls,
+            'seconds': round(seconds, 4),
+            'calls_per_checklist': round(calls / count, 1) if count else 0.0,
+            'seconds_per_checklist': round(seconds / count, 4) if count else 0.0,
+            'sites': _site_rows(sites, self.top_sites),
+            'jobs': jobs
+        }
+
+    def reset(self):
+        with self._lock:
+            self.jobs = []
+            self._sites = {}
+
+
+# 创建全局实例
+com_profiler = ComProfiler()
@@ -0,0 +1,882 @@
+"""
+Word文档OOXML处理模块
+不经过Word COM，直接编辑.docx包完成检查清单的填写：
+表格文本写入 word/document.xml，选项按钮状态写入 word/activeX/activeX*.bin，签名图片写入 word/media
+"""
+import copy
+import hashlib
+import io
+import os
+import posixpath
+import re
+import struct
+import zipfile
+import zlib
+from datetime import date
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from src.config.atomic_file import write_file_atomic
+from src.funcs.file_utils import detect_checklist_folders_status
+from src.funcs.fill_plan import OP_DATE, OP_IMAGE, OP_OPTION
+from src.funcs.folder_snapshot import JobFolderSnapshot
+from src.funcs.signature_cache import signature_cache
+from src.funcs.template_store import template_store
+from src.funcs.word_processor import get_checklist_source, get_fill_plan, publish_checklist
+from src.logger.logger import log_info, log_error, log_warning, log_debug
+
+DOCUMENT_PART = 'word/document.xml'
+DOCUMENT_RELS_PART = 'word/_rels/document.xml.rels'
+CONTENT_TYPES_PART = '[Content_Types].xml'
+
+REL_TYPE_IMAGE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+REL_TYPE_CONTROL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/control'
+REL_TYPE_ACTIVEX_BINARY = 'http://schemas.microsoft.com/office/2006/relationships/activeXControlBinary'
+
+# 1磅 = 12700 EMU
+EMU_PER_POINT = 12700
+
+IMAGE_CONTENT_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'bmp': 'image/bmp',
+    'gif': 'image/gif'
+}
+
+# 只匹配 w:tbl / w:tr / w:tc 本身，不匹配 w:tblPr、w:trPr、w:tcPr 等子元素
+_TABLE_TAG_RE = re.compile(r'<(/?)w:(tbl|tr|tc)(?=[\s/>])[^>]*?(/?)>')
+_PARAGRAPH_RE = re.compile(r'<w:p(?=[\s/>])[^>]*?(?:/>|>.*?</w:p>)', re.S)
+_CONTROL_RE = re.compile(r'<w:control\b[^>]*?\br:id="([^"]+)"')
+# 单元格中的ActiveX控件或嵌入OLE对象（对应COM中带有 OLEFormat 的 InlineShape）
+_OLE_OBJECT_RE = re.compile(r'<w:(?:control|object)(?=[\s/>])')
+_RELATIONSHIP_RE = re.compile(r'<Relationship\b[^>]*?/>')
+
+
+# ---------------------------------------------------------------------------
+# ActiveX 选项按钮（OLE复合文档 + MS-OFORMS MorphData）
+# ---------------------------------------------------------------------------
+
+_CFB_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_CFB_MAX_REG_SECTOR = 0xFFFFFFFA
+
+# MorphData 数据块中各属性的 (PropMask位, 字节数)，顺序与 MS-OFORMS 2.2.5.3 一致
+_MORPH_DATA_BLOCK = [
+    (0, 4), (1, 4), (2, 4), (3, 4), (4, 1), (5, 1), (6, 1), (7, 1),
+    (9, 2), (10, 4), (11, 2), (12, 2), (13, 2), (14, 2), (15, 2),
+    (16, 1), (17, 1), (18, 1), (20, 1), (21, 1),
+    (22, 4), (23, 4), (24, 4), (25, 4), (26, 4), (27, 2), (28, 2), (29, 2),
+    (32, 4)
+]
+_MORPH_SIZE_BIT = 8
+_MORPH_VALUE_BIT = 22
+_MORPH_HEADER_SIZE = 12
+
+
+def _cfb_stream_offsets(data, stream_name):
+    """
+    在OLE复合文档（ActiveX控件的.bin部件）中定位指定的流
+    :param data: 复合文档字节
+    :param stream_name: 流名称（不区分大小写）
+    :return: 流中每个字节在文件中的偏移列表
+    """
+    if data[:8] != _CFB_MAGIC:
+        raise ValueError("不是有效的OLE复合文档")
+
+    sector_size = 1 << struct.unpack_from('<H', data, 0x1E)[0]
+    mini_sector_size = 1 << struct.unpack_from('<H', data, 0x20)[0]
+    dir_start, = struct.unpack_from('<I', data, 0x30)
+    mini_cutoff, = struct.unpack_from('<I', data, 0x38)
+    minifat_start, = struct.unpack_from('<I', data, 0x3C)
+    difat_start, difat_count = struct.unpack_from('<II', data, 0x44)
+
+    def sector_offset(sector):
+        return (sector + 1) * sector_size
+
+    # 读取FAT（头部109个DIFAT项 + 扩展DIFAT扇区）
+    fat_sectors = [s for s in struct.unpack_from('<109I', data, 0x4C) if s < _CFB_MAX_REG_SECTOR]
+    sector = difat_start
+    for _ in range(difat_count):
+        if sector >= _CFB_MAX_REG_SECTOR:
+            break
+        entries = struct.unpack_from(f'<{sector_size // 4}I', data, sector_offset(sector))
+        fat_sectors.extend(s for s in entries[:-1] if s < _CFB_MAX_REG_SECTOR)
+        sector = entries[-1]
+    fat = []
+    for s in fat_sectors:
+        fat.extend(struct.unpack_from(f'<{sector_size // 4}I', data, sector_offset(s)))
+
+    def chain(start):
+        sectors = []
+        while start < _CFB_MAX_REG_SECTOR and len(sectors) <= len(fat):
+            sectors.append(start)
+            start = fat[start]
+        return sectors
+
+    # 遍历目录项
+    entries = []
+    for s in chain(dir_start):
+        base = sector_offset(s)
+        for i in range(sector_size // 128):
+            entry = data[base + i * 128: base + (i + 1) * 128]
+            name_length, = struct.unpack_from('<H', entry, 64)
+            name = entry[:max(name_length - 2, 0)].decode('utf-16le', errors='ignore')
+            start, size = struct.unpack_from('<II', entry, 116)
+            entries.append((name, entry[66], start, size))
+
+    root = entries[0]
+    target = next((e for e in entries if e[1] == 2 and e[0].lower() == stream_name.lower()), None)
+    if target is None:
+        raise ValueError(f"复合文档中未找到流: {stream_name}")
+    _, _, start, size = target
+
+    if size < mini_cutoff:
+        # 小于阈值的流保存在迷你流中，迷你流本身是根目录项的扇区链
+        minifat = []
+        for s in chain(minifat_start):
+            minifat.extend(struct.unpack_from(f'<{sector_size // 4}I', data, sector_offset(s)))
+        root_sectors = chain(root[2])
+        offsets = []
+        mini = start
+        while mini < _CFB_MAX_REG_SECTOR and len(offsets) < size:
+            for k in range(mini_sector_size):
+                position = mini * mini_sector_size + k
+                offsets.append(sector_offset(root_sectors[position // sector_size]) + position % sector_size)
+            mini = minifat[mini]
+    else:
+        offsets = []
+        for s in chain(start):
+            offsets.extend(range(sector_offset(s), sector_offset(s) + sector_size))
+    return offsets[:size]
+
+
+def _locate_morph_value(contents):
+    """
+    在选项按钮的 contents 流（MorphData）中定位 Value 属性
+    :param contents: contents 流字节
+    :return: (偏移, 字节数, 是否压缩)，控件未保存 Value 时返回None
+    """
+    if len(contents) < _MORPH_HEADER_SIZE:
+        raise ValueError("MorphData数据长度不足")
+    prop_mask, = struct.unpack_from('<Q', contents, 4)
+    if not prop_mask >> _MORPH_VALUE_BIT & 1:
+        return None
+
+    offset = _MORPH_HEADER_SIZE
+    value_size = None
+    for bit, size in _MORPH_DATA_BLOCK:
+        if not prop_mask >> bit & 1:
+            continue
+        offset = (offset + size - 1) // size * size
+        if bit == _MORPH_VALUE_BIT:
+            value_size, = struct.unpack_from('<I', contents, offset)
+        offset += size
+    offset = (offset + 3) // 4 * 4
+
+    if prop_mask >> _MORPH_SIZE_BIT & 1:
+        offset += 8
+
+    compressed = bool(value_size & 0x80000000)
+    length = value_size & 0x7FFFFFFF
+    if offset + length > len(contents):
+        raise ValueError("MorphData中Value属性越界")
+    return offset, length, compressed
+
+
+def read_option_value(bin_data):
+    """读取选项按钮（.bin部件）当前的选中状态"""
+    offsets = _cfb_stream_offsets(bin_data, 'contents')
+    contents = bytes(bin_data[o] for o in offsets)
+    located = _locate_morph_value(contents)
+    if located is None:
+        return False
+    offset, length, compressed = located
+    raw = contents[offset:offset + length]
+    text = raw.decode('latin-1') if compressed else raw.decode('utf-16le')
+    return text == '1'
+
+
+def write_option_value(bin_data, value):
+    """
+    写入选项按钮（.bin部件）的选中状态
+    Value以"0"/"1"字符串保存，长度不变，因此直接在原位置修改，不需要重建复合文档
+    :return: 修改后的.bin字节
+    """
+    offsets = _cfb_stream_offsets(bin_data, 'contents')
+    contents = bytes(bin_data[o] for o in offsets)
+    located = _locate_morph_value(contents)
+    if located is None:
+        raise ValueError("选项按钮未保存Value属性，无法直接修改")
+    offset, length, compressed = located
+    new_raw = (b'1' if value else b'0') if compressed else ('1' if value else '0').encode('utf-16le')
+    if len(new_raw) != length:
+        raise ValueError(f"选项按钮Value长度({length})不是单个字符，无法直接修改")
+
+    patched = bytearray(bin_data)
+    for i, byte in enumerate(new_raw):
+        patched[offsets[offset + i]] = byte
+    return bytes(patched)
+
+
+# ---------------------------------------------------------------------------
+# document.xml 表格定位与单元格改写
+# ---------------------------------------------------------------------------
+
+def _scan_tables(document_xml):
+    """
+    扫描document.xml中的顶层表格
+    单元格编号与Word的 table.Cell(row, col) 一致：每个 w:tc 计为一列（gridSpan/vMerge 不展开）
+    :return: 表格列表，每个表格为行列表，每行为单元格 (起始偏移, 结束偏移) 列表
+    """
+    tables = []
+    depth = 0
+    cell_start = None
+    for match in _TABLE_TAG_RE.finditer(document_xml):
+        closing, tag, self_closing = match.group(1), match.group(2), match.group(3)
+        if self_closing:
+            continue
+        if tag == 'tbl':
+            if closing:
+                depth -= 1
+            else:
+                depth += 1
+                if depth == 1:
+                    tables.append([])
+            continue
+        if depth != 1:
+            continue
+        if tag == 'tr' and not closing:
+            tables[-1].append([])
+        elif tag == 'tc':
+            if closing:
+                tables[-1][-1].append((cell_start, match.end()))
+            else:
+                cell_start = match.start()
+    return tables
+
+
+def _split_cell(cell_xml):
+    """把单元格拆分为 (开始标签, tcPr, 内容)"""
+    open_tag = re.match(r'<w:tc\b[^>]*>', cell_xml).group(0)
+    inner = cell_xml[len(open_tag):-len('</w:tc>')]
+    tc_pr = ''
+    match = re.match(r'<w:tcPr\s*/>|<w:tcPr>.*?</w:tcPr>', inner, re.S)
+    if match:
+        tc_pr = match.group(0)
+        inner = inner[match.end():]
+    return open_tag, tc_pr, inner
+
+
+def _insert_child(parent_xml, parent_tag, child_xml, child_tag, followers):
+    """
+    在属性元素（pPr/tcPr）中设置子元素，按schema顺序插入到 followers 中第一个出现的元素之前
+    """
+    existing = re.search(rf'<w:{child_tag}\b[^>]*?/>', parent_xml)
+    if existing:
+        return parent_xml[:existing.start()] + child_xml + parent_xml[existing.end():]
+    if not parent_xml:
+        return f'<w:{parent_tag}>{child_xml}</w:{parent_tag}>'
+    if parent_xml.endswith('/>'):
+        return f'<w:{parent_tag}>{child_xml}</w:{parent_tag}>'
+    position = parent_xml.rfind(f'</w:{parent_tag}>')
+    for tag in followers:
+        match = re.search(rf'<w:{tag}(?=[\s/>])', parent_xml)
+        if match and match.start() < position:
+            position = match.start()
+    return parent_xml[:position] + child_xml + parent_xml[position:]
+
+
+def _center_paragraph(p_pr):
+    return _insert_child(p_pr, 'pPr', '<w:jc w:val="center"/>', 'jc',
+                         ['textDirection', 'textAlignment', 'textboxTightWrap', 'outlineLvl',
+                          'divId', 'cnfStyle', 'rPr', 'sectPr', 'pPrChange'])
+
+
+def _center_cell(tc_pr):
+    return _insert_child(tc_pr, 'tcPr', '<w:vAlign w:val="center"/>', 'vAlign',
+                         ['hideMark', 'headers', 'cellIns', 'cellDel', 'cellMerge', 'tcPrChange'])
+
+
+def _text_runs(text, r_pr):
+    """把文本转换为run，换行转换为 w:br"""
+    pieces = []
+    for i, line in enumerate(re.split(r'\r\n|\r|\n', text)):
+        if i:
+            pieces.append('<w:br/>')
+        if line:
+            pieces.append(f'<w:t xml:space="preserve">{escape(line)}</w:t>')
+    return f'<w:r>{r_pr}{"".join(pieces)}</w:r>'
+
+
+def _image_run(r_pr, rel_id, drawing_id, name, width, height):
+    """生成浮动于段落左上角的图片run，对应COM中 ConvertToShape 后 Left=0、Top=0 的效果"""
+    cx = int(width * EMU_PER_POINT)
+    cy = int(height * EMU_PER_POINT)
+    return (
+        f'<w:r>{r_pr}<w:drawing>'
+        f'<wp:anchor distT="0" distB="0" distL="114300" distR="114300" simplePos="0" '
+        f'relativeHeight="{251659264 + drawing_id}" behindDoc="0" locked="0" layoutInCell="1" allowOverlap="1">'
+        f'<wp:simplePos x="0" y="0"/>'
+        f'<wp:positionH relativeFrom="column"><wp:posOffset>0</wp:posOffset></wp:positionH>'
+        f'<wp:positionV relativeFrom="paragraph"><wp:posOffset>0</wp:posOffset></wp:positionV>'
+        f'<wp:extent cx="{cx}" cy="{cy}"/><wp:effectExtent l="0" t="0" r="0" b="0"/><wp:wrapNone/>'
+        f'<wp:docPr id="{drawing_id}" name={quoteattr(name)}/>'
+        f'<wp:cNvGraphicFramePr><a:graphicFrameLocks xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+        f'<a:graphic xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+        f'<a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<pic:pic xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<pic:nvPicPr><pic:cNvPr id="{drawing_id}" name={quoteattr(name)}/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip r:embed="{rel_id}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+        f'<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+        f'</pic:pic></a:graphicData></a:graphic></wp:anchor></w:drawing></w:r>'
+    )
+
+
+def _rebuild_cell(cell_xml, text=None, images=()):
+    """
+    按待写入的文本和图片重建单元格XML
+    写入文本时与 cell.Range.Text 一致：单元格只保留第一段，沿用其段落格式和第一个run的格式
+    """
+    open_tag, tc_pr, inner = _split_cell(cell_xml)
+    match = _PARAGRAPH_RE.search(inner)
+    paragraph = match.group(0) if match else '<w:p/>'
+
+    if paragraph.endswith('/>') and not paragraph.endswith('</w:p>'):
+        p_open, p_body = paragraph[:-2] + '>', ''
+    else:
+        p_open = re.match(r'<w:p\b[^>]*>', paragraph).group(0)
+        p_body = paragraph[len(p_open):-len('</w:p>')]
+
+    p_pr = ''
+    pr_match = re.match(r'<w:pPr\s*/>|<w:pPr>.*?</w:pPr>', p_body, re.S)
+    if pr_match:
+        p_pr = pr_match.group(0)
+        p_body = p_body[pr_match.end():]
+
+    # run格式：优先使用第一个run的格式，否则使用段落标记的格式
+    r_pr = ''
+    run_match = re.search(r'<w:r\b[^>]*>\s*(<w:rPr>.*?</w:rPr>)', p_body, re.S)
+    if run_match:
+        r_pr = run_match.group(1)
+    else:
+        mark_match = re.search(r'<w:rPr>.*?</w:rPr>', p_pr, re.S)
+        if mark_match:
+            r_pr = mark_match.group(0)
+
+    body = p_body if text is None else _text_runs(text, r_pr)
+    if images:
+        p_pr = _center_paragraph(p_pr)
+        tc_pr = _center_cell(tc_pr)
+        body += ''.join(_image_run(r_pr, *image) for image in images)
+
+    if text is None and not images:
+        return cell_xml
+    return f'{open_tag}{tc_pr}{p_open}{p_pr}{body}</w:p></w:tc>'
+
+
+def _cell_plain_text(cell_xml):
+    """提取单元格纯文本（用于校验和日志）"""
+    text = []
+    for match in re.finditer(r'<w:t(?:\s[^>]*)?>([^<]*)</w:t>|<w:br\s*/>|</w:p>', cell_xml):
+        if match.group(1) is not None:
+            text.append(match.group(1))
+        elif match.group(0).startswith('<w:br'):
+            text.append('\n')
+        else:
+            text.append('\r')
+    value = ''.join(text).rstrip('\r')
+    return value.replace('&lt;', '<').replace('&gt;', '>').replace('&quot;', '"').replace('&apos;', "'").replace('&amp;', '&')
+
+
+def scan_activex_positions_docx(source):
+    """
+    直接解析 document.xml 查找每行中第一个包含ActiveX控件的单元格，不需要Word
+    列号与 table.Cell(row, col) 一致：横向合并（gridSpan）的单元格计为一列，纵向合并（vMerge）的单元格每行各计一列
+    :param source: .docx文件路径或文件内容字节
+    :return: 与 activex_config.json 中模板配置相同的结构 {"table_N": {"行号": {"row": 行号, "column": 列号}}}
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with zipfile.ZipFile(source) as package:
+        document_xml = package.read(DOCUMENT_PART).decode('utf-8')
+
+    positions = {}
+    for table_index, rows in enumerate(_scan_tables(document_xml)):
+        table_positions = positions[f"table_{table_index}"] = {}
+        for row, cells in enumerate(rows, start=1):
+            for col, (start, end) in enumerate(cells, start=1):
+                if _OLE_OBJECT_RE.search(document_xml, start, end):
+                    table_positions[str(row)] = {"row": row, "column": col}
+                    break
+    return positions
+
+
+# ---------------------------------------------------------------------------
+# .docx包写入：未修改的部件直接复制压缩后的原始数据，不解压也不重新压缩
+# ---------------------------------------------------------------------------
+
+_ZIP_LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+_ZIP_CENTRAL_HEADER = struct.Struct('<4sHHHHHHIIIHHHHHII')
+_ZIP_END_RECORD = struct.Struct('<4sHHHHIIH')
+_ZIP_UTF8_FLAG = 0x800
+_ZIP_MAX_SIZE = 0xFFFFFFFF
+_ZIP_MAX_ENTRIES = 0xFFFF
+# 新写入部件的修改时间，与Word保存的.docx一致
+_ZIP_DEFAULT_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _read_raw_member(data, info):
+    """
+    读取zip成员压缩后的原始数据（不解压）
+    :param data: zip包内容（bytes 或 memoryview）
+    :param info: zipfile.ZipInfo
+    """
+    offset = info.header_offset
+    if bytes(data[offset:offset + 4]) != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"部件 {info.filename} 的本地文件头损坏")
+    name_length, extra_length = struct.unpack_from('<HH', data, offset + 26)
+    start = offset + _ZIP_LOCAL_HEADER.size + name_length + extra_length
+    raw = data[start:start + info.compress_size]
+    if len(raw) != info.compress_size:
+        raise zipfile.BadZipFile(f"部件 {info.filename} 的数据不完整")
+    return raw
+
+
+def _dos_date_time(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (max(year, 1980) - 1980) << 9 | month << 5 | day, hour << 11 | minute << 5 | second // 2
+
+
+class _PackageWriter:
+    """
+    顺序写入zip包：write_raw 复制原有部件的压缩数据，write 写入新内容，close 写入中央目录
+    .docx体积很小，不支持zip64
+    """
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._offset = 0
+        self._entries = []
+
+    def _add(self, name, method, crc, compress_size, file_size, date_time, raw):
+        encoded_name = name.encode('ascii') if name.isascii() else name.encode('utf-8')
+        flags = 0 if name.isascii() else _ZIP_UTF8_FLAG
+        if (compress_size > _ZIP_MAX_SIZE or file_size > _ZIP_MAX_SIZE or self._offset > _ZIP_MAX_SIZE
+                or len(self._entries) >= _ZIP_MAX_ENTRIES):
+            raise ValueError("文档过大，不支持写入")
+        version = 20 if method == zipfile.ZIP_DEFLATED else 10
+        dos_date, dos_time = _dos_date_time(date_time)
+        header = _ZIP_LOCAL_HEADER.pack(b'PK\x03\x04', version, flags, method, dos_time, dos_date,
+                                        crc, compress_size, file_size, len(encoded_name), 0)
+        self._entries.append((encoded_name, version, flags, method, dos_time, dos_date,
+                              crc, compress_size, file_size, self._offset))
+        self._fp.write(header)
+        self._fp.write(encoded_name)
+        self._fp.write(raw)
+        self._offset += len(header) + len(encoded_name) + len(raw)
+
+    def write_raw(self, info, raw):
+        """复制原有部件的压缩数据，CRC和大小沿用原值"""
+        self._add(info.filename, info.compress_type, info.CRC, info.compress_size, info.file_size,
+                  info.date_time, raw)
+
+    def write(self, name, data, compress=True, date_time=_ZIP_DEFAULT_DATE_TIME):
+        """
+        写入新内容
+        :param compress: 是否压缩，图片等已压缩的数据直接存储
+        """
+        if compress:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            raw = compressor.compress(data) + compressor.flush()
+            method = zipfile.ZIP_DEFLATED
+        else:
+            raw, method = data, zipfile.ZIP_STORED
+        self._add(name, method, zlib.crc32(data), len(raw), len(data), date_time, raw)
+
+    def close(self):
+        directory_offset = self._offset
+        directory_size = 0
+        for (encoded_name, version, flags, method, dos_time, dos_date,
+             crc, compress_size, file_size, offset) in self._entries:
+            header = _ZIP_CENTRAL_HEADER.pack(b'PK\x01\x02', version, version, flags, method, dos_time, dos_date,
+                                              crc, compress_size, file_size, len(encoded_name), 0, 0, 0, 0, 0, offset)
+            self._fp.write(header)
+            self._fp.write(encoded_name)
+            directory_size += len(header) + len(encoded_name)
+        self._fp.write(_ZIP_END_RECORD.pack(b'PK\x05\x06', 0, 0, len(self._entries), len(self._entries),
+                                            directory_size, directory_offset, 0))
+
+
+class DocxChecklist:
+    """
+    基于OOXML直接编辑的检查清单文档
+    表格索引从0开始，行列索引从1开始，与COM中 word_doc.Tables[i].Cell(row, col) 保持一致
+    只改写需要修改的部件（document.xml、选项按钮.bin、rels、[Content_Types].xml、新增图片），其余部件原样写回
+    """
+
+    def __init__(self, source):
+        """
+        :param source: .docx文件路径或文件内容字节
+        """
+        if isinstance(source, (bytes, bytearray)):
+            data = bytes(source)
+        else:
+            with open(source, 'rb') as f:
+                data = f.read()
+
+        # 部件按需解压，保存时未修改的部件直接复制压缩数据
+        self._data = data
+        self._package = zipfile.ZipFile(io.BytesIO(data))
+        self._infos = {info.filename: info for info in self._package.infolist()}
+        self._names = list(self._infos)
+        self._parts = {}
+
+        if DOCUMENT_PART not in self._infos:
+            raise ValueError("文档中没有找到 word/document.xml")
+
+        self._document_xml = self._read_part(DOCUMENT_PART).decode('utf-8')
+        self._tables = _scan_tables(self._document_xml)
+        self._rels_xml = self._read_part(DOCUMENT_RELS_PART).decode('utf-8')
+        self._relationships = self._parse_relationships(self._rels_xml)
+        self._cell_edits = {}
+        self._changed_parts = {}
+        self._new_parts = {}
+        # 图片内容哈希 -> 关系ID
+        self._image_rel_ids = {}
+        self._next_drawing_id = max(
+            [int(x) for x in re.findall(r'<wp:docPr\b[^>]*?\bid="(\d+)"', self._document_xml)] + [0]
+        ) + 1
+
+    def _read_part(self, part_name, default=b''):
+        """读取并缓存解压后的部件内容，部件不存在时返回default"""
+        data = self._parts.get(part_name)
+        if data is None:
+            if part_name not in self._infos:
+                return default
+            data = self._parts[part_name] = self._package.read(part_name)
+        return data
+
+    def copy(self):
+        """
+        复制一个未修改的文档：共用原始数据和解析结果，修改互不影响
+        用于同一模板填写多个检查清单，模板只解析一次
+        """
+        if self._cell_edits or self._changed_parts or self._new_parts:
+            raise ValueError("只能复制未修改的文档")
+        document = copy.copy(self)
+        document._relationships = dict(self._relationships)
+        document._cell_edits = {}
+        document._changed_parts = {}
+        document._new_parts = {}
+        document._image_rel_ids = {}
+        return document
+
+    @staticmethod
+    def _parse_relationships(rels_xml):
+        relationships = {}
+        for match in _RELATIONSHIP_RE.finditer(rels_xml):
+            attrs = dict(re.findall(r'(\w+)="([^"]*)"', match.group(0)))
+            if 'Id' in attrs:
+                relationships[attrs['Id']] = attrs
+        return relationships
+
+    # ---- 表格结构 ----
+
+    @property
+    def table_count(self):
+        return len(self._tables)
+
+    def row_count(self, table_index):
+        return len(self._tables[table_index])
+
+    def cell_count(self, table_index, row):
+        return len(self._tables[table_index][row - 1])
+
+    def _cell_span(self, table_index, row, col):
+        try:
+            if row < 1 or col < 1:
+                raise IndexError
+            return self._tables[table_index][row - 1][col - 1]
+        except IndexError:
+            raise IndexError(f"表格{table_index}中不存在单元格({row},{col})")
+
+    def _cell_xml(self, table_index, row, col):
+        start, end = self._cell_span(table_index, row, col)
+        return self._document_xml[start:end]
+
+    def _cell_edit(self, table_index, row, col):
+        self._cell_span(table_index, row, col)
+        return self._cell_edits.setdefault((table_index, row, col), {'text': None, 'images': []})
+
+    # ---- 文本与图片 ----
+
+    def get_cell_text(self, table_index, row, col):
+        """获取单元格文本（包含尚未保存的修改）"""
+        edit = self._cell_edits.get((table_index, row, col))
+        if edit and edit['text'] is not None:
+            return edit['text']
+        return _cell_plain_text(self._cell_xml(table_index, row, col))
+
+    def set_cell_text(self, table_index, row, col, text):
+        """设置单元格文本，等价于 cell.Range.Text = text"""
+        edit = self._cell_edit(table_index, row, col)
+        edit['text'] = '' if text is None else str(text)
+        edit['images'] = []
+
+    def add_cell_image(self, table_index, row, col, image_path, width=80, height=20):
+        """
+        在单元格内插入浮动图片
+        :param image_path: 图片文件路径
+        :param width: 图片宽度（磅）
+        :param height: 图片高度（磅）
+        """
+        if not os.path.exists(image_path):
+            raise FileNotFoundError(f"Image file not found: {image_path}")
+        extension = Path(image_path).suffix.lower().lstrip('.')
+        if extension not in IMAGE_CONTENT_TYPES:
+            raise ValueError(f"不支持的图片格式: {image_path}")
+        with open(image_path, 'rb') as f:
+            image_data = f.read()
+        self.add_cell_image_data(table_index, row, col, image_data, extension, width, height)
+
+    def add_cell_image_data(self, table_index, row, col, image_data, extension, width=80, height=20):
+        """
+        在单元格内插入浮动图片，内容相同的图片共用一个图片部件
+        :param image_data: 图片内容
+        :param extension: 图片格式（不含"."的扩展名）
+        """
+        if extension not in IMAGE_CONTENT_TYPES:
+            raise ValueError(f"不支持的图片格式: {extension}")
+        edit = self._cell_edit(table_index, row, col)
+        digest = hashlib.sha1(image_data).hexdigest()
+        rel_id = self._image_rel_ids.get(digest)
+        if rel_id is None:
+            rel_id = self._image_rel_ids[digest] = self._add_image_part(image_data, extension)
+        drawing_id = self._next_drawing_id
+        self._next_drawing_id += 1
+        edit['images'].append((rel_id, drawing_id, f"Picture {drawing_id}", width, height))
+
+    def _add_image_part(self, image_data, extension):
+        """新增图片部件和对应的关系，返回关系ID"""
+        existing = set(self._names) | set(self._new_parts)
+        index = 1
+        while f'word/media/sign{index}.{extension}' in existing:
+            index += 1
+        part_name = f'word/media/sign{index}.{extension}'
+        self._new_parts[part_name] = image_data
+
+        rel_index = max([int(m) for m in re.findall(r'^rId(\d+)$', '\n'.join(self._relationships), re.M)] + [0]) + 1
+        rel_id = f'rId{rel_index}'
+        self._relationships[rel_id] = {'Id': rel_id, 'Type': REL_TYPE_IMAGE, 'Target': f'media/sign{index}.{extension}'}
+        relationship = f'<Relationship Id="{rel_id}" Type="{REL_TYPE_IMAGE}" Target="media/sign{index}.{extension}"/>'
+        self._rels_xml = self._rels_xml.replace('</Relationships>', relationship + '</Relationships>')
+        self._changed_parts[DOCUMENT_RELS_PART] = None
+
+        content_types = self._changed_parts.get(CONTENT_TYPES_PART) or self._read_part(CONTENT_TYPES_PART)
+        if not re.search(rf'<Default\b[^>]*\bExtension="{extension}"', content_types.decode('utf-8'), re.I):
+            default = f'<Default Extension="{extension}" ContentType="{IMAGE_CONTENT_TYPES[extension]}"/>'
+            content_types = re.sub(rb'(<Types\b[^>]*>)', lambda m: m.group(1) + default.encode('utf-8'),
+                                   content_types, count=1)
+            self._changed_parts[CONTENT_TYPES_PART] = content_types
+        return rel_id
+
+    # ---- ActiveX 选项按钮 ----
+
+    def _resolve_part(self, base_part, target):
+        return posixpath.normpath(posixpath.join(posixpath.dirname(base_part), target))
+
+    def _control_binary_part(self, control_rel_id):
+        """根据 w:control 的 r:id 找到选项按钮的.bin部件"""
+        relationship = self._relationships.get(control_rel_id)
+        if not relationship or relationship.get('Type') != REL_TYPE_CONTROL:
+            raise ValueError(f"未找到控件关系: {control_rel_id}")
+        control_part = self._resolve_part(DOCUMENT_PART, relationship['Target'])
+        rels_part = posixpath.join(posixpath.dirname(control_part), '_rels',
+                                   posixpath.basename(control_part) + '.rels')
+        rels = self._parse_relationships(self._read_part(rels_part).decode('utf-8'))
+        for attrs in rels.values():
+            if attrs.get('Type') == REL_TYPE_ACTIVEX_BINARY:
+                return self._resolve_part(control_part, attrs['Target'])
+        raise ValueError(f"控件 {control_part} 没有二进制数据部件")
+
+    def get_cell_controls(self, table_index, row, col):
+        """获取单元格中ActiveX控件对应的.bin部件列表（按文档顺序）"""
+        cell_xml = self._cell_xml(table_index, row, col)
+        return [self._control_binary_part(rel_id) for rel_id in _CONTROL_RE.findall(cell_xml)]
+
+    def find_option_column(self, table_index, row):
+        """在指定行中查找包含ActiveX控件的单元格，返回列号，没有找到返回None"""
+        if row < 1 or row > self.row_count(table_index):
+            log_error(f"Invalid row index: {row}. Must be between 1 and {self.row_count(table_index)}", "WORD")
+            return None
+        for col in range(1, self.cell_count(table_index, row) + 1):
+            if _CONTROL_RE.search(self._cell_xml(table_index, row, col)):
+                return col
+        return None
+
+    def _part_data(self, part_name):
+        data = self._changed_parts.get(part_name)
+        if data is not None:
+            return data
+        if part_name not in self._infos:
+            raise KeyError(f"文档中没有部件 {part_name}")
+        return self._read_part(part_name)
+
+    def get_option_value(self, part_name):
+        return read_option_value(self._part_data(part_name))
+
+    def set_option_value(self, part_name, value):
+        """设置单个选项按钮的值，值未变化时不修改部件"""
+        data = self._part_data(part_name)
+        if read_option_value(data) == bool(value):
+            return False
+        self._changed_parts[part_name] = write_option_value(data, value)
+        return True
+
+    def set_option_cell(self, table_index, row, col, value):
+        """
+        设置选项单元格：第一个按钮为"是"，第二个按钮为"否"，与 set_option_cell_optimized 一致
+        """
+        controls = self.get_cell_controls(table_index, row, col)
+        if len(controls) < 2:
+            raise ValueError(f"单元格({row},{col})中ActiveX控件数量不足")
+        self.set_option_value(controls[0], value)
+        self.set_option_value(controls[1], not value)
+
+    # ---- 保存 ----
+
+    def _render_document(self):
+        if not self._cell_edits:
+            return self._document_xml
+        pieces = []
+        cursor = 0
+        edits = sorted(self._cell_edits.items(), key=lambda item: self._cell_span(*item[0])[0])
+        for (table_index, row, col), edit in edits:
+            start, end = self._cell_span(table_index, row, col)
+            pieces.append(self._document_xml[cursor:start])
+            pieces.append(_rebuild_cell(self._document_xml[start:end], edit['text'], edit['images']))
+            cursor = end
+        pieces.append(self._document_xml[cursor:])
+        return ''.join(pieces)
+
+    def _changed_part_data(self, name):
+        """部件修改后的内容，未修改时返回None"""
+        if name == DOCUMENT_PART:
+            return self._render_document().encode('utf-8') if self._cell_edits else None
+        if name == DOCUMENT_RELS_PART:
+            return self._rels_xml.encode('utf-8') if name in self._changed_parts else None
+        return self._changed_parts.get(name)
+
+    def write_to(self, fp):
+        """
+        将修改后的.docx写入文件对象
+        只压缩修改过的部件和新增部件，其余部件按原有顺序直接复制压缩数据
+        """
+        writer = _PackageWriter(fp)
+        source = memoryview(self._data)
+        try:
+            for name, info in self._infos.items():
+                data = self._changed_part_data(name)
+                if data is None:
+                    writer.write_raw(info, _read_raw_member(source, info))
+                else:
+                    writer.write(name, data, date_time=info.date_time)
+            for name, data in self._new_parts.items():
+                # 图片本身已经压缩，直接存储
+                writer.write(name, data, compress=False)
+            writer.close()
+        finally:
+            source.release()
+
+    def to_bytes(self):
+        """生成修改后的.docx内容"""
+        output = io.BytesIO()
+        self.write_to(output)
+        return output.getvalue()
+
+    def save(self, path):
+        """保存到指定路径（流式写入同一文件夹的临时文件，完成后替换目标文件）"""
+        write_file_atomic(path, self.write_to)
+
+
+# ---------------------------------------------------------------------------
+# 检查清单填写（与 word_processor 中的COM流程共用填写计划）
+# ---------------------------------------------------------------------------
+
+def _get_option_column(doc, op):
+    """选项所在列：使用填写计划中的位置，位置缺失或不匹配时在行内查找"""
+    if op.col is not None:
+        if 1 <= op.col <= doc.cell_count(op.table_index, op.row) and \
+                len(doc.get_cell_controls(op.table_index, op.row, op.col)) >= 2:
+            return op.col
+        log_warning(f"配置位置({op.row},{op.col})没有ActiveX控件，在行内查找", "WORD")
+    return doc.find_option_column(op.table_index, op.row)
+
+
+def apply_fill_plan_docx(doc, plan, task, folder_statuses):
+    """
+    按填写计划填写检查清单（对应 word_processor.apply_fill_plan）
+    :param plan: get_fill_plan 编译的填写计划
+    :param folder_statuses: 各表格文件夹状态（见 detect_checklist_folders_status）
+    """
+    today = date.today().strftime("%Y-%m-%d")
+    for op in plan.ops:
+        if op.op == OP_OPTION:
+            value = plan.option_value(op, folder_statuses[op.table_index])
+            if value is None:
+                continue
+            col = _get_option_column(doc, op)
+            if col is None:
+                raise Exception(f"No ActiveX control found in row {op.row} for folder: {op.folder}, please check if the row setting is correct or if the file is damaged.")
+            doc.set_option_cell(op.table_index, op.row, col, value)
+        elif op.op == OP_IMAGE:
+            image = signature_cache.get_signature(task[op.field], width=80, height=20)
+            doc.add_cell_image_data(op.table_index, op.row, op.col, image.data, image.extension, width=80, height=20)
+        elif op.op == OP_DATE:
+            doc.set_cell_text(op.table_index, op.row, op.col, today)
+        else:
+            doc.set_cell_text(op.table_index, op.row, op.col, task[op.field])
+
+
+def set_checklist_docx(task, target_path, team, subFolderConfig, use_config=True, snapshot=None, folder_statuses=None):
+    """
+    不经过Word，直接编辑.docx填写检查清单
+    :param folder_statuses: 已检测好的各表格文件夹状态（见 detect_checklist_folders_status），为None时在填写时检测
+    """
+    log_debug(f"subFolderConfig length: {len(subFolderConfig)}", "WORD")
+    plan = get_fill_plan(team, subFolderConfig, use_config)
+    if snapshot is None:
+        snapshot = JobFolderSnapshot(target_path)
+    target = get_checklist_source(target_path, snapshot)
+    log_info(f"检查清单路径: {target.path}", "WORD")
+    if not str(target.path).lower().endswith('.docx'):
+        raise ValueError(f"docx引擎只支持.docx格式的检查清单: {target.path}")
+
+    # 覆盖模式下从内存中的模板填写，一次写入新的检查清单，不先复制模板再修改
+    source_path = target.template_path or target.path
+    try:
+        if target.template_path is not None:
+            doc = template_store.open_document(target.template_path)
+        else:
+            doc = DocxChecklist(target.path)
+    except zipfile.BadZipFile:
+        raise ValueError(f"检查清单文件已损坏或不是有效的.docx文件: {source_path}")
+
+    if doc.table_count == 0:
+        raise ValueError("文档中没有找到表格")
+    if doc.table_count < plan.table_count:
+        raise ValueError(f"文档中的表格数量({doc.table_count})少于配置要求的数量({plan.table_count})")
+
+    log_info("使用docx引擎处理检查清单", "WORD")
+    if folder_statuses is None and plan.option_configs:
+        folder_statuses = detect_checklist_folders_status(target_path, team, subFolderConfig, snapshot)
+    log_debug(f"检测文件夹状态: {folder_statuses}", "WORD")
+    apply_fill_plan_docx(doc, plan, task, folder_statuses)
+
+    try:
+        publish_checklist(target, doc.save, snapshot)
+    except PermissionError:
+        log_error("你没有写入权限", "WORD")
+        raise PermissionError("你没有写入权限")
+    log_info("检查清单保存成功", "WORD")
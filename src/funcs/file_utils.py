@@ -2,27 +2,38 @@
 文件和文件夹工具模块
 负责文件夹检测、文件查找等操作
 """
+import hashlib
+import json
 import os
-import glob
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from numpy import number
 from src.config.config_manager import ConfigManager, get_system_config, config_manager
-from src.logger.logger import log_info, log_warning
+from src.data.folder_status_cache import folder_status_cache
+from src.funcs.folder_snapshot import JobFolderSnapshot, ScanRecord, get_folder_scan_config, scan_folder_has_file
+from src.logger.logger import log_info, log_warning, log_debug
 
-def folder_precheck(target_folder:str,team:str)-> bool:
+# 每个共享（盘符或 \\\\server\\share）一个信号量，限制同一共享上同时检测的子文件夹数
+_share_semaphores = {}
+_share_semaphores_lock = threading.Lock()
+
+def folder_precheck(target_folder:str,team:str, snapshot:JobFolderSnapshot=None)-> bool:
     """
     检查目标文件夹是否符合规则
     :param target_folder: 目标文件夹路径
     :param team: 团队名称
+    :param snapshot: 项目文件夹目录快照，为None时新建
     :return: 如果符合规则返回True，否则返回False
     """
+    if snapshot is None:
+        snapshot = JobFolderSnapshot(target_folder)
     # 检查目标文件夹是否存在,检查目标文件夹是否为目录
-    if not os.path.exists(target_folder) or not os.path.isdir(target_folder):
+    if not snapshot.exists():
         log_warning(f"目标文件夹 {target_folder} 不存在，或该文件夹不是目录", "FOLDER")
         return False
-    # 检查目标文件夹下是否有文件名包含checklist的word文档
-    checklist_files = glob.glob(os.path.join(target_folder, '*checklist*.doc*'))
-    # 过滤掉隐藏文件和缓存文件
-    checklist_files = [f for f in checklist_files if not os.path.basename(f).startswith(('~$', '.', '__'))]
+    # 检查目标文件夹下是否有文件名包含checklist的word文档（已过滤掉隐藏文件和缓存文件）
+    checklist_files = snapshot.checklist_files()
     # if not checklist_files:
     #     log_warning(f"目标文件夹 {target_folder} 下没有找到包含 'checklist' 的 Word 文档", "FOLDER")
     #     return False
@@ -75,93 +86,182 @@ def _folder_name_check(target_folder:str, team:str,folder_configs:dict)-> bool:
     
     return True
 
-def detect_folder_has_file(folder_path):
+def detect_folder_has_file(folder_path, max_depth=None, max_entries=None):
     """
     在folder_path以及子文件夹中查找是否有文件，如果有，返回True，否则返回False
+    锁文件（~$*）、Thumbs.db、desktop.ini 不算作文件，深度和访问数量上限见 system.json 的 folder_scan
+    """
+    return scan_folder_has_file(folder_path, max_depth, max_entries)
+
+
+def _get_share_key(path):
+    """文件所在的共享/盘符（如 \\\\server\\share 或 D:），用于限制同一共享上的并发数"""
+    return os.path.normcase(os.path.splitdrive(os.path.abspath(path))[0])
+
+
+def _get_share_semaphore(path, max_workers_per_share):
+    """获取共享对应的信号量，同一共享上所有项目共用"""
+    share_key = (_get_share_key(path), max_workers_per_share)
+    with _share_semaphores_lock:
+        semaphore = _share_semaphores.get(share_key)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max_workers_per_share)
+            _share_semaphores[share_key] = semaphore
+    return semaphore
+
+
+def _get_status_config_hash(team, option, file_matchers):
+    """与子文件夹检测结果相关的配置（选项、文件映射规则、扫描限制）的哈希值"""
+    patterns = {key: file_matchers[key].patterns for key in option if key in file_matchers} \
+        if isinstance(option, dict) else None
+    payload = [team, option, patterns, get_folder_scan_config()]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _get_status_with_cache(snapshot, sub_folder_name, team, option, file_matchers, logs, detect):
+    """
+    优先使用持久化缓存中的子文件夹检测结果，缓存无效或要求强制重新扫描时重新检测并更新缓存
+    :param detect: 检测函数，参数为记录访问过的目录的 ScanRecord，返回检测结果
+    """
+    sub_folder_path = snapshot.path(sub_folder_name)
+    config_hash = _get_status_config_hash(team, option, file_matchers)
+    if not snapshot.force_rescan:
+        status = folder_status_cache.get(sub_folder_path, config_hash)
+        if status is not None:
+            logs.append((log_debug, f"子文件夹未变化，使用缓存结果: {sub_folder_path}"))
+            return status
+    record = ScanRecord()
+    status = detect(record)
+    folder_status_cache.put(sub_folder_path, config_hash, record, status)
+    return status
+
+
+def _detect_sub_folder_status(working_folder_path, team, sub_folder_name, option, snapshot, file_matchers):
+    """
+    检测单个子文件夹的状态
+    日志不直接输出，而是收集后由调用方按子文件夹顺序输出，保证并发检测时日志顺序不变
+    :return: (检测结果, [(日志函数, 日志内容)])，检测结果为None时表示不写入结果
     """
-    for root, dirs, files in os.walk(folder_path):
-        if files:
-            return True
-    return False
+    logs = []
+    sub_folder_path = os.path.join(working_folder_path, sub_folder_name)
+    if team == 'PPT':
+        logs.append((log_info, f"检测文件夹: {sub_folder_path}"))
+        if not snapshot.exists(sub_folder_name):
+            raise FileNotFoundError(f"{sub_folder_name} folder not found")
+        status = _get_status_with_cache(
+            snapshot, sub_folder_name, team, option, file_matchers, logs,
+            lambda record: snapshot.has_file(sub_folder_name, record=record)
+        )
+        return status, logs
+
+    logs.append((log_info, f"检测文件夹: {sub_folder_path}: {option}"))
+    sub_folder_exist = snapshot.exists(sub_folder_name)
+    if isinstance(option, int):
+        # 如果option是数字，表示需要检测的文件数量
+        logs.append((log_info, f"当前option是数字: {option}"))
+        if not sub_folder_exist:
+            return False, logs
+        status = _get_status_with_cache(
+            snapshot, sub_folder_name, team, option, file_matchers, logs,
+            lambda record: snapshot.has_file(sub_folder_name, record=record)
+        )
+        return status, logs
+    if isinstance(option, dict):
+        logs.append((log_info, f"当前option是字典: {option}"))
+        # 如果option是字典，遍历字典的每个key，在file_map中查找对应的文件名规则（已在加载配置时编译）
+        for key in option:
+            if key not in file_matchers:
+                logs.append((log_warning, f"在file_map中未找到键: {key}"))
+        if not sub_folder_exist:
+            return {key: False for key in option} or None, logs
+
+        def match_files(record):
+            # 在目录快照中对每个文件名做一次正则匹配
+            status = {
+                key: key in file_matchers and snapshot.match(sub_folder_name, file_matchers[key])
+                for key in option
+            }
+            record.add(snapshot.path(sub_folder_name), snapshot.listing_mtime(sub_folder_name))
+            return status
+
+        status = _get_status_with_cache(snapshot, sub_folder_name, team, option, file_matchers, logs, match_files)
+        return status or None, logs
+    # 如果option是其他类型，直接设置为False
+    logs.append((log_warning, f"当前option不是数字或字典: {option}"))
+    return False, logs
 
 
-def detect_folders_status(working_folder_path, team, options_config):
+def detect_folders_status(working_folder_path, team, options_config, snapshot=None):
     """
     检测工作文件夹中的子文件夹状态
+    system.json 的 folder_scan.max_workers 大于1时并发检测各子文件夹，结果和日志顺序与逐个检测一致
     :param working_folder_path: 工作文件夹路径
     :param team: 团队名称
     :param options_config: 选项配置
+    :param snapshot: 项目文件夹目录快照，为None时新建
     :return: 文件夹状态字典
     """
-    result = {}
-    if team == 'PPT':
-        for sub_folder_name in options_config.keys():
-            sub_folder_path = os.path.join(working_folder_path, sub_folder_name)
-            log_info(f"检测文件夹: {sub_folder_path}","FILE")
-            if not os.path.exists(sub_folder_path):
-                raise FileNotFoundError(f"{sub_folder_name} folder not found")
-            if detect_folder_has_file(sub_folder_path):
-                result[sub_folder_name] = True
-            else:
-                result[sub_folder_name] = False
-        if result == {}:
-            return None
+    if snapshot is None:
+        snapshot = JobFolderSnapshot(working_folder_path)
+    file_matchers = config_manager.get_file_matchers()
+    scan_config = get_system_config('folder_scan', {}) or {}
+    max_workers = min(scan_config.get('max_workers', 1), len(options_config))
+    max_workers_per_share = scan_config.get('max_workers_per_share', max_workers)
+
+    # 遍历options_config中的每个属性，见system.json中的subFolderConfig下的options
+    if max_workers > 1 and max_workers_per_share > 1:
+        # 先列出项目根目录，各线程共用
+        snapshot.exists()
+        semaphore = _get_share_semaphore(working_folder_path, max_workers_per_share)
+
+        def detect(sub_folder_name, option):
+            with semaphore:
+                return _detect_sub_folder_status(
+                    working_folder_path, team, sub_folder_name, option, snapshot, file_matchers
+                )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (sub_folder_name, executor.submit(detect, sub_folder_name, option))
+                for sub_folder_name, option in options_config.items()
+            ]
+            detections = [(sub_folder_name, future.result) for sub_folder_name, future in futures]
     else:
-        # 遍历options_config中的每个属性，见system.json中的subFolderConfig下的options
-        for sub_folder_name, option in options_config.items():
-            sub_folder_path = os.path.join(working_folder_path, sub_folder_name)
-            log_info(f"检测文件夹: {sub_folder_path}: {option}", "FILE")
-            sub_folder_exist = os.path.exists(sub_folder_path)
-            # if not sub_folder_exist:
-            #     print(f"{sub_folder_name} folder not found")
-            #     result[sub_folder_name] = False
-            if isinstance(option, int):
-                # 如果option是数字，表示需要检测的文件数量
-                log_info(f"当前option是数字: {option}", "FILE")
-                if not sub_folder_exist:
-                    result[sub_folder_name] = False
-                else:
-                    result[sub_folder_name] = detect_folder_has_file(sub_folder_path)
-            elif isinstance(option, dict):
-                log_info(f"当前option是字典: {option}","FILE")
-                # 如果option是字典，遍历字典的每个key，在file_map中查找对应的文件名规则
-                file_map = get_system_config('file_map')
-                
-                for key, value in option.items():
-                    if key in file_map:
-                        file_patterns = file_map[key]
-                        found_file = False
-                        if not sub_folder_exist:
-                            if result.get(sub_folder_name) is None:
-                                result[sub_folder_name] = {}
-                                result[sub_folder_name][key] = False
-                            else:
-                                result[sub_folder_name][key] = False
-                            continue
-                        # 遍历file_map中的文件名规则列表
-                        for pattern in file_patterns:
-                            if not pattern:  # 跳过空字符串
-                                continue
-                            # 使用glob模块查找符合规则的文件
-                            matching_files = glob.glob(os.path.join(sub_folder_path, pattern))
-                            if matching_files:
-                                found_file = True
-                                break
-                        if result.get(sub_folder_name) is None:
-                            result[sub_folder_name] = {}
-                            result[sub_folder_name][key] = found_file
-                        else:
-                            result[sub_folder_name][key] = found_file
-                    else:
-                        log_warning(f"在file_map中未找到键: {key}", "FILE")
-                        if result.get(sub_folder_name) is None:
-                            result[sub_folder_name] = {}
-                            result[sub_folder_name][key] = False
-                        else:
-                            result[sub_folder_name][key] = False
-            else:
-                # 如果option是其他类型，直接设置为False
-                log_warning(f"当前option不是数字或字典: {option}", "FILE")
-                result[sub_folder_name] = False
+        detections = [
+            (sub_folder_name, partial(_detect_sub_folder_status, working_folder_path, team,
+                                      sub_folder_name, option, snapshot, file_matchers))
+            for sub_folder_name, option in options_config.items()
+        ]
+
+    result = {}
+    for sub_folder_name, get_status in detections:
+        try:
+            status, logs = get_status()
+        except FileNotFoundError:
+            log_info(f"检测文件夹: {os.path.join(working_folder_path, sub_folder_name)}", "FILE")
+            raise
+        for log_func, message in logs:
+            log_func(message, "FILE")
+        if status is not None:
+            result[sub_folder_name] = status
+    if team == 'PPT' and result == {}:
+        return None
     log_info(f"检测结果: {result}", "FILE")
     return result
+
+
+def detect_checklist_folders_status(working_folder_path, team, sub_folder_config, snapshot=None):
+    """
+    检测检查清单所有表格需要的子文件夹状态，可在填写之前单独执行
+    :param sub_folder_config: 团队的 subFolderConfig 列表，每一项对应检查清单中的一个表格
+    :return: 与 sub_folder_config 一一对应的列表，没有 options 的表格为None
+    """
+    if snapshot is None:
+        snapshot = JobFolderSnapshot(working_folder_path)
+    folder_statuses = []
+    for item in sub_folder_config:
+        if item.get('options') is not None:
+            folder_statuses.append(detect_folders_status(working_folder_path, team, item['options'], snapshot))
+        else:
+            folder_statuses.append(None)
+    return folder_statuses
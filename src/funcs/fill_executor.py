@@ -0,0 +1,101 @@
+"""
+多进程检查清单填写模块
+每个工作进程拥有独立的填写引擎，主进程只传递可序列化的任务描述（任务字段、工作目录、子文件夹状态），
+填写结果返回主进程后再写入 data_manager
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config.config_manager import config_manager
+from src.funcs.task_utils import STATUS_COMPLETED, STATUS_FAILED, STATUS_NO_PERMISSION
+from src.logger.logger import log_error, log_info
+
+# 支持多进程填写的引擎：Word COM 共用同一个Word实例且填写前会结束所有Word进程，只能单进程填写
+PROCESS_ENGINES = ('docx',)
+
+
+def build_fill_job(resolved, team, engine):
+    """
+    将 resolve_task 的结果转换为可序列化的填写任务描述（目录快照不跨进程传递）
+    :param resolved: 已完成子文件夹检测的任务（见 scan_resolved_task）
+    """
+    return {
+        'task': dict(resolved['task']),
+        'target_path': resolved['target_path'],
+        'team': team,
+        'engine': engine,
+        'folder_statuses': resolved.get('folder_statuses')
+    }
+
+
+def _init_worker(user_config):
+    """工作进程初始化：使用主进程的用户配置（命令行可能在内存中覆盖了团队等配置）"""
+    for key, value in user_config.items():
+        config_manager.set_user_config(key, value)
+
+
+def run_fill_job(job):
+    """
+    在工作进程中填写一个检查清单
+    :param job: build_fill_job 生成的任务描述
+    :return: 包含 job_no、status、error 的字典
+    """
+    from src.funcs.word_processor import set_checklist
+
+    job_no = job['task']['job_no']
+    sub_folder_config = config_manager.get_subfolder_config(job['team'])
+    try:
+        set_checklist(job['task'], job['target_path'], job['team'], sub_folder_config, engine=job['engine'],
+                      folder_statuses=job['folder_statuses'])
+        return {'job_no': job_no, 'status': STATUS_COMPLETED, 'error': None}
+    except Exception as e:
+        status = STATUS_NO_PERMISSION if isinstance(e, PermissionError) else STATUS_FAILED
+        return {'job_no': job_no, 'status': status, 'error': str(e)}
+
+
+class FillExecutor:
+    """基于进程池的检查清单填写器，同时填写多个检查清单"""
+
+    def __init__(self, max_workers, engine='docx'):
+        """
+        :param max_workers: 工作进程数
+        :param engine: 填写引擎，必须是 PROCESS_ENGINES 之一
+        """
+        if engine not in PROCESS_ENGINES:
+            raise ValueError(f"填写引擎 {engine} 不支持多进程填写")
+        self.max_workers = max_workers
+        self.engine = engine
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(dict(config_manager.get_user_config() or {}),)
+        )
+        log_info(f"已启动 {max_workers} 个填写进程", "PIPELINE")
+
+    def submit(self, resolved, team):
+        """提交一个填写任务，返回 Future，结果为 run_fill_job 的返回值"""
+        return self._executor.submit(run_fill_job, build_fill_job(resolved, team, self.engine))
+
+    def fill(self, resolved, team):
+        """
+        填写一个检查清单并等待完成，结果写回 resolved['result']
+        :return: 更新了状态的任务结果
+        """
+        result = resolved['result']
+        try:
+            outcome = self.submit(resolved, team).result()
+        except Exception as e:
+            # 工作进程异常退出等情况
+            outcome = {'status': STATUS_FAILED, 'error': str(e)}
+        if outcome['error']:
+            log_error(f"{resolved['task']['job_no']}设置检查列表失败: {outcome['error']}")
+        result['status'] = outcome['status']
+        return result
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
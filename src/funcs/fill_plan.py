@@ -0,0 +1,219 @@
+"""
+检查清单填写计划模块
+每次运行按团队/模板把 subFolderConfig 和 activex_config.json 编译为一个扁平、有序的单元格操作列表，
+填写每个任务时直接执行编译好的计划，不再在循环中解析配置；配置错误在编译时集中报告
+"""
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from src.logger.logger import log_debug, log_warning
+
+# 单元格操作类型
+OP_TEXT = 'text'        # 写入任务字段
+OP_DATE = 'date'        # 写入当天日期
+OP_IMAGE = 'image'      # 插入签名图片
+OP_OPTION = 'option'    # 设置选项按钮（是/否）
+
+FIELD_OP_TYPES = (OP_TEXT, OP_DATE, OP_IMAGE)
+
+
+class FillPlanError(ValueError):
+    """子文件夹配置无法编译为填写计划"""
+
+
+class CellOp(NamedTuple):
+    """
+    一个单元格操作
+    table_index 从0开始；row、col 从1开始，选项操作的 col 为None时表示配置中没有位置，需要在行内查找；
+    field 为任务字段名（字段操作）；folder、key 为文件夹状态中的键（选项操作，PPT团队 key 为None）
+    """
+    table_index: int
+    row: int
+    col: Optional[int]
+    op: str
+    field: Optional[str] = None
+    folder: Optional[str] = None
+    key: Optional[str] = None
+
+
+class FillPlan:
+    """编译好的填写计划"""
+
+    def __init__(self, team: str, template_name: str, ops: List[CellOp], option_configs: Dict[int, Dict],
+                 table_count: int, source: Any = None):
+        """
+        :param ops: 按表格顺序排列的单元格操作，每个表格先字段后选项，选项按行号排序
+        :param option_configs: 各表格的选项配置，用于检测文件夹状态
+        :param table_count: 文档至少需要的表格数量
+        :param source: 编译时使用的子文件夹配置，用于判断计划是否需要重新编译
+        """
+        self.team = team
+        self.template_name = template_name
+        self.ops = tuple(ops)
+        self.option_configs = option_configs
+        self.table_count = table_count
+        self.source = source
+
+    @property
+    def field_ops(self) -> List[CellOp]:
+        return [op for op in self.ops if op.op != OP_OPTION]
+
+    @property
+    def option_ops(self) -> List[CellOp]:
+        return [op for op in self.ops if op.op == OP_OPTION]
+
+    def option_value(self, op: CellOp, folder_status: Any) -> Optional[bool]:
+        """
+        从表格的文件夹状态中取出选项操作的值
+        :return: 选项值，状态中没有对应项时返回None
+        """
+        if not isinstance(folder_status, dict) or op.folder not in folder_status:
+            log_warning(f"文件夹 {op.folder} 的状态未定义", "WORD")
+            return None
+        status = folder_status[op.folder]
+        if op.key is None:
+            return status
+        if not isinstance(status, dict) or op.key not in status:
+            log_warning(f"状态配置中缺少键 {op.key} 对于文件夹 {op.folder}", "WORD")
+            return None
+        return status[op.key]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可以保存为JSON的普通数据（不包含 source）"""
+        return {
+            'team': self.team,
+            'template_name': self.template_name,
+            'ops': [list(op) for op in self.ops],
+            'option_configs': [[table_index, config] for table_index, config in self.option_configs.items()],
+            'table_count': self.table_count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: Any = None) -> 'FillPlan':
+        """
+        从 to_dict 的结果重新构造填写计划
+        :param source: 调用方的子文件夹配置，用于之后判断计划是否需要重新编译
+        """
+        return cls(
+            data['team'], data['template_name'], [CellOp(*op) for op in data['ops']],
+            {table_index: config for table_index, config in data['option_configs']},
+            data['table_count'], source
+        )
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __repr__(self):
+        return f"FillPlan({self.team!r}, {self.template_name!r}, {len(self.ops)} ops)"
+
+
+def _check_indexes(indexes, location, errors):
+    if (not isinstance(indexes, (list, tuple)) or len(indexes) != 2
+            or not all(isinstance(index, int) and index >= 1 for index in indexes)):
+        errors.append(f"{location} 的 indexes 必须是两个从1开始的整数: {indexes}")
+        return None
+    return indexes[0], indexes[1]
+
+
+def _compile_fields(table_index, field_config, errors):
+    ops = []
+    if not field_config or not isinstance(field_config, dict):
+        errors.append(f"表格{table_index} 的 fields 必须是字典")
+        return ops
+    for field_name, field_value in field_config.items():
+        location = f"表格{table_index} 字段 {field_name}"
+        if not field_name or not field_value:
+            log_warning(f"字段 {field_name} 的值无效", "WORD")
+            continue
+        if isinstance(field_value, list):
+            for i, item in enumerate(field_value):
+                if not isinstance(item, dict):
+                    errors.append(f"{location}[{i}] 的配置格式错误")
+                    continue
+                position = _check_indexes(item.get('indexes'), f"{location}[{i}]", errors)
+                op_type = item.get('type')
+                if op_type not in FIELD_OP_TYPES:
+                    errors.append(f"{location}[{i}] 的类型 {op_type} 不被支持")
+                    continue
+                if position:
+                    ops.append(CellOp(table_index, position[0], position[1], op_type, field_name))
+        elif isinstance(field_value, dict):
+            position = _check_indexes(field_value.get('indexes'), location, errors)
+            # 单个字段配置按字段名判断是否为日期，与原有逻辑一致
+            op_type = OP_DATE if field_name == 'date' else OP_TEXT
+            if position:
+                ops.append(CellOp(table_index, position[0], position[1], op_type, field_name))
+        else:
+            errors.append(f"{location} 的配置格式错误")
+    return ops
+
+
+def _option_column(table_positions, table_index, row):
+    """从 activex_config.json 中取出选项所在列，没有配置时返回None"""
+    position = table_positions.get(str(row))
+    if not isinstance(position, dict):
+        return None
+    if position.get('row') != row:
+        log_warning(f"配置文件中行号不匹配: 表格{table_index} 期望{row}，配置{position.get('row')}", "WORD")
+    col = position.get('column')
+    if not isinstance(col, int) or col < 1:
+        log_warning(f"配置的列号无效: 表格{table_index} 行{row} 列{col}，填写时在行内查找", "WORD")
+        return None
+    return col
+
+
+def _compile_options(table_index, team, option_config, table_positions, errors):
+    ops = []
+    if not isinstance(option_config, dict):
+        errors.append(f"表格{table_index} 的 options 必须是字典")
+        return ops
+    for folder_name, option in option_config.items():
+        location = f"表格{table_index} 选项 {folder_name}"
+        if team == 'PPT':
+            rows = [(None, option)]
+        elif isinstance(option, dict):
+            rows = list(option.items())
+        else:
+            errors.append(f"{location} 的格式不正确，应该是字典类型")
+            continue
+        for key, row in rows:
+            if not isinstance(row, int) or isinstance(row, bool) or row < 1:
+                errors.append(f"{location}{'.' + key if key else ''} 的行号无效: {row}")
+                continue
+            col = _option_column(table_positions, table_index, row)
+            ops.append(CellOp(table_index, row, col, OP_OPTION, folder=folder_name, key=key))
+    ops.sort(key=lambda op: op.row)
+    return ops
+
+
+def compile_fill_plan(team: str, sub_folder_config: List[Dict], template_name: str,
+                      template_config: Optional[Dict] = None) -> FillPlan:
+    """
+    编译填写计划
+    :param team: 团队名称，PPT团队的选项直接对应行号，其他团队的选项为 {状态键: 行号}
+    :param sub_folder_config: 团队的子文件夹配置（system.json 的 subFolderConfig）
+    :param template_name: 模板名称（activex_config.json 中的键）
+    :param template_config: 模板的ActiveX控件位置配置，为None时所有选项在填写时于行内查找
+    :return: FillPlan
+    :raises FillPlanError: 配置中有无法填写的项
+    """
+    if not isinstance(sub_folder_config, list):
+        raise FillPlanError("子文件夹配置必须是列表")
+    template_config = template_config or {}
+    errors = []
+    ops = []
+    option_configs = {}
+    for table_index, item in enumerate(sub_folder_config):
+        if not isinstance(item, dict):
+            errors.append(f"表格{table_index} 的配置必须是字典")
+            continue
+        if item.get('fields') is not None:
+            ops.extend(_compile_fields(table_index, item['fields'], errors))
+        if item.get('options') is not None:
+            option_configs[table_index] = item['options']
+            table_positions = template_config.get(f"table_{table_index}", {})
+            ops.extend(_compile_options(table_index, team, item['options'], table_positions, errors))
+    if errors:
+        raise FillPlanError(f"团队 {team} 的子文件夹配置有误: " + "；".join(errors))
+    plan = FillPlan(team, template_name, ops, option_configs, len(sub_folder_config), sub_folder_config)
+    log_debug(f"已编译填写计划: {plan}", "WORD")
+    return plan
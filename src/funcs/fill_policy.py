@@ -0,0 +1,192 @@
+"""
+检查清单填写失败的处理策略
+把填写失败分为权限不足、模板或检查清单不存在、文档损坏、配置错误、COM暂时性错误和其他错误：
+只有COM暂时性错误有限次数重试（间隔递增），其他错误直接失败，不再反复打开关闭Word；
+连续的COM失败达到阈值后熔断，冷却期间改用docx引擎填写或直接失败，批处理中的问题任务可以尽快结束
+"""
+import threading
+import time
+import zipfile
+
+from src.config.config_manager import get_system_config
+from src.funcs.fill_plan import FillPlanError
+from src.logger.logger import log_error, log_info
+
+FAILURE_PERMISSION = 'permission'
+FAILURE_MISSING_TEMPLATE = 'missing_template'
+FAILURE_CORRUPT = 'corrupt'
+FAILURE_CONFIG = 'config'
+FAILURE_TRANSIENT = 'transient'
+FAILURE_OTHER = 'other'
+
+FAILURE_LABELS = {
+    FAILURE_PERMISSION: '权限不足',
+    FAILURE_MISSING_TEMPLATE: '模板或检查清单不存在',
+    FAILURE_CORRUPT: '文档损坏',
+    FAILURE_CONFIG: '配置错误',
+    FAILURE_TRANSIENT: 'COM暂时性错误',
+    FAILURE_OTHER: '其他错误',
+}
+
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 1.0
+DEFAULT_BACKOFF_MAX_SECONDS = 8.0
+DEFAULT_BREAKER_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN_SECONDS = 60.0
+
+# Word/RPC暂时不可用时的HRESULT
+_TRANSIENT_HRESULTS = {
+    -2147023174,  # 0x800706BA RPC服务器不可用
+    -2147023170,  # 0x800706BE 远程过程调用失败
+    -2147418111,  # 0x80010001 被调用方拒绝接收呼叫
+    -2147417846,  # 0x8001010A 被调用方忙，稍后重试
+    -2147417848,  # 0x80010108 对象已与其客户端断开连接
+}
+_PERMISSION_MARKERS = ('denied', 'read-only', 'read only', 'open elsewhere', 'in use by another', '权限')
+_MISSING_MARKERS = ('folder not found', 'no such file')
+_CORRUPT_MARKERS = ('corrupt', 'damaged', 'error trying to open', '损坏', '无法打开')
+_TRANSIENT_MARKERS = ('rpc', 'rejected by callee', 'disconnected', 'retrylater', 'server busy')
+
+
+class CorruptChecklistError(ValueError):
+    """检查清单文档内容不符合要求（表格缺失、找不到控件等），重试不能解决"""
+
+
+class ComCircuitOpenError(RuntimeError):
+    """Word连续失败后熔断，冷却期间不再调用Word"""
+
+
+def _com_error_details(e):
+    """
+    COM错误的HRESULT和说明文字（pywintypes.com_error 的参数为 (hresult, 说明, excepinfo, argerror)）
+    :return: (hresult, 说明文字)，不是COM错误时hresult为None
+    """
+    if type(e).__name__ != 'com_error':
+        return None, str(e)
+    args = getattr(e, 'args', ())
+    hresult = args[0] if args and isinstance(args[0], int) else getattr(e, 'hresult', None)
+    texts = [str(arg) for arg in args[1:2]]
+    if len(args) > 2 and isinstance(args[2], tuple):
+        # excepinfo 中有Word给出的具体原因
+        texts.extend(str(item) for item in args[2] if isinstance(item, str))
+    return hresult, ' '.join(texts)
+
+
+def classify_fill_error(e) -> str:
+    """
+    判断填写失败的类型
+    :return: FAILURE_* 常量
+    """
+    if isinstance(e, FillPlanError):
+        return FAILURE_CONFIG
+    if isinstance(e, PermissionError):
+        return FAILURE_PERMISSION
+    if isinstance(e, FileNotFoundError):
+        return FAILURE_MISSING_TEMPLATE
+    if isinstance(e, (CorruptChecklistError, zipfile.BadZipFile)):
+        return FAILURE_CORRUPT
+    hresult, text = _com_error_details(e)
+    text = text.lower()
+    if any(marker in text for marker in _PERMISSION_MARKERS):
+        return FAILURE_PERMISSION
+    if any(marker in text for marker in _MISSING_MARKERS):
+        return FAILURE_MISSING_TEMPLATE
+    if any(marker in text for marker in _CORRUPT_MARKERS):
+        return FAILURE_CORRUPT
+    if hresult in _TRANSIENT_HRESULTS or any(marker in text for marker in _TRANSIENT_MARKERS):
+        return FAILURE_TRANSIENT
+    return FAILURE_OTHER
+
+
+def get_max_retries() -> int:
+    """COM暂时性错误的最多重试次数"""
+    return get_system_config('fill_policy.max_retries', DEFAULT_MAX_RETRIES)
+
+
+def get_retry_delay(retry) -> float:
+    """
+    第几次重试前的等待时间，每次加倍，不超过 fill_policy.backoff_max_seconds
+    :param retry: 已经重试的次数（从0开始）
+    """
+    base = get_system_config('fill_policy.backoff_seconds', DEFAULT_BACKOFF_SECONDS)
+    limit = get_system_config('fill_policy.backoff_max_seconds', DEFAULT_BACKOFF_MAX_SECONDS)
+    return min(base * (2 ** retry), limit)
+
+
+def get_downgrade_engine():
+    """熔断期间改用的填写引擎，为None时直接失败"""
+    return get_system_config('fill_policy.downgrade_engine', 'docx')
+
+
+class ComCircuitBreaker:
+    """
+    Word COM熔断器
+    连续的COM失败达到阈值后打开，冷却期间 allow() 返回False；冷却结束后允许一次尝试，成功后关闭，失败则重新打开
+    """
+
+    def __init__(self, threshold=None, cooldown=None):
+        """
+        :param threshold: 打开熔断的连续失败次数，为None时读取 system.json 的 fill_policy.breaker_threshold
+        :param cooldown: 冷却秒数，为None时读取 system.json 的 fill_policy.breaker_cooldown_seconds
+        """
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+
+    @property
+    def threshold(self) -> int:
+        if self._threshold is not None:
+            return self._threshold
+        return get_system_config('fill_policy.breaker_threshold', DEFAULT_BREAKER_THRESHOLD)
+
+    @property
+    def cooldown(self) -> float:
+        if self._cooldown is not None:
+            return self._cooldown
+        return get_system_config('fill_policy.breaker_cooldown_seconds', DEFAULT_BREAKER_COOLDOWN_SECONDS)
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    @property
+    def is_open(self) -> bool:
+        """熔断已打开且仍在冷却期间"""
+        with self._lock:
+            return self._opened_at is not None and time.monotonic() - self._opened_at < self.cooldown
+
+    def allow(self) -> bool:
+        """是否可以调用Word"""
+        return not self.is_open
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                log_info("Word调用恢复正常，熔断关闭", "WORD")
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> bool:
+        """
+        记录一次COM失败
+        :return: 本次失败使熔断打开时返回True
+        """
+        with self._lock:
+            self._failures += 1
+            if self._failures < self.threshold:
+                return False
+            # 冷却后的尝试仍然失败时重新计时
+            self._opened_at = time.monotonic()
+        log_error(f"Word连续{self._failures}次COM调用失败，熔断{self.cooldown:.0f}秒", "WORD")
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+
+# 创建全局实例
+com_circuit_breaker = ComCircuitBreaker()
@@ -0,0 +1,91 @@
+"""
+检查清单期望状态
+把一个任务填写后检查清单应有的内容（任务字段、日期、签名、子文件夹状态、模板、填写计划）计算为一个哈希，
+与上次填写时记录的哈希相同、且检查清单之后没有被修改时跳过填写
+"""
+import json
+import os
+from datetime import date
+
+from src.config.compiled_cache import file_hash, hash_bytes
+from src.data.fill_state_store import fill_state_store
+from src.funcs.fill_plan import OP_DATE, OP_IMAGE, OP_OPTION
+from src.funcs.signature_cache import DEFAULT_SIGNATURE_NAME, signature_cache
+from src.funcs.word_processor import get_checklist_source, get_fill_plan
+from src.logger.logger import log_debug, log_info, log_warning
+
+# 期望状态包含的内容变化时增加版本号，之前的记录全部失效
+FILL_STATE_VERSION = 1
+
+
+def compute_desired_state(task, plan, folder_statuses, template_path=None):
+    """
+    计算检查清单的期望状态哈希
+    :param plan: get_fill_plan 编译的填写计划
+    :param folder_statuses: 各表格文件夹状态（见 detect_checklist_folders_status）
+    :param template_path: 覆盖模式下生成检查清单的模板，非覆盖模式为None
+    """
+    fields = {}
+    signatures = {}
+    has_date = False
+    for op in plan.ops:
+        if op.op == OP_OPTION:
+            continue
+        if op.op == OP_DATE:
+            has_date = True
+            continue
+        value = task.get(op.field)
+        fields[op.field] = value
+        if op.op == OP_IMAGE:
+            image_path = signature_cache.find(value) or signature_cache.find(DEFAULT_SIGNATURE_NAME)
+            signatures[str(value)] = file_hash(image_path) if image_path else None
+    state = {
+        'version': FILL_STATE_VERSION,
+        'team': plan.team,
+        'template_name': plan.template_name,
+        'ops': [list(op) for op in plan.ops],
+        'fields': fields,
+        # 日期单元格写入当天日期，日期变化后需要重新填写
+        'date': date.today().isoformat() if has_date else None,
+        'signatures': signatures,
+        'folder_statuses': folder_statuses,
+        'template_hash': file_hash(template_path) if template_path is not None else None
+    }
+    data = json.dumps(state, ensure_ascii=False, sort_keys=True, default=str)
+    return hash_bytes(data.encode('utf-8'))
+
+
+def check_fill_unchanged(resolved, team, sub_folder_config):
+    """
+    计算任务的期望状态，保存在 resolved['fill_state'] 中，供填写完成后 record_fill_state 记录
+    :param resolved: 已完成子文件夹检测的任务（见 scan_resolved_task）
+    :return: 检查清单已经是期望状态、可以跳过填写时返回True
+    """
+    resolved['fill_state'] = None
+    folder_statuses = resolved.get('folder_statuses')
+    if not fill_state_store.enabled or folder_statuses is None:
+        return False
+    try:
+        target = get_checklist_source(resolved['target_path'], resolved.get('snapshot'))
+        plan = get_fill_plan(team, sub_folder_config)
+        state_hash = compute_desired_state(resolved['task'], plan, folder_statuses, target.template_path)
+    except Exception as e:
+        # 无法确定期望状态时照常填写，错误在填写时报告
+        log_warning(f"{resolved['task']['job_no']}计算检查清单期望状态失败: {e}", "FILE")
+        return False
+    resolved['fill_state'] = {'path': target.path, 'hash': state_hash}
+    if target.replaced is not None and os.path.normcase(os.path.abspath(target.replaced)) != os.path.normcase(os.path.abspath(target.path)):
+        # 覆盖模式下还有需要替换的其他检查清单
+        return False
+    if fill_state_store.is_current(target.path, state_hash):
+        log_info(f"{resolved['task']['job_no']}检查清单未变化，跳过填写", "FILE")
+        return True
+    log_debug(f"{resolved['task']['job_no']}检查清单期望状态: {state_hash}", "FILE")
+    return False
+
+
+def record_fill_state(resolved):
+    """填写成功后记录检查清单的期望状态"""
+    fill_state = resolved.get('fill_state')
+    if fill_state:
+        fill_state_store.put(fill_state['path'], fill_state['hash'])
@@ -0,0 +1,294 @@
+"""
+项目文件夹目录快照模块
+同一个项目在预检查、子文件夹检测、检查清单查找时共用一份目录列表，
+每个目录只通过 os.scandir 列出一次，之后的模式匹配都在内存中完成
+"""
+import fnmatch
+import os
+import re
+from functools import lru_cache
+from src.config.config_manager import get_system_config
+from src.logger.logger import log_debug, log_warning
+
+# 检查清单文件的匹配模式，以及需要忽略的临时/隐藏文件前缀
+CHECKLIST_PATTERN = '*checklist*.doc*'
+CHECKLIST_IGNORED_PREFIXES = ('~$', '.', '__')
+
+# 不算作文件夹内容的文件（Office锁文件、系统缩略图缓存等），可在 system.json 的 folder_scan 中覆盖
+DEFAULT_IGNORED_FILES = ('~$*', 'Thumbs.db', 'desktop.ini')
+DEFAULT_SCAN_MAX_DEPTH = 8
+DEFAULT_SCAN_MAX_ENTRIES = 20000
+
+_SEPARATORS_RE = re.compile('|'.join(re.escape(sep) for sep in (os.sep, os.altsep) if sep))
+
+
+@lru_cache(maxsize=8)
+def _compile_ignored_files(patterns):
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns), re.IGNORECASE)
+
+
+def get_folder_scan_config():
+    """
+    读取 system.json 中的 folder_scan 配置
+    :return: (最大深度, 最多访问的目录项数, 忽略的文件模式元组)
+    """
+    scan_config = get_system_config('folder_scan', {}) or {}
+    return (
+        scan_config.get('max_depth', DEFAULT_SCAN_MAX_DEPTH),
+        scan_config.get('max_entries', DEFAULT_SCAN_MAX_ENTRIES),
+        tuple(scan_config.get('ignored_files', DEFAULT_IGNORED_FILES))
+    )
+
+
+def is_ignored_file(name, ignored_files=None):
+    """
+    文件名是否在忽略列表中（不区分大小写），预检查和文件夹检测共用
+    :param ignored_files: 忽略的文件模式，为None时读取配置
+    """
+    if ignored_files is None:
+        ignored_files = get_folder_scan_config()[2]
+    regex = _compile_ignored_files(tuple(ignored_files))
+    return bool(regex and regex.match(name))
+
+
+def dir_mtime(path):
+    """目录的修改时间（纳秒），无法访问时返回None"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ScanRecord:
+    """
+    一次检测访问过的目录，用于之后判断检测结果是否仍然有效
+    每个目录的修改时间在列出目录之前读取：检测期间目录被修改时记录的是修改前的时间，之后的有效性检查会发现变化
+    """
+
+    def __init__(self):
+        # [(目录路径, 列出前的修改时间)]，修改时间无法读取时为None
+        self.dirs = []
+        # 查找因目录项数量达到上限而中断，结果不完整
+        self.truncated = False
+
+    def add(self, path, mtime_ns):
+        self.dirs.append((path, mtime_ns))
+
+
+def _scandir_entries(path):
+    """逐个返回目录项，不存在或无法访问时返回空"""
+    try:
+        with os.scandir(path) as entries:
+            yield from entries
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    except OSError as e:
+        log_debug(f"无法访问目录 {path}: {e}", "FILE")
+
+
+def scan_folder_has_file(folder_path, max_depth=None, max_entries=None, ignored_files=None, cached_entries=None,
+                         record=None):
+    """
+    查找文件夹及其子文件夹中是否有文件，找到第一个有效文件即返回
+    每一层先检查本层的文件，本层没有文件时才按深度优先进入子文件夹
+    :param folder_path: 文件夹路径
+    :param max_depth: 最多向下进入的子文件夹层数，为None时读取配置
+    :param max_entries: 最多访问的目录项数，超过后停止查找并视为有内容（返回True），为None时读取配置
+    :param ignored_files: 忽略的文件模式，为None时读取配置
+    :param cached_entries: 可选，传入目录路径返回已缓存的 (目录项列表, 列出前的修改时间)，没有缓存时返回None
+    :param record: 可选，ScanRecord，记录查找过程中列出过的目录以及查找是否中断
+    :return: 找到文件返回True，否则返回False
+    """
+    config_depth, config_entries, config_ignored = get_folder_scan_config()
+    max_depth = config_depth if max_depth is None else max_depth
+    max_entries = config_entries if max_entries is None else max_entries
+    ignored_regex = _compile_ignored_files(tuple(config_ignored if ignored_files is None else ignored_files))
+
+    visited = 0
+    stack = [(folder_path, 0)]
+    while stack:
+        current, depth = stack.pop()
+        cached = cached_entries(current) if cached_entries else None
+        if cached is not None:
+            entries, mtime_ns = cached
+        else:
+            mtime_ns = dir_mtime(current)
+            entries = _scandir_entries(current)
+        if record is not None:
+            record.add(current, mtime_ns)
+        subdirs = []
+        for entry in entries:
+            visited += 1
+            if visited > max_entries:
+                # 没有查找完的文件夹不能判断为空，按有内容处理，避免在检查清单中误填"否"
+                log_warning(f"文件夹 {folder_path} 中的目录项超过 {max_entries} 个，停止查找并视为有文件", "FILE")
+                if record is not None:
+                    record.truncated = True
+                return True
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if depth < max_depth:
+                    subdirs.append(entry.path)
+            elif not (ignored_regex and ignored_regex.match(entry.name)):
+                return True
+        # 保持与目录列表相同的顺序深度优先访问
+        stack.extend((subdir, depth + 1) for subdir in reversed(subdirs))
+    return False
+
+
+class JobFolderSnapshot:
+    """单个项目文件夹的目录快照"""
+
+    def __init__(self, root, force_rescan=False):
+        """
+        :param root: 项目文件夹路径
+        :param force_rescan: 为True时不使用持久化的子文件夹检测缓存，重新检测所有子文件夹
+        """
+        self.root = str(root)
+        self.force_rescan = force_rescan
+        # 相对路径（规范化后）-> {名称: DirEntry}，目录不存在时为None
+        self._listings = {}
+        # 相对路径（规范化后）-> 列出目录之前读取的修改时间
+        self._mtimes = {}
+        # 实际执行的 os.scandir 次数，用于统计文件系统往返
+        self.scandir_count = 0
+
+    @staticmethod
+    def _split(sub_path):
+        return [part for part in _SEPARATORS_RE.split(sub_path or '') if part]
+
+    def _key(self, parts):
+        return os.path.normcase(os.path.join(*parts)) if parts else ''
+
+    def path(self, sub_path=''):
+        """返回子路径对应的完整路径"""
+        parts = self._split(sub_path)
+        return os.path.join(self.root, *parts) if parts else self.root
+
+    def _listing(self, parts):
+        key = self._key(parts)
+        if key in self._listings:
+            return self._listings[key]
+
+        listing = None
+        if parts:
+            # 子目录只有在父目录列表中存在且是目录时才需要列出
+            parent = self._listing(parts[:-1])
+            entry = parent.get(parts[-1]) if parent is not None else None
+            if entry is None and parent is not None:
+                entry = self._find_entry(parent, parts[-1])
+            if entry is None or not entry.is_dir():
+                self._listings[key] = None
+                return None
+
+        path = os.path.join(self.root, *parts) if parts else self.root
+        self._mtimes[key] = dir_mtime(path)
+        try:
+            self.scandir_count += 1
+            with os.scandir(path) as entries:
+                listing = {entry.name: entry for entry in entries}
+        except (FileNotFoundError, NotADirectoryError):
+            listing = None
+        except OSError as e:
+            log_debug(f"无法访问目录 {path}: {e}", "FILE")
+            listing = None
+        self._listings[key] = listing
+        return listing
+
+    @staticmethod
+    def _find_entry(listing, name):
+        """按当前平台的大小写规则查找目录项（Windows下不区分大小写）"""
+        normalized = os.path.normcase(name)
+        for entry_name, entry in listing.items():
+            if os.path.normcase(entry_name) == normalized:
+                return entry
+        return None
+
+    def invalidate(self, sub_path=''):
+        """目录内容被修改后（如复制/删除检查清单），丢弃该目录及其子目录的列表"""
+        key = self._key(self._split(sub_path))
+        for cached in list(self._listings):
+            if not key or cached == key or cached.startswith(key + os.sep):
+                del self._listings[cached]
+                self._mtimes.pop(cached, None)
+
+    def exists(self, sub_path=''):
+        """子目录是否存在（只需要父目录的列表，不会列出子目录本身）"""
+        parts = self._split(sub_path)
+        if not parts:
+            return self._listing(parts) is not None
+        key = self._key(parts)
+        if key in self._listings:
+            return self._listings[key] is not None
+        parent = self._listing(parts[:-1])
+        if parent is None:
+            return False
+        entry = parent.get(parts[-1]) or self._find_entry(parent, parts[-1])
+        try:
+            return entry is not None and entry.is_dir()
+        except OSError:
+            return False
+
+    def entries(self, sub_path=''):
+        """子目录中的所有目录项，目录不存在时返回空列表"""
+        listing = self._listing(self._split(sub_path))
+        return list(listing.values()) if listing else []
+
+    def glob(self, sub_path, pattern):
+        """
+        在子目录中按模式匹配，结果与 glob.glob(os.path.join(子目录, pattern)) 一致
+        :return: 匹配的完整路径列表
+        """
+        matcher = re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+        include_hidden = pattern.startswith('.')
+        return [
+            entry.path for entry in self.entries(sub_path)
+            if (include_hidden or not entry.name.startswith('.')) and matcher(os.path.normcase(entry.name))
+        ]
+
+    def match(self, sub_path, matcher):
+        """
+        子目录中是否有名称符合 file_map 类别规则的目录项
+        :param matcher: config_manager 中编译好的 FileMatcher
+        """
+        listing = self._listing(self._split(sub_path))
+        return bool(listing) and matcher.match_any(listing)
+
+    def listing_mtime(self, sub_path=''):
+        """子目录在列出之前的修改时间，尚未列出或无法访问时返回None"""
+        return self._mtimes.get(self._key(self._split(sub_path)))
+
+    def _cached_entries(self, path):
+        """已列出过的目录直接返回缓存的 (目录项, 列出前的修改时间)，未列出的返回None"""
+        relative = os.path.relpath(path, self.root)
+        key = self._key(self._split('' if relative == os.curdir else relative))
+        listing = self._listings.get(key)
+        return (list(listing.values()), self._mtimes.get(key)) if listing else None
+
+    def has_file(self, sub_path='', max_depth=None, max_entries=None, record=None):
+        """
+        子目录及其下级目录中是否有有效文件（忽略锁文件等），找到第一个即返回
+        已列出过的目录使用快照中的列表，其余目录边列出边检查，不缓存
+        :param record: 可选，ScanRecord，记录查找过程中列出过的目录以及查找是否中断
+        """
+        if not self.exists(sub_path):
+            return False
+        return scan_folder_has_file(
+            self.path(sub_path), max_depth, max_entries,
+            cached_entries=self._cached_entries, record=record
+        )
+
+    def checklist_files(self):
+        """项目文件夹根目录中的检查清单文件（已过滤临时文件、隐藏文件和忽略列表中的文件）"""
+        ignored_files = get_folder_scan_config()[2]
+        checklist_files = []
+        for path in self.glob('', CHECKLIST_PATTERN):
+            name = os.path.basename(path)
+            if not name.startswith(CHECKLIST_IGNORED_PREFIXES) and not is_ignored_file(name, ignored_files):
+                checklist_files.append(path)
+        return checklist_files
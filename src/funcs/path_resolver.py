@@ -2,12 +2,11 @@
 路径解析模块
 负责解析和获取工作目录路径
 """
+import bisect
 import os
-import win32com.client as win32
-import pythoncom
-from win32com.shell import shell, shellcon
+import threading
 from pathlib import Path
-from urllib.parse import unquote
+from src.funcs.shell_link import ShellLinkError, read_shell_link
 from src.logger.logger import log_debug, log_error, log_info
 
 
@@ -25,6 +24,103 @@ def get_working_folder_path(base_dir, team, job_no):
         return get_working_folder_path_for_general(base_dir, job_no)
 
 
+class ShortcutIndex:
+    """
+    PPT快捷方式文件夹的索引
+    列出一次快捷方式文件夹，按小写文件名排序，按工作号前缀查找；快捷方式目标在首次查找时解析并缓存
+    快捷方式文件夹的修改时间变化时重新列出
+    """
+
+    def __init__(self, shortcuts_path):
+        """
+        :param shortcuts_path: 快捷方式文件夹路径
+        """
+        self.shortcuts_path = shortcuts_path
+        self._names = []
+        self._entries = []
+        self._mtime_ns = None
+        # 小写工作号 -> 目标路径（未找到时为None）
+        self._lookups = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        mtime_ns = os.stat(self.shortcuts_path).st_mtime_ns
+        if mtime_ns == self._mtime_ns:
+            return
+        shortcuts = []
+        with os.scandir(self.shortcuts_path) as entries:
+            for entry in entries:
+                name = entry.name.lower()
+                try:
+                    # 快捷方式(.lnk文件)或符号链接
+                    if name.endswith('.lnk'):
+                        shortcuts.append((name, entry.path, False))
+                    elif entry.is_symlink():
+                        shortcuts.append((name, entry.path, True))
+                except OSError:
+                    continue
+        shortcuts.sort()
+        self._names = [name for name, _, _ in shortcuts]
+        self._entries = [(path, is_symlink) for _, path, is_symlink in shortcuts]
+        self._lookups = {}
+        self._mtime_ns = mtime_ns
+        log_debug(f"已建立快捷方式文件夹 {self.shortcuts_path} 的索引，共 {len(shortcuts)} 个快捷方式", "PATH")
+
+    @staticmethod
+    def _resolve(path, is_symlink):
+        """解析快捷方式或符号链接的目标，失败时返回None"""
+        try:
+            if is_symlink:
+                target_path = Path(path).readlink()
+                log_info(f"找到工作目录: {target_path}", "PATH")
+                return target_path
+            log_info(f"找到快捷方式文件: {path}", "PATH")
+            link_info = get_lnk_target_path(path)
+            if not link_info or not link_info.get("target_path"):
+                return None
+            log_info(f"快捷方式目标路径: {link_info.get('target_path')}", "PATH")
+            return Path(link_info.get("target_path"))
+        except Exception as e:
+            log_error(str(e))
+            return None
+
+    def find(self, job_no):
+        """
+        查找文件名以工作号开头（不区分大小写）的快捷方式的目标
+        :return: 目标路径，未找到时返回None
+        """
+        prefix = job_no.lower()
+        with self._lock:
+            self._refresh()
+            if prefix in self._lookups:
+                return self._lookups[prefix]
+            target_path = None
+            index = bisect.bisect_left(self._names, prefix)
+            while index < len(self._names) and self._names[index].startswith(prefix):
+                target_path = self._resolve(*self._entries[index])
+                if target_path is not None:
+                    break
+                index += 1
+            self._lookups[prefix] = target_path
+            return target_path
+
+
+# 快捷方式文件夹路径（规范化后）-> ShortcutIndex
+_shortcut_indexes = {}
+_shortcut_indexes_lock = threading.Lock()
+
+
+def get_shortcut_index(shortcuts_path):
+    """获取快捷方式文件夹的索引，不存在时新建"""
+    key = os.path.normcase(os.path.abspath(shortcuts_path))
+    with _shortcut_indexes_lock:
+        index = _shortcut_indexes.get(key)
+        if index is None:
+            index = ShortcutIndex(shortcuts_path)
+            _shortcut_indexes[key] = index
+    return index
+
+
 def get_working_folder_path_for_ppt(shortcuts_path, job_no):
     """
     为PPT团队获取工作文件夹路径（通过快捷方式）
@@ -32,90 +128,92 @@ def get_working_folder_path_for_ppt(shortcuts_path, job_no):
     :param job_no: 工作号
     :return: 工作目录路径，如果未找到则返回None
     """
+    log_info(f"正在PPT快捷方式路径 {shortcuts_path} 中查找工作号 {job_no} 对应的文件夹", "PATH")
     try:
-        shell = win32.Dispatch("WScript.Shell")
-    except ImportError:
+        target_path = get_shortcut_index(shortcuts_path).find(job_no)
+    except OSError as e:
+        log_error(f"无法访问快捷方式文件夹 {shortcuts_path}: {e}")
         return None
-    log_info(f"正在PPT快捷方式路径 {shortcuts_path} 中查找工作号 {job_no} 对应的文件夹", "PATH")
-    with os.scandir(shortcuts_path) as entries:
-        for entry in entries:
-            try:
-                # 检查是否为快捷方式(.lnk文件)
-                if entry.name.lower().endswith('.lnk') and entry.name.lower().startswith(job_no.lower()):
-                    log_info(f"找到快捷方式文件: {entry.path}", "PATH")
-                    link_info=get_lnk_target_path(entry.path)
-                    if not link_info or not link_info.get("target_path"):
-                        continue
-                    log_info(f"快捷方式目标路径: {link_info.get('target_path')}", "PATH")
-                    #shortcut = shell.CreateShortCut(str(entry.path))
-                    # Decode URL-encoded characters in the path
-                    
-                    #decoded_path = unquote(shortcut.Targetpath)
-                    #target_path = Path(decoded_path)
-                    #log_info(f"找到工作目录: {decoded_path}", "PATH1")
-                    target_path = Path(link_info.get("target_path"))
-                    return target_path
-                # 检查是否为符号链接
-                elif entry.is_symlink() and entry.name.lower().startswith(job_no.lower()):
-                    target_path = Path(entry.path).readlink()
-                    log_info(f"找到工作目录: {target_path}", "PATH2")
-                    return target_path
-            except Exception as e:
-                log_error(str(e))
-                continue
-    log_info("没有找到对应的文件夹", "PATH")
-    return None
+    if target_path is None:
+        log_info("没有找到对应的文件夹", "PATH")
+    return target_path
+
 
 def get_lnk_target_path(lnk_path):
     """
-    使用pywin32获取快捷方式的目标路径。
-    能处理文件、文件夹、URL等，对于非文件目标，TargetPath可能为空。
+    获取快捷方式的目标路径（直接解析.lnk文件，不需要COM）
+    目标不是文件或文件夹时（如URL、虚拟对象），target_path可能为空
     """
-    # 确保路径是绝对路径
-    lnk_path = os.path.abspath(lnk_path)
-    
     try:
-        # 初始化COM
-        pythoncom.CoInitialize()
-        
-        # 创建Shell对象
-        shell_link = pythoncom.CoCreateInstance(
-            shell.CLSID_ShellLink,
-            None,
-            pythoncom.CLSCTX_INPROC_SERVER,
-            shell.IID_IShellLink
-        )
-        
-        # 从文件加载快捷方式数据
-        persist_file = shell_link.QueryInterface(pythoncom.IID_IPersistFile)
-        persist_file.Load(lnk_path)
-
-        # 获取目标路径
-        target_path = shell_link.GetPath(shell.SLGP_SHORTPATH)[0]
-        
-        # 获取其他可能包含目标信息的字段
-        # 对于URL或命令，目标通常在这里
-        arguments = shell_link.GetArguments()
-        
-        # 获取ID列表，对于虚拟对象（如“此电脑”）目标在这里
-        id_list = shell_link.GetIDList()
-
-        # 清理COM
-        shell_link = None
-        persist_file = None
-        
-        return {
-            "target_path": target_path,
-            "arguments": arguments,
-            "has_id_list": id_list is not None
-        }
-
-    except Exception as e:
+        return read_shell_link(os.path.abspath(lnk_path))
+    except (OSError, ShellLinkError) as e:
         log_error(f"Error processing {lnk_path}: {e}")
         return None
-    finally:
-        # 释放COM
-        pythoncom.CoUninitialize()
+
+
+class JobFolderIndex:
+    """
+    年份文件夹（base_dir/20YY）下项目文件夹的索引
+    按文件夹名排序，按工作号前缀二分查找；年份文件夹的修改时间变化时重新列出
+    """
+
+    def __init__(self, search_dir):
+        """
+        :param search_dir: 年份文件夹路径
+        """
+        self.search_dir = search_dir
+        self._names = []
+        self._paths = []
+        self._mtime_ns = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """年份文件夹修改时间变化（新增/重命名项目文件夹）时重新建立索引"""
+        mtime_ns = os.stat(self.search_dir).st_mtime_ns
+        if mtime_ns == self._mtime_ns:
+            return
+        folders = []
+        with os.scandir(self.search_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        folders.append((entry.name, entry.path))
+                except OSError:
+                    continue
+        folders.sort()
+        self._names = [name for name, _ in folders]
+        self._paths = [path for _, path in folders]
+        self._mtime_ns = mtime_ns
+        log_debug(f"已建立目录 {self.search_dir} 的项目文件夹索引，共 {len(folders)} 个文件夹", "PATH")
+
+    def find(self, job_no):
+        """
+        查找以工作号开头的项目文件夹
+        :return: 项目文件夹路径，未找到时返回None
+        """
+        with self._lock:
+            self._refresh()
+            index = bisect.bisect_left(self._names, job_no)
+            if index < len(self._names) and self._names[index].startswith(job_no):
+                return self._paths[index]
+        return None
+
+
+# 年份文件夹路径（规范化后）-> JobFolderIndex，批量处理和重新运行单个任务共用
+_job_folder_indexes = {}
+_job_folder_indexes_lock = threading.Lock()
+
+
+def get_job_folder_index(search_dir):
+    """获取年份文件夹的项目文件夹索引，不存在时新建"""
+    key = os.path.normcase(os.path.abspath(search_dir))
+    with _job_folder_indexes_lock:
+        index = _job_folder_indexes.get(key)
+        if index is None:
+            index = JobFolderIndex(search_dir)
+            _job_folder_indexes[key] = index
+    return index
+
 
 def get_working_folder_path_for_general(base_dir, job_no):
     """
@@ -131,17 +229,15 @@ def get_working_folder_path_for_general(base_dir, job_no):
     sub_year_folder = f"20{job_no[:2]}"
     search_dir = os.path.join(base_dir, sub_year_folder)
     
-    # 使用 os.scandir() 只查找第一层目录 (最高效)
+    # 每个年份文件夹只列出一次，之后在索引中二分查找
     try:
-        with os.scandir(search_dir) as entries:
-            for entry in entries:
-                if entry.is_dir() and entry.name.startswith(job_no):
-                    log_debug(f"找到工作目录: {entry.path}", "PATH")
-                    return entry.path
+        working_folder_path = get_job_folder_index(search_dir).find(job_no)
     except (OSError, FileNotFoundError, PermissionError) as e:
         log_debug(f"无法访问目录 {search_dir}: {e}", "FILE")
-    else:
-        # 只有在目录可访问但未找到匹配项时才记录此日志
-        log_debug(f"在目录 {search_dir} 中未找到以 {job_no} 开头的文件夹", "PATH")
-    
+        return None
+    if working_folder_path is not None:
+        log_debug(f"找到工作目录: {working_folder_path}", "PATH")
+        return working_folder_path
+    # 只有在目录可访问但未找到匹配项时才记录此日志
+    log_debug(f"在目录 {search_dir} 中未找到以 {job_no} 开头的文件夹", "PATH")
     return None
@@ -0,0 +1,292 @@
+"""
+任务流水线模块
+将批量处理拆分为 任务读取 → 路径解析 → 子文件夹检测 → 检查清单填写 → 结果发布 五个阶段，
+各阶段之间通过有界队列连接，每个阶段有独立的线程数，检测下一个任务时可以同时填写当前任务
+"""
+import queue
+import threading
+import time
+
+from src.config.config_manager import config_manager, get_system_config
+from src.funcs.fill_executor import PROCESS_ENGINES, FillExecutor
+from src.funcs.fill_state import check_fill_unchanged, record_fill_state
+from src.funcs.task_utils import (STATUS_COMPLETED, STATUS_NOT_FOUND, STATUS_RESOLVED, STATUS_UNCHANGED,
+                                  build_task_result, fill_resolved_task, resolve_task, scan_resolved_task)
+from src.logger.logger import log_debug, log_error, log_info
+
+STAGE_INGEST = 'ingest'
+STAGE_RESOLVE = 'resolve'
+STAGE_SCAN = 'scan'
+STAGE_FILL = 'fill'
+STAGE_PUBLISH = 'publish'
+
+# system.json 中 pipeline 配置的默认值
+DEFAULT_PIPELINE_CONFIG = {
+    'resolve_workers': 8,
+    'scan_workers': 4,
+    'fill_workers': 1,
+    # 大于1时使用多进程填写（仅docx引擎），每个进程一个填写引擎
+    'fill_processes': 0,
+    'queue_size': 16,
+    # 路径解析结果的队列足够大，使路径解析可以先于填写完成，无法处理的任务尽早显示
+    'resolved_queue_size': 1000
+}
+
+_STOP = object()
+
+
+class PipelineStage:
+    """流水线中的一个阶段：一个输入队列和若干工作线程"""
+
+    def __init__(self, name, handler, workers=1, outputs=(), queue_size=0):
+        """
+        :param name: 阶段名称
+        :param handler: 处理函数 handler(item, emit)，通过 emit(阶段名称, item) 把结果交给下游阶段
+        :param workers: 工作线程数
+        :param outputs: 可能接收本阶段输出的下游阶段名称
+        :param queue_size: 输入队列容量，0表示不限制
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.outputs = tuple(outputs)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self._lock = threading.Lock()
+
+    def record_depth(self):
+        """入队时记录队列深度"""
+        depth = self.queue.qsize()
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self._depth_total += depth
+            self._depth_samples += 1
+
+    def record_item(self, elapsed):
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += elapsed
+
+    def stats(self, wall_seconds):
+        """阶段统计：处理数量、忙碌时间、线程利用率、队列深度"""
+        capacity = wall_seconds * self.workers
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'utilization': round(self.busy_seconds / capacity, 3) if capacity > 0 else 0.0,
+            'max_queue_depth': self.max_queue_depth,
+            'avg_queue_depth': round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0.0
+        }
+
+
+class TaskPipeline:
+    """由多个阶段组成的流水线，第一个添加的阶段接收输入"""
+
+    def __init__(self):
+        self.stages = {}
+        self._order = []
+        self._remaining_producers = {}
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._cleanups = []
+        self.report = None
+
+    def add_stage(self, name, handler, workers=1, outputs=(), queue_size=0):
+        stage = PipelineStage(name, handler, workers, outputs, queue_size)
+        self.stages[name] = stage
+        self._order.append(name)
+        return stage
+
+    def add_cleanup(self, callback):
+        """添加流水线结束后调用的清理函数（如关闭进程池）"""
+        self._cleanups.append(callback)
+
+    def cancel(self):
+        """请求取消：各阶段丢弃尚未处理的任务"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def emit(self, stage_name, item):
+        """把任务交给指定阶段，队列满时等待"""
+        stage = self.stages[stage_name]
+        stage.queue.put(item)
+        stage.record_depth()
+
+    def _close_stage(self, stage):
+        for _ in range(stage.workers):
+            stage.queue.put(_STOP)
+
+    def _producer_done(self, stage_name):
+        """某个上游线程结束，所有上游线程都结束后关闭该阶段"""
+        with self._lock:
+            self._remaining_producers[stage_name] -= 1
+            finished = self._remaining_producers[stage_name] == 0
+        if finished:
+            self._close_stage(self.stages[stage_name])
+
+    def _run_worker(self, stage):
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                break
+            if self.cancelled:
+                continue
+            start = time.perf_counter()
+            try:
+                stage.handler(item, self.emit)
+            except Exception as e:
+                log_error(f"流水线阶段 {stage.name} 处理失败: {e}")
+            stage.record_item(time.perf_counter() - start)
+        for output in stage.outputs:
+            self._producer_done(output)
+
+    def run(self, items):
+        """
+        运行流水线直到所有任务处理完成
+        :param items: 输入第一个阶段的任务
+        :return: 运行报告，包含总耗时和各阶段统计
+        """
+        self._remaining_producers = {name: 0 for name in self._order}
+        self._remaining_producers[self._order[0]] = 1
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                self._remaining_producers[output] += stage.workers
+
+        start = time.perf_counter()
+        threads = []
+        for name in self._order:
+            stage = self.stages[name]
+            for i in range(stage.workers):
+                thread = threading.Thread(target=self._run_worker, args=(stage,), name=f"pipeline-{name}-{i}")
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+
+        first = self._order[0]
+        for item in items:
+            if self.cancelled:
+                break
+            self.emit(first, item)
+        self._producer_done(first)
+
+        for thread in threads:
+            thread.join()
+        for callback in self._cleanups:
+            try:
+                callback()
+            except Exception as e:
+                log_error(f"流水线清理失败: {e}")
+        wall_seconds = time.perf_counter() - start
+        self.report = {
+            'total_seconds': round(wall_seconds, 3),
+            'stages': {name: self.stages[name].stats(wall_seconds) for name in self._order}
+        }
+        return self.report
+
+
+def get_pipeline_config():
+    """读取 system.json 中的 pipeline 配置，缺少的项使用默认值"""
+    pipeline_config = dict(DEFAULT_PIPELINE_CONFIG)
+    pipeline_config.update(get_system_config('pipeline', {}) or {})
+    return pipeline_config
+
+
+def log_pipeline_report(report):
+    """输出各阶段的统计，便于判断瓶颈所在"""
+    log_info(f"流水线总耗时 {report['total_seconds']:.2f} 秒", "PIPELINE")
+    for name, stats in report['stages'].items():
+        log_info(
+            f"阶段 {name}: 线程 {stats['workers']}，处理 {stats['processed']} 个，"
+            f"忙碌 {stats['busy_seconds']:.2f} 秒，利用率 {stats['utilization']:.0%}，"
+            f"队列深度 最大 {stats['max_queue_depth']} / 平均 {stats['avg_queue_depth']}",
+            "PIPELINE"
+        )
+
+
+def build_checklist_pipeline(base_dir, team, sub_folder_config, publish, engine=None, force_rescan=False,
+                             pipeline_config=None):
+    """
+    创建检查清单批量处理流水线
+    :param publish: 结果发布函数 publish(result)，在单独的线程中按完成顺序调用
+    :param engine: 填写引擎，为None时读取用户配置 fill_engine
+    :param force_rescan: 为True时子文件夹检测不使用缓存，检查清单未变化时也重新填写
+    :param pipeline_config: 各阶段线程数和队列容量，为None时读取 system.json
+    :return: TaskPipeline，调用 run(tasks) 开始处理
+    """
+    if pipeline_config is None:
+        pipeline_config = get_pipeline_config()
+    if engine is None:
+        engine = config_manager.get_user_config('fill_engine', 'word')
+    fill_workers = pipeline_config['fill_workers']
+    if engine == 'word' and fill_workers > 1:
+        # Word COM 同一时间只能处理一个文档
+        log_debug("Word引擎只能单线程填写，fill_workers 按1处理", "PIPELINE")
+        fill_workers = 1
+    executor = None
+    fill_processes = pipeline_config['fill_processes']
+    if fill_processes > 1:
+        if engine in PROCESS_ENGINES:
+            executor = FillExecutor(fill_processes, engine)
+            # 每个填写线程等待一个工作进程
+            fill_workers = fill_processes
+        else:
+            log_debug(f"{engine}引擎不支持多进程填写，fill_processes 不生效", "PIPELINE")
+    queue_size = pipeline_config['queue_size']
+
+    def ingest(task, emit):
+        log_debug(f"读取任务: {task['job_no']}", "PIPELINE")
+        emit(STAGE_RESOLVE, task)
+
+    def resolve(task, emit):
+        try:
+            resolved = resolve_task(base_dir, team, task, force_rescan)
+        except Exception as e:
+            log_error(f"任务 {task['job_no']} 解析工作目录失败: {e}")
+            # 路径解析出错的任务按未找到目录处理
+            resolved = {'task': task, 'result': build_task_result(task, None, STATUS_NOT_FOUND)}
+            emit(STAGE_PUBLISH, resolved)
+            return
+        if resolved['result']['status'] == STATUS_RESOLVED:
+            emit(STAGE_SCAN, resolved)
+        else:
+            emit(STAGE_PUBLISH, resolved)
+
+    def scan(resolved, emit):
+        if scan_resolved_task(resolved, team, sub_folder_config):
+            emit(STAGE_FILL, resolved)
+        else:
+            emit(STAGE_PUBLISH, resolved)
+
+    def fill(resolved, emit):
+        log_info(f"{resolved['task']['job_no']}开始写入检查列表...", "PIPELINE")
+        if executor is None:
+            # force_rescan 时即使检查清单未变化也重新填写
+            fill_resolved_task(resolved, team, sub_folder_config, engine, force=force_rescan)
+        elif not force_rescan and check_fill_unchanged(resolved, team, sub_folder_config):
+            resolved['result']['status'] = STATUS_UNCHANGED
+        elif executor.fill(resolved, team)['status'] == STATUS_COMPLETED:
+            record_fill_state(resolved)
+        emit(STAGE_PUBLISH, resolved)
+
+    def publish_result(resolved, emit):
+        publish(resolved['result'])
+
+    pipeline = TaskPipeline()
+    pipeline.add_stage(STAGE_INGEST, ingest, 1, (STAGE_RESOLVE,), queue_size)
+    pipeline.add_stage(STAGE_RESOLVE, resolve, pipeline_config['resolve_workers'], (STAGE_SCAN, STAGE_PUBLISH), queue_size)
+    pipeline.add_stage(STAGE_SCAN, scan, pipeline_config['scan_workers'], (STAGE_FILL, STAGE_PUBLISH),
+                       pipeline_config['resolved_queue_size'])
+    pipeline.add_stage(STAGE_FILL, fill, fill_workers, (STAGE_PUBLISH,), queue_size)
+    pipeline.add_stage(STAGE_PUBLISH, publish_result, 1, (), queue_size)
+    if executor is not None:
+        pipeline.add_cleanup(executor.shutdown)
+    return pipeline
+
@@ -0,0 +1,171 @@
+"""
+Windows快捷方式（.lnk）解析模块
+按 MS-SHLLINK 格式直接读取快捷方式文件，不需要COM，可在任意平台运行
+"""
+import locale
+import ntpath
+import os
+import struct
+import uuid
+
+SHELL_LINK_HEADER_SIZE = 0x4C
+SHELL_LINK_CLSID = uuid.UUID('00021401-0000-0000-c000-000000000046')
+
+# LinkFlags
+HAS_LINK_TARGET_ID_LIST = 0x00000001
+HAS_LINK_INFO = 0x00000002
+HAS_NAME = 0x00000004
+HAS_RELATIVE_PATH = 0x00000008
+HAS_WORKING_DIR = 0x00000010
+HAS_ARGUMENTS = 0x00000020
+HAS_ICON_LOCATION = 0x00000040
+IS_UNICODE = 0x00000080
+FORCE_NO_LINK_INFO = 0x00000100
+
+# LinkInfoFlags
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x00000001
+COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX = 0x00000002
+
+# 只有头部长度不小于该值时，LinkInfo / CommonNetworkRelativeLink 才带有Unicode偏移
+LINK_INFO_UNICODE_HEADER_SIZE = 0x24
+NETWORK_LINK_UNICODE_OFFSET = 0x14
+
+
+class ShellLinkError(ValueError):
+    """快捷方式文件格式错误"""
+
+
+def _ansi_encoding():
+    """快捷方式中非Unicode字符串使用创建时系统的ANSI代码页，这里按当前系统代码页解码"""
+    return locale.getpreferredencoding(False) or 'cp1252'
+
+
+def _read_c_string(data, offset):
+    """读取以\\0结尾的ANSI字符串"""
+    end = data.find(b'\x00', offset)
+    if end < 0:
+        raise ShellLinkError("字符串缺少结束符")
+    return data[offset:end].decode(_ansi_encoding(), errors='replace')
+
+
+def _read_c_unicode_string(data, offset):
+    """读取以\\0\\0结尾的UTF-16LE字符串"""
+    end = offset
+    while end + 1 < len(data) and data[end:end + 2] != b'\x00\x00':
+        end += 2
+    if end + 1 >= len(data):
+        raise ShellLinkError("Unicode字符串缺少结束符")
+    return data[offset:end].decode('utf-16le', errors='replace')
+
+
+def _parse_network_link(data, offset):
+    """
+    解析 CommonNetworkRelativeLink 结构
+    :return: 网络共享名称，如 \\\\server\\share
+    """
+    size, flags, net_name_offset, device_name_offset, provider_type = struct.unpack_from('<5I', data, offset)
+    if net_name_offset > NETWORK_LINK_UNICODE_OFFSET:
+        net_name_offset_unicode, = struct.unpack_from('<I', data, offset + 0x14)
+        return _read_c_unicode_string(data, offset + net_name_offset_unicode)
+    return _read_c_string(data, offset + net_name_offset)
+
+
+def _parse_link_info(data, offset):
+    """
+    解析 LinkInfo 结构
+    :return: (本地路径或网络路径, LinkInfo长度)
+    """
+    (size, header_size, flags, volume_id_offset, local_base_path_offset,
+     network_link_offset, common_path_suffix_offset) = struct.unpack_from('<7I', data, offset)
+    has_unicode = header_size >= LINK_INFO_UNICODE_HEADER_SIZE
+    if has_unicode:
+        local_base_path_offset_unicode, common_path_suffix_offset_unicode = \
+            struct.unpack_from('<2I', data, offset + 0x1C)
+
+    if has_unicode and common_path_suffix_offset_unicode:
+        common_path_suffix = _read_c_unicode_string(data, offset + common_path_suffix_offset_unicode)
+    else:
+        common_path_suffix = _read_c_string(data, offset + common_path_suffix_offset)
+
+    if flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+        if has_unicode and local_base_path_offset_unicode:
+            base_path = _read_c_unicode_string(data, offset + local_base_path_offset_unicode)
+        else:
+            base_path = _read_c_string(data, offset + local_base_path_offset)
+        return base_path + common_path_suffix, size
+    if flags & COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX:
+        net_name = _parse_network_link(data, offset + network_link_offset)
+        if common_path_suffix:
+            return ntpath.join(net_name, common_path_suffix), size
+        return net_name, size
+    return '', size
+
+
+def parse_shell_link(data):
+    """
+    解析快捷方式文件内容
+    :param data: .lnk文件字节
+    :return: 字典，包含 target_path（LinkInfo中的目标路径）、relative_path、working_dir、arguments、has_id_list
+    """
+    if len(data) < SHELL_LINK_HEADER_SIZE:
+        raise ShellLinkError("快捷方式文件长度不足")
+    header_size, = struct.unpack_from('<I', data, 0)
+    if header_size != SHELL_LINK_HEADER_SIZE or uuid.UUID(bytes_le=data[4:20]) != SHELL_LINK_CLSID:
+        raise ShellLinkError("不是有效的快捷方式文件")
+    link_flags, = struct.unpack_from('<I', data, 0x14)
+
+    try:
+        offset = SHELL_LINK_HEADER_SIZE
+        if link_flags & HAS_LINK_TARGET_ID_LIST:
+            id_list_size, = struct.unpack_from('<H', data, offset)
+            offset += 2 + id_list_size
+
+        target_path = ''
+        if link_flags & HAS_LINK_INFO:
+            if not link_flags & FORCE_NO_LINK_INFO:
+                target_path, _ = _parse_link_info(data, offset)
+            link_info_size, = struct.unpack_from('<I', data, offset)
+            offset += link_info_size
+
+        # StringData：各字符串依次出现，长度为字符数
+        strings = {}
+        for flag, name in ((HAS_NAME, 'name'), (HAS_RELATIVE_PATH, 'relative_path'),
+                           (HAS_WORKING_DIR, 'working_dir'), (HAS_ARGUMENTS, 'arguments'),
+                           (HAS_ICON_LOCATION, 'icon_location')):
+            if not link_flags & flag:
+                continue
+            count, = struct.unpack_from('<H', data, offset)
+            offset += 2
+            if link_flags & IS_UNICODE:
+                raw = data[offset:offset + count * 2]
+                offset += count * 2
+                strings[name] = raw.decode('utf-16le', errors='replace')
+            else:
+                raw = data[offset:offset + count]
+                offset += count
+                strings[name] = raw.decode(_ansi_encoding(), errors='replace')
+    except struct.error as e:
+        raise ShellLinkError(f"快捷方式文件已损坏: {e}")
+
+    return {
+        "target_path": target_path,
+        "relative_path": strings.get('relative_path', ''),
+        "working_dir": strings.get('working_dir', ''),
+        "arguments": strings.get('arguments', ''),
+        "has_id_list": bool(link_flags & HAS_LINK_TARGET_ID_LIST)
+    }
+
+
+def read_shell_link(lnk_path):
+    """
+    读取快捷方式文件的目标
+    LinkInfo中没有目标路径时，使用相对路径（相对于快捷方式所在目录）
+    :return: parse_shell_link 的结果
+    """
+    with open(lnk_path, 'rb') as f:
+        link_info = parse_shell_link(f.read())
+    if not link_info["target_path"] and link_info["relative_path"]:
+        lnk_dir = os.path.dirname(os.path.abspath(lnk_path))
+        relative_path = link_info["relative_path"].replace('\\', os.sep)
+        link_info["target_path"] = os.path.normpath(os.path.join(lnk_dir, relative_path))
+    return link_info
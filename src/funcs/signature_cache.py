@@ -0,0 +1,181 @@
+"""
+签名图片缓存
+signs 文件夹只建立一次索引（文件名不区分大小写，文件夹修改后自动重建），
+每个签名按填写尺寸预先缩放为PNG保存在内存中，同一签名在多个任务、多个单元格中重复使用
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from src.config.atomic_file import write_file_atomic
+from src.logger.logger import log_debug, log_warning
+
+try:
+    from PIL import Image
+except ImportError:
+    # 没有安装Pillow时不缩放，直接使用原图
+    Image = None
+
+# 同名签名有多种格式时的优先顺序
+SIGNATURE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+DEFAULT_SIGNATURE_NAME = 'default'
+# 预缩放的分辨率（每英寸像素数），按两倍屏幕分辨率缩放，打印时仍然清晰
+SIGNATURE_DPI = 192
+POINTS_PER_INCH = 72
+
+
+class SignatureImage(NamedTuple):
+    """缩放后的签名图片"""
+    data: bytes
+    extension: str      # 不含"."的扩展名，缩放后为 png
+    digest: str         # 图片内容哈希，相同签名共用同一个图片部件
+    source: str         # 原图路径
+
+
+class SignatureCache:
+    """签名文件夹索引和预缩放图片缓存"""
+
+    def __init__(self, folder=None, dpi=SIGNATURE_DPI):
+        """
+        :param folder: 签名文件夹，默认为当前目录下的 signs
+        :param dpi: 预缩放的分辨率
+        """
+        self._folder = Path(folder) if folder else None
+        self.dpi = dpi
+        self._index: Dict[str, str] = {}
+        self._index_key = None
+        self._images: Dict[tuple, tuple] = {}
+        self._files: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def folder(self) -> Path:
+        return self._folder or Path.cwd() / 'signs'
+
+    def _refresh_index(self):
+        """文件夹路径或修改时间变化时重建索引：小写文件名（不含扩展名） -> 路径"""
+        folder = self.folder
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            self._index, self._index_key = {}, None
+            return
+        key = (str(folder), mtime)
+        if key == self._index_key:
+            return
+        index = {}
+        priorities = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                stem, extension = os.path.splitext(entry.name)
+                extension = extension.lower()
+                if extension not in SIGNATURE_EXTENSIONS or not entry.is_file():
+                    continue
+                name = stem.strip().lower()
+                priority = SIGNATURE_EXTENSIONS.index(extension)
+                if name not in index or priority < priorities[name]:
+                    index[name] = entry.path
+                    priorities[name] = priority
+        self._index, self._index_key = index, key
+        log_debug(f"签名文件夹索引已建立: {len(index)} 个签名", "WORD")
+
+    def folder_exists(self) -> bool:
+        return self.folder.is_dir()
+
+    def find(self, staff_name) -> Optional[str]:
+        """查找签名图片路径，没有找到返回None"""
+        if not staff_name or not str(staff_name).strip():
+            return None
+        with self._lock:
+            self._refresh_index()
+            return self._index.get(str(staff_name).strip().lower())
+
+    def _scale(self, data, width, height):
+        """缩放为指定尺寸（磅）的PNG，没有Pillow或无法识别图片时返回None"""
+        if Image is None:
+            return None
+        size = (max(1, round(width * self.dpi / POINTS_PER_INCH)), max(1, round(height * self.dpi / POINTS_PER_INCH)))
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                has_alpha = image.mode in ('RGBA', 'LA', 'P')
+                image = image.convert('RGBA' if has_alpha else 'RGB')
+                # 与Word中设置宽高一致：拉伸为指定尺寸
+                image = image.resize(size, Image.LANCZOS)
+                output = io.BytesIO()
+                image.save(output, 'PNG', optimize=True)
+                return output.getvalue()
+        except Exception as e:
+            log_warning(f"缩放签名图片失败，使用原图: {e}", "WORD")
+            return None
+
+    def get_image(self, image_path, width=80, height=20) -> SignatureImage:
+        """
+        读取并缩放签名图片，原图未修改时直接使用缓存
+        :param width: 图片宽度（磅）
+        :param height: 图片高度（磅）
+        """
+        image_path = str(image_path)
+        stat = os.stat(image_path)
+        key = (image_path, width, height)
+        with self._lock:
+            cached = self._images.get(key)
+        if cached and cached[0] == stat.st_mtime_ns:
+            return cached[1]
+
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        scaled = self._scale(data, width, height)
+        if scaled is not None:
+            data, extension = scaled, 'png'
+        else:
+            extension = Path(image_path).suffix.lower().lstrip('.')
+        image = SignatureImage(data, extension, hashlib.sha1(data).hexdigest(), image_path)
+        with self._lock:
+            self._images[key] = (stat.st_mtime_ns, image)
+        return image
+
+    def get_signature(self, staff_name, width=80, height=20) -> SignatureImage:
+        """
+        获取工程师的签名图片，没有找到时使用默认签名
+        :raises FileNotFoundError: 签名和默认签名都不存在
+        """
+        image_path = self.find(staff_name)
+        if not image_path:
+            log_warning(f"未找到staff {staff_name} 的签名图片，使用默认图片", "WORD")
+            image_path = self.find(DEFAULT_SIGNATURE_NAME)
+        if not image_path:
+            raise FileNotFoundError(f"Image file not found: {self.folder / (DEFAULT_SIGNATURE_NAME + '.jpg')}")
+        return self.get_image(image_path, width, height)
+
+    def get_signature_file(self, staff_name, width=80, height=20) -> str:
+        """
+        获取缩放后的签名图片文件（供Word COM插入图片），同一签名只写一次临时文件
+        """
+        image = self.get_signature(staff_name, width, height)
+        with self._lock:
+            path = self._files.get(image.digest)
+        if path and os.path.exists(path):
+            return path
+        folder = Path(tempfile.gettempdir()) / 'checklist_signs'
+        folder.mkdir(exist_ok=True)
+        path = str(folder / f"{image.digest}.{image.extension}")
+        if not os.path.exists(path):
+            # 多个进程共用同一个临时文件夹，先写临时文件再替换，其他进程不会读到写了一半的图片
+            write_file_atomic(path, lambda f: f.write(image.data))
+        with self._lock:
+            self._files[image.digest] = path
+        return path
+
+    def clear(self):
+        with self._lock:
+            self._index, self._index_key = {}, None
+            self._images.clear()
+            self._files.clear()
+
+
+# 创建全局实例
+signature_cache = SignatureCache()
@@ -0,0 +1,234 @@
+"""
+Word表格代理
+包装 word_doc.Tables[i]，在文档打开期间缓存表格行列数、Cell(r, c) 单元格对象、
+每个选项单元格的两个OLE选项按钮对象以及按钮的当前值，
+填写时只对实际需要修改的按钮产生COM调用，不再每行重复读取行列数、单元格和控件
+打开文档后可以用 harvest_activex_controls 遍历一次表格中的 InlineShapes，一次得到所有选项按钮的位置和当前值
+"""
+from types import SimpleNamespace
+
+from src.logger.logger import log_debug, log_error, log_warning
+
+# Range.Information 的参数
+WD_START_OF_RANGE_ROW_NUMBER = 13
+WD_START_OF_RANGE_COLUMN_NUMBER = 16
+
+
+class TableProxy:
+    """
+    Word表格的缓存代理，只在文档打开期间有效（文档关闭后COM对象失效）
+    提供与COM表格相同的 Rows.Count、Columns.Count 和 Cell(row, column)，可以直接传给原有的表格处理函数
+    """
+
+    def __init__(self, table):
+        """
+        :param table: Word表格对象（word_doc.Tables[i]）
+        """
+        self.table = table
+        self._row_count = None
+        self._column_count = None
+        # (行, 列) -> 单元格对象
+        self._cells = {}
+        # (行, 列) -> (InlineShapes集合, 数量)
+        self._inline_shapes = {}
+        # (行, 列) -> 单元格是否包含ActiveX控件
+        self._has_activex = {}
+        # 行 -> 包含ActiveX控件的列（没有时为None）
+        self._activex_columns = {}
+        # (行, 列) -> (是按钮, 否按钮)，控件数量不足时为None
+        self._option_buttons = {}
+        # (行, 列) -> (是按钮的值, 否按钮的值)
+        self._option_values = {}
+        # 是否已通过 harvest_activex_controls 得到表格中的所有控件，之后不再逐行查找
+        self.harvested = False
+
+    @property
+    def row_count(self) -> int:
+        if self._row_count is None:
+            self._row_count = self.table.Rows.Count
+        return self._row_count
+
+    @property
+    def column_count(self) -> int:
+        if self._column_count is None:
+            self._column_count = self.table.Columns.Count
+        return self._column_count
+
+    @property
+    def Rows(self):
+        return SimpleNamespace(Count=self.row_count)
+
+    @property
+    def Columns(self):
+        return SimpleNamespace(Count=self.column_count)
+
+    def Cell(self, row, column):
+        """获取单元格，同一位置只访问一次COM"""
+        key = (row, column)
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = self.table.Cell(row, column)
+        return cell
+
+    def __getattr__(self, name):
+        # 其他属性直接访问原表格
+        return getattr(self.table, name)
+
+    def _get_inline_shapes(self, row, column):
+        key = (row, column)
+        cached = self._inline_shapes.get(key)
+        if cached is None:
+            shapes = self.Cell(row, column).Range.InlineShapes
+            cached = self._inline_shapes[key] = (shapes, shapes.Count)
+        return cached
+
+    def set_harvested_controls(self, controls):
+        """
+        记录遍历文档得到的控件，表格中没有记录的单元格视为没有控件
+        :param controls: (行, 列) -> [(按钮对象, 当前值), ...]，按在文档中的顺序排列
+        """
+        self._has_activex = {}
+        self._activex_columns = {}
+        self._option_buttons = {}
+        self._option_values = {}
+        for (row, column), buttons in sorted(controls.items()):
+            self._has_activex[(row, column)] = True
+            self._activex_columns.setdefault(row, column)
+            if len(buttons) < 2:
+                self._option_buttons[(row, column)] = None
+                continue
+            self._option_buttons[(row, column)] = (buttons[0][0], buttons[1][0])
+            self._option_values[(row, column)] = (buttons[0][1], buttons[1][1])
+        self.harvested = True
+
+    def activex_count(self, row, column) -> int:
+        """单元格中内嵌对象（ActiveX控件、图片）的数量"""
+        return self._get_inline_shapes(row, column)[1]
+
+    def has_activex(self, row, column) -> bool:
+        """单元格是否包含ActiveX控件"""
+        key = (row, column)
+        found = self._has_activex.get(key)
+        if found is None and self.harvested:
+            return False
+        if found is None:
+            shapes, count = self._get_inline_shapes(row, column)
+            found = False
+            if count > 0:
+                for shape in shapes:
+                    if hasattr(shape, 'OLEFormat') and shape.OLEFormat is not None:
+                        found = True
+                        break
+            self._has_activex[key] = found
+        return found
+
+    def find_activex_column(self, row):
+        """
+        查找指定行中包含ActiveX控件的列
+        :param row: 行索引（从1开始）
+        :return: 列索引，没有找到时返回None
+        """
+        if row in self._activex_columns or self.harvested:
+            return self._activex_columns.get(row)
+        if row < 1 or row > self.row_count:
+            log_error(f"Invalid row index: {row}. Must be between 1 and {self.row_count}", "WORD")
+            return None
+        found = None
+        for column in range(1, self.column_count + 1):
+            try:
+                if self.has_activex(row, column):
+                    found = column
+                    break
+            except Exception as e:
+                log_debug(f"Error accessing cell at row {row}, column {column}: {str(e)}", "WORD")
+                continue
+        self._activex_columns[row] = found
+        return found
+
+    def option_buttons(self, row, column):
+        """
+        单元格中的两个选项按钮（是、否）
+        :return: (是按钮, 否按钮)，控件数量不足时返回None
+        """
+        key = (row, column)
+        if key not in self._option_buttons:
+            shapes, count = self._get_inline_shapes(row, column)
+            if count < 2:
+                self._option_buttons[key] = None
+            else:
+                self._option_buttons[key] = (shapes[0].OLEFormat.Object, shapes[1].OLEFormat.Object)
+        return self._option_buttons[key]
+
+    def set_option(self, row, column, value) -> int:
+        """
+        设置选项单元格的值，只写入与当前值不同的按钮
+        :param value: 要设置的值（True为是，False为否）
+        :return: 写入的按钮数量
+        """
+        key = (row, column)
+        try:
+            buttons = self.option_buttons(row, column)
+            if buttons is None:
+                log_warning("单元格中ActiveX控件数量不足", "WORD")
+                return 0
+            values = self._option_values.get(key)
+            if values is None:
+                values = (buttons[0].Value, buttons[1].Value)
+            writes = 0
+            if values[0] != value:
+                buttons[0].Value = value
+                writes += 1
+            if values[1] == value:
+                buttons[1].Value = not value
+                writes += 1
+            self._option_values[key] = (value, not value)
+            return writes
+        except Exception as e:
+            log_error(f"设置选项单元格时出错: {str(e)}", "WORD")
+            # 丢弃这个单元格的缓存，直接通过单元格重新设置
+            self._option_buttons.pop(key, None)
+            self._option_values.pop(key, None)
+            shapes = self.Cell(row, column).Range.InlineShapes
+            shapes[0].OLEFormat.Object.Value = value
+            shapes[1].OLEFormat.Object.Value = not value
+            self._option_values[key] = (value, not value)
+            return 2
+
+
+def harvest_activex_controls(tables):
+    """
+    每个表格遍历一次 Range.InlineShapes，记录每个OLE控件所在的行、列和当前值，
+    按行组成 (是按钮, 否按钮) 保存到表格代理中
+    同一行的选项按钮在同一个单元格中，每行只读取第一个控件的列号
+    不依赖 activex_config.json 中的位置，模板与配置不一致时同样可用
+    :param tables: 表格索引 -> TableProxy
+    :return: 找到的控件数量
+    """
+    harvested = {}
+    count = 0
+    for index, proxy in tables.items():
+        # 行 -> 列
+        columns = {}
+        controls = {}
+        for shape in proxy.table.Range.InlineShapes:
+            try:
+                ole_format = shape.OLEFormat
+            except Exception:
+                # 图片等不是OLE对象
+                continue
+            if ole_format is None:
+                continue
+            shape_range = shape.Range
+            row = shape_range.Information(WD_START_OF_RANGE_ROW_NUMBER)
+            column = columns.get(row)
+            if column is None:
+                column = columns[row] = shape_range.Information(WD_START_OF_RANGE_COLUMN_NUMBER)
+            button = ole_format.Object
+            controls.setdefault((row, column), []).append((button, button.Value))
+            count += 1
+        harvested[index] = controls
+    # 全部遍历成功后才写入代理，中途出错时代理仍按单元格逐行查找
+    for index, proxy in tables.items():
+        proxy.set_harvested_controls(harvested[index])
+    log_debug(f"已收集表格中的 {count} 个ActiveX控件", "WORD")
+    return count
@@ -3,9 +3,28 @@
 负责任务状态更新和进度记录
 """
 import datetime
+import pandas as pd
+from src.config.config_manager import config_manager
 from src.data.data_manager import data_manager
+from src.funcs.file_utils import detect_checklist_folders_status, folder_precheck
+from src.funcs.fill_state import check_fill_unchanged, record_fill_state
+from src.funcs.folder_snapshot import JobFolderSnapshot
+from src.funcs.path_resolver import get_working_folder_path
+from src.funcs.word_automation import get_word_backend
+from src.funcs.word_processor import set_checklist
 from src.logger.logger import log_info, log_error, log_warning, log_debug
 
+# 路径解析阶段的状态：只有 STATUS_RESOLVED 的任务需要继续填写检查清单
+STATUS_RESOLVED = '已处理'
+STATUS_NOT_FOUND = '未找到目录'
+STATUS_BROKEN_SHORTCUT = '快捷方式已损坏'
+STATUS_PRECHECK_FAILED = '文件夹预检查失败'
+# 填写阶段的状态
+STATUS_COMPLETED = '完成'
+STATUS_UNCHANGED = '未变化'    # 检查清单已经是期望状态，跳过填写
+STATUS_FAILED = '失败'
+STATUS_NO_PERMISSION = '无写入权限'
+
 def update_task_status(job_no: str, status: str):
     """更新任务状态"""
     result = data_manager.get_result_by_job_no(job_no)
@@ -25,3 +44,111 @@ def log_task_progress(job_no: str, message: str):
             'message': message
         })
         log_info(f"任务 {job_no}: {message}")
+
+
+def read_tasks_from_excel(excel_file_path, task_list_map):
+    """
+    从Excel文件读取任务列表
+    :param task_list_map: 任务字段 -> 列索引，见 user.json 的 task_list_map
+    :return: 任务字典列表
+    """
+    df = pd.read_excel(excel_file_path)
+    tasks = []
+    for _, row in df.iloc[0:].iterrows():
+        task = {key: str(row.iloc[value]) for key, value in task_list_map.items()}
+        tasks.append(task)
+    return tasks
+
+
+def build_task_result(task, target_path, status):
+    """创建任务结果记录（data_manager 中的一行）"""
+    return {
+        'job_no': task['job_no'],
+        'job_creator': task['job_creator'],
+        'engineers': task['engineers'],
+        'target_path': str(target_path) if target_path is not None else None,
+        'status': status,
+        'folders': {}
+    }
+
+
+def resolve_task(base_dir, team, task, force_rescan=False):
+    """
+    解析单个任务的工作目录并进行文件夹预检查
+    :param force_rescan: 为True时后续子文件夹检测不使用缓存
+    :return: 字典 {'task', 'target_path', 'snapshot', 'result'}，result['status'] 为 STATUS_RESOLVED 时可以继续填写
+    """
+    job_no = task['job_no'].strip()
+    target_path = get_working_folder_path(base_dir, team, job_no)
+    log_info(f"target_path: {target_path}", "PATH")
+    if target_path is None:
+        status = STATUS_NOT_FOUND
+    elif str(target_path).strip() == ".":
+        status = STATUS_BROKEN_SHORTCUT
+    else:
+        status = STATUS_RESOLVED
+    resolved = {
+        'task': task,
+        'target_path': target_path,
+        'snapshot': None,
+        'folder_statuses': None,
+        'result': build_task_result(task, target_path, status)
+    }
+    if status != STATUS_RESOLVED:
+        log_error(f"任务 {task['job_no']} 的工作目录未找到")
+        return resolved
+
+    # 预检查、子文件夹检测和检查清单查找共用同一份目录快照
+    snapshot = JobFolderSnapshot(target_path, force_rescan)
+    if not folder_precheck(target_path, team, snapshot):
+        log_error(f"任务 {task['job_no']} 的文件夹预检查失败")
+        resolved['result']['status'] = STATUS_PRECHECK_FAILED
+        return resolved
+    resolved['snapshot'] = snapshot
+    return resolved
+
+
+def scan_resolved_task(resolved, team, sub_folder_config):
+    """
+    检测已通过预检查的任务的子文件夹状态，结果保存在 resolved['folder_statuses'] 中
+    :return: 检测成功返回True；失败时任务状态设为失败并返回False
+    """
+    try:
+        resolved['folder_statuses'] = detect_checklist_folders_status(
+            resolved['target_path'], team, sub_folder_config, resolved['snapshot']
+        )
+        return True
+    except Exception as e:
+        log_error(f"{resolved['task']['job_no']}检测子文件夹失败: {e}")
+        resolved['result']['status'] = STATUS_FAILED
+        return False
+
+
+def fill_resolved_task(resolved, team, sub_folder_config, engine=None, force=False):
+    """
+    为已通过预检查的任务填写检查清单
+    已执行 scan_resolved_task 时使用其检测结果，否则在 set_checklist 中检测子文件夹
+    :param resolved: resolve_task 的结果
+    :param engine: 填写引擎，为None时读取用户配置 fill_engine
+    :param force: 为True时即使检查清单已经是期望状态也重新填写
+    :return: 更新了状态的任务结果
+    """
+    task = resolved['task']
+    result = resolved['result']
+    if not force and check_fill_unchanged(resolved, team, sub_folder_config):
+        result['status'] = STATUS_UNCHANGED
+        return result
+    if engine is None:
+        engine = config_manager.get_user_config('fill_engine', 'word')
+    if engine == 'word':
+        # 结束所有Word进程，确保文件夹检查不受干扰
+        get_word_backend().kill_processes()
+    try:
+        set_checklist(task, resolved['target_path'], team, sub_folder_config, engine=engine,
+                      snapshot=resolved['snapshot'], folder_statuses=resolved.get('folder_statuses'))
+        result['status'] = STATUS_COMPLETED
+        record_fill_state(resolved)
+    except Exception as e:
+        log_error(f"{task['job_no']}设置检查列表失败: {e}")
+        result['status'] = STATUS_NO_PERMISSION if isinstance(e, PermissionError) else STATUS_FAILED
+    return result
@@ -0,0 +1,157 @@
+"""
+模板指纹登记
+activex_config.json 中每个模板的ActiveX位置配置同时保存模板文件的内容哈希（template_hash），
+启动时比较哈希判断配置是否与当前模板一致，不一致时直接从模板.docx重新生成，无法重新生成时给出警告
+"""
+import json
+import threading
+from pathlib import Path
+
+from src.config.atomic_file import write_file_atomic
+from src.config.compiled_cache import file_hash
+from src.config.config_manager import get_system_config
+from src.logger.logger import log_info, log_warning
+
+TEMPLATE_NAMES = ('general_template', 'ppt_template')
+TEMPLATE_HASH_KEY = 'template_hash'
+
+_registry_lock = threading.Lock()
+
+
+def get_activex_config_path():
+    return Path.cwd() / 'activex_config.json'
+
+
+def _read_activex_config():
+    config_path = get_activex_config_path()
+    if not config_path.exists():
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_activex_config(config):
+    """先写临时文件再替换，避免写入中断时配置文件损坏"""
+    data = json.dumps(config, indent=2, ensure_ascii=False).encode('utf-8')
+    write_file_atomic(get_activex_config_path(), lambda f: f.write(data))
+
+
+def get_template_map_status(template_name, activex_config=None):
+    """
+    检查模板的ActiveX位置配置是否与模板文件一致
+    :param activex_config: activex_config.json 的内容，为None时读取文件
+    :return: 字典，包含 template_name、template_path、exists（模板是否存在）、current（配置是否一致）、
+             stored_hash（配置中登记的哈希）、actual_hash（模板当前哈希）
+    """
+    from src.funcs.word_processor import get_template_path
+
+    if activex_config is None:
+        activex_config = _read_activex_config()
+    template_path = get_template_path(template_name)
+    actual_hash = file_hash(template_path)
+    stored_hash = activex_config.get(template_name, {}).get(TEMPLATE_HASH_KEY)
+    return {
+        'template_name': template_name,
+        'template_path': str(template_path),
+        'exists': actual_hash is not None,
+        'current': actual_hash is not None and stored_hash == actual_hash,
+        'stored_hash': stored_hash,
+        'actual_hash': actual_hash
+    }
+
+
+def is_activex_map_current(template_name):
+    """模板的ActiveX位置配置是否与当前模板文件一致"""
+    return get_template_map_status(template_name)['current']
+
+
+def _scanned_from(template_path):
+    """配置中记录的模板来源，程序目录下的模板记录相对路径（如 templates/general_template.docx）"""
+    template_path = Path(template_path)
+    try:
+        return template_path.resolve().relative_to(Path.cwd().resolve()).as_posix()
+    except ValueError:
+        return template_path.name
+
+
+def build_activex_map(template_name, template_path=None, positions=None):
+    """
+    生成模板的ActiveX位置配置，并登记模板哈希
+    :param template_path: 模板文件路径，为None时使用 templates 文件夹中的模板
+    :param positions: 已扫描到的位置（如通过Word COM扫描.doc模板），为None时直接解析模板.docx
+    :return: 模板配置
+    """
+    from src.funcs.docx_processor import scan_activex_positions_docx
+    from src.funcs.word_processor import get_template_path
+
+    if template_path is None:
+        template_path = get_template_path(template_name)
+    if positions is None:
+        positions = scan_activex_positions_docx(str(template_path))
+    template_config = {
+        "description": f"{template_name}模板ActiveX控件位置配置",
+        "scanned_from": _scanned_from(template_path),
+        TEMPLATE_HASH_KEY: file_hash(template_path)
+    }
+    template_config.update(positions)
+    return template_config
+
+
+def save_activex_maps(template_configs, activex_config=None):
+    """
+    把模板配置合并写入 activex_config.json，并丢弃已加载的配置和填写计划
+    :param template_configs: 模板名称 -> 模板配置
+    :param activex_config: activex_config.json 的现有内容，为None时读取文件
+    """
+    from src.funcs.word_processor import reset_activex_config_cache
+
+    with _registry_lock:
+        if activex_config is None:
+            activex_config = _read_activex_config()
+        activex_config.update(template_configs)
+        _write_activex_config(activex_config)
+    reset_activex_config_cache()
+
+
+def regenerate_activex_map(template_name, activex_config=None):
+    """
+    从模板.docx重新生成ActiveX位置配置并登记模板哈希，写回 activex_config.json
+    :return: 重新生成的模板配置
+    """
+    template_config = build_activex_map(template_name)
+    save_activex_maps({template_name: template_config}, activex_config)
+    log_info(f"已根据模板重新生成ActiveX位置配置: {template_name}", "WORD")
+    return template_config
+
+
+def ensure_activex_map_current(template_name, regenerate=None):
+    """
+    确保模板的ActiveX位置配置是最新的
+    :param regenerate: 配置过期时是否重新生成，为None时读取 system.json 的 activex_map.auto_regenerate
+    :return: 配置是否与模板一致（可以使用配置中的位置）
+    """
+    status = get_template_map_status(template_name)
+    if status['current']:
+        return True
+    if not status['exists']:
+        log_warning(f"模板文件不存在: {status['template_path']}", "WORD")
+        return False
+    if regenerate is None:
+        regenerate = get_system_config('activex_map.auto_regenerate', True)
+    if regenerate:
+        try:
+            regenerate_activex_map(template_name)
+            return True
+        except Exception as e:
+            log_warning(f"重新生成ActiveX位置配置失败: {template_name}: {e}", "WORD")
+            return False
+    log_warning(f"ActiveX位置配置与模板 {template_name} 不一致，请运行 scan_activex.py 重新生成", "WORD")
+    return False
+
+
+def check_activex_maps(regenerate=None):
+    """
+    启动时检查所有模板的ActiveX位置配置
+    :return: 模板名称 -> 配置是否与模板一致
+    """
+    return {template_name: ensure_activex_map_current(template_name, regenerate) for template_name in TEMPLATE_NAMES}
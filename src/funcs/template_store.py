@@ -0,0 +1,80 @@
+"""
+检查清单模板存储
+覆盖模式下每个模板在一次运行中只读取一次并保存在内存中（docx引擎同时保存解析好的文档），
+在本地生成填写好的检查清单后，一次写入项目文件夹（先写临时文件再重命名），不再向每个项目文件夹复制模板
+"""
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from src.config.atomic_file import write_file_atomic
+from src.logger.logger import log_debug
+
+
+def copy_file_atomic(source_path, path):
+    """把本地文件一次写入目标路径（先写临时文件再重命名）"""
+    with open(source_path, 'rb') as source:
+        data = source.read()
+    write_file_atomic(path, lambda f: f.write(data))
+
+
+class TemplateStore:
+    """内存中的模板缓存，模板文件修改后自动重新读取"""
+
+    def __init__(self):
+        # 模板路径 -> {'signature': (修改时间, 大小), 'data': 模板内容, 'document': 解析好的DocxChecklist}
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, template_path):
+        template_path = str(template_path)
+        stat = os.stat(template_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._templates.get(template_path)
+            if entry is None or entry['signature'] != signature:
+                with open(template_path, 'rb') as f:
+                    data = f.read()
+                entry = {'signature': signature, 'data': data, 'document': None}
+                self._templates[template_path] = entry
+                log_debug(f"模板已读入内存: {template_path}", "WORD")
+            return entry
+
+    def get_bytes(self, template_path) -> bytes:
+        """模板文件内容"""
+        return self._entry(template_path)['data']
+
+    def open_document(self, template_path):
+        """
+        基于模板新建一个待填写的docx文档，模板只解析一次
+        :return: DocxChecklist，每次调用返回独立的副本
+        """
+        from src.funcs.docx_processor import DocxChecklist
+
+        entry = self._entry(template_path)
+        with self._lock:
+            if entry['document'] is None:
+                entry['document'] = DocxChecklist(entry['data'])
+            document = entry['document']
+        return document.copy()
+
+    def create_working_copy(self, template_path) -> str:
+        """
+        在本地临时文件夹生成模板副本（供Word COM打开填写），调用方用完后删除
+        :return: 副本路径
+        """
+        folder = Path(tempfile.gettempdir()) / 'checklist_work'
+        folder.mkdir(exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix='checklist-', suffix=Path(template_path).suffix, dir=str(folder))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.get_bytes(template_path))
+        return path
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+# 创建全局实例
+template_store = TemplateStore()
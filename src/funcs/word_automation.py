@@ -0,0 +1,544 @@
+"""
+Word自动化接口
+填写代码通过 get_word_backend() 获取 Word.Application 对象，不直接调用 win32com，有两种实现：
+ComWordBackend 通过pywin32调用真实的Word；FakeWordBackend 在内存中按模板.docx模拟填写用到的Word对象模型
+（Documents、Tables、Cell、Range、InlineShapes、OLEFormat.Object.Value），每次调用可设置延迟并统计调用次数，
+用于在Linux上测试填写流程、统计COM调用次数和耗时
+"""
+import threading
+import time
+from collections import Counter
+
+from src.funcs.process_manager import kill_all_word_processes
+from src.logger.logger import log_debug
+
+try:
+    import win32com.client as win32
+except ImportError:
+    # 非Windows环境（如Linux构建/测试机）没有pywin32，只能使用docx引擎或模拟的Word
+    win32 = None
+
+
+class WordBackend:
+    """Word自动化后端"""
+
+    name = None
+
+    def dispatch(self):
+        """创建 Word.Application 对象"""
+        raise NotImplementedError
+
+    def kill_processes(self):
+        """结束残留的Word进程"""
+
+
+class ComWordBackend(WordBackend):
+    """通过pywin32调用真实的Word"""
+
+    name = 'com'
+
+    def dispatch(self):
+        if win32 is None:
+            raise RuntimeError("没有安装pywin32，无法使用Word引擎，请使用docx引擎")
+        return win32.Dispatch('Word.Application')
+
+    def kill_processes(self):
+        kill_all_word_processes()
+
+
+class FakeComError(Exception):
+    """模拟的COM调用错误（对应 pywintypes.com_error）"""
+
+
+class FakeWordBackend(WordBackend):
+    """
+    内存中模拟的Word，文档内容由 DocxChecklist 读写，保存后可以直接检查填写结果
+    每次属性访问或方法调用记为一次COM调用，按"对象类型.成员"统计
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency=0.0, latencies=None):
+        """
+        :param latency: 每次COM调用的延迟（秒）
+        :param latencies: 按成员设置的延迟，键为"对象类型.成员"（如 Table.Cell）或成员名（如 Cell）
+        """
+        self.latency = latency
+        self.latencies = dict(latencies or {})
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, member):
+        """记录一次COM调用并按配置延迟"""
+        with self._lock:
+            self.calls[member] += 1
+        delay = self.latencies.get(member, self.latencies.get(member.rsplit('.', 1)[-1], self.latency))
+        if delay:
+            time.sleep(delay)
+
+    @property
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls.clear()
+
+    def dispatch(self):
+        self.record('Application.Dispatch')
+        return FakeWordApplication(self)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_word_backend() -> WordBackend:
+    """当前使用的Word自动化后端，默认为 ComWordBackend"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = ComWordBackend()
+        return _backend
+
+
+def set_word_backend(backend):
+    """
+    切换Word自动化后端（测试和性能测试时使用 FakeWordBackend）
+    :return: 之前的后端
+    """
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    log_debug(f"Word自动化后端: {backend.name if backend else None}", "WORD")
+    return previous
+
+
+# ---------------------------------------------------------------------------
+# 模拟的Word对象模型
+# pywin32中集合用 [] 访问时从0开始，Item() 从1开始，与之保持一致
+# ---------------------------------------------------------------------------
+
+class _ComProperty:
+    """读写都记为一次COM调用的简单属性"""
+
+    def __init__(self, default=None):
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        obj._record(self.name)
+        return obj.__dict__.get(self.name, self.default)
+
+    def __set__(self, obj, value):
+        obj._record(self.name)
+        obj.__dict__[self.name] = value
+
+
+class _FakeComObject:
+    _type_name = 'Object'
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def _record(self, member):
+        self._backend.record(f"{self._type_name}.{member}")
+
+
+class _FakeCollection(_FakeComObject):
+    def _items(self):
+        raise NotImplementedError
+
+    @property
+    def Count(self):
+        self._record('Count')
+        return len(self._items())
+
+    def Item(self, index):
+        self._record('Item')
+        items = self._items()
+        if not 1 <= index <= len(items):
+            raise FakeComError("The requested member of the collection does not exist.")
+        return items[index - 1]
+
+    def __getitem__(self, index):
+        self._record('Item')
+        items = self._items()
+        if not 0 <= index < len(items):
+            raise IndexError(index)
+        return items[index]
+
+    def __iter__(self):
+        self._record('_NewEnum')
+        return iter(list(self._items()))
+
+    def __len__(self):
+        return len(self._items())
+
+
+class FakeOptions(_FakeComObject):
+    _type_name = 'Options'
+    CheckSpellingAsYouType = _ComProperty(True)
+    CheckGrammarAsYouType = _ComProperty(True)
+    SuggestSpellingCorrections = _ComProperty(True)
+    AutoFormatAsYouTypeApplyBorders = _ComProperty(True)
+    AutoFormatAsYouTypeApplyBulletedLists = _ComProperty(True)
+    AutoFormatAsYouTypeApplyNumberedLists = _ComProperty(True)
+
+
+class FakeWordApplication(_FakeComObject):
+    _type_name = 'Application'
+    Visible = _ComProperty(True)
+    ScreenUpdating = _ComProperty(True)
+    DisplayAlerts = _ComProperty(-1)
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        self._options = FakeOptions(backend)
+        self._documents = FakeDocuments(backend, self)
+        self._quit = False
+
+    def _check(self):
+        if self._quit:
+            raise FakeComError("The RPC server is unavailable.")
+
+    @property
+    def Version(self):
+        self._record('Version')
+        self._check()
+        return '16.0'
+
+    @property
+    def Options(self):
+        self._record('Options')
+        return self._options
+
+    @property
+    def Documents(self):
+        self._record('Documents')
+        self._check()
+        return self._documents
+
+    def Quit(self, *args, **kwargs):
+        self._record('Quit')
+        self._quit = True
+
+
+class FakeDocuments(_FakeCollection):
+    _type_name = 'Documents'
+
+    def __init__(self, backend, application):
+        super().__init__(backend)
+        self._application = application
+        self._open = []
+
+    def _items(self):
+        return [document for document in self._open if not document._closed]
+
+    def Open(self, FileName, *args, **kwargs):
+        from src.funcs.docx_processor import DocxChecklist
+
+        self._record('Open')
+        try:
+            checklist = DocxChecklist(str(FileName))
+        except Exception as e:
+            raise FakeComError(f"Word无法打开文档: {FileName}: {e}")
+        document = FakeDocument(self._backend, str(FileName), checklist)
+        self._open.append(document)
+        return document
+
+
+class FakeDocument(_FakeComObject):
+    _type_name = 'Document'
+    TrackRevisions = _ComProperty(False)
+    ShowRevisions = _ComProperty(True)
+
+    def __init__(self, backend, path, checklist):
+        super().__init__(backend)
+        self.FullName = path
+        self.checklist = checklist
+        # (表格, 行, 列) -> 插入的图片
+        self._pictures = {}
+        self._closed = False
+        self._tables = FakeTables(backend, self)
+
+    def _check(self):
+        if self._closed:
+            raise FakeComError("The object invoked has disconnected from its clients.")
+
+    @property
+    def Tables(self):
+        self._record('Tables')
+        self._check()
+        return self._tables
+
+    def Save(self):
+        self._record('Save')
+        self._check()
+        self.checklist.save(self.FullName)
+
+    def Close(self, SaveChanges=None, *args, **kwargs):
+        self._record('Close')
+        self._check()
+        self._closed = True
+
+
+class FakeTableInlineShapes(_FakeCollection):
+    """表格中的所有内嵌对象，按在文档中的顺序排列"""
+    _type_name = 'InlineShapes'
+
+    def __init__(self, backend, document, table_index):
+        super().__init__(backend)
+        self._document = document
+        self._table_index = table_index
+
+    def _items(self):
+        checklist = self._document.checklist
+        shapes = []
+        for row in range(1, checklist.row_count(self._table_index) + 1):
+            for column in range(1, checklist.cell_count(self._table_index, row) + 1):
+                cell_shapes = FakeInlineShapes(self._backend, self._document, (self._table_index, row, column))
+                shapes.extend(cell_shapes._items())
+        return shapes
+
+
+class FakeTables(_FakeCollection):
+    _type_name = 'Tables'
+
+    def __init__(self, backend, document):
+        super().__init__(backend)
+        self._document = document
+        self._tables = [FakeTable(backend, document, i) for i in range(document.checklist.table_count)]
+
+    def _items(self):
+        return self._tables
+
+
+class _FakeCount(_FakeComObject):
+    """Rows、Columns 等只用到 Count 的集合"""
+
+    def __init__(self, backend, type_name, count):
+        super().__init__(backend)
+        self._type_name = type_name
+        self._count = count
+
+    @property
+    def Count(self):
+        self._record('Count')
+        return self._count
+
+
+class FakeTable(_FakeComObject):
+    _type_name = 'Table'
+
+    def __init__(self, backend, document, index):
+        super().__init__(backend)
+        self._document = document
+        self._index = index
+
+    @property
+    def _checklist(self):
+        return self._document.checklist
+
+    @property
+    def Rows(self):
+        self._record('Rows')
+        return _FakeCount(self._backend, 'Rows', self._checklist.row_count(self._index))
+
+    @property
+    def Columns(self):
+        self._record('Columns')
+        checklist = self._checklist
+        columns = max([checklist.cell_count(self._index, row)
+                       for row in range(1, checklist.row_count(self._index) + 1)] + [0])
+        return _FakeCount(self._backend, 'Columns', columns)
+
+    @property
+    def Range(self):
+        self._record('Range')
+        return FakeTableRange(self._backend, self._document, self._index)
+
+    def Cell(self, Row, Column):
+        self._record('Cell')
+        self._document._check()
+        checklist = self._checklist
+        if not (1 <= Row <= checklist.row_count(self._index)
+                and 1 <= Column <= checklist.cell_count(self._index, Row)):
+            raise FakeComError("The requested member of the collection does not exist.")
+        return FakeCell(self._backend, self._document, (self._index, Row, Column))
+
+
+class FakeTableRange(_FakeComObject):
+    _type_name = 'Range'
+
+    def __init__(self, backend, document, table_index):
+        super().__init__(backend)
+        self._document = document
+        self._table_index = table_index
+
+    @property
+    def InlineShapes(self):
+        self._record('InlineShapes')
+        return FakeTableInlineShapes(self._backend, self._document, self._table_index)
+
+
+class FakeCell(_FakeComObject):
+    _type_name = 'Cell'
+    VerticalAlignment = _ComProperty(0)
+
+    def __init__(self, backend, document, position):
+        super().__init__(backend)
+        self._document = document
+        self._position = position
+
+    @property
+    def Range(self):
+        self._record('Range')
+        return FakeRange(self._backend, self._document, self._position)
+
+
+class FakeParagraphFormat(_FakeComObject):
+    _type_name = 'ParagraphFormat'
+    Alignment = _ComProperty(0)
+
+
+class FakeRange(_FakeComObject):
+    _type_name = 'Range'
+
+    def __init__(self, backend, document, position):
+        super().__init__(backend)
+        self._document = document
+        self._position = position
+
+    @property
+    def Text(self):
+        self._record('Text')
+        # Word中单元格文本以段落标记和单元格结束标记结尾
+        return self._document.checklist.get_cell_text(*self._position) + '\r\x07'
+
+    @Text.setter
+    def Text(self, value):
+        self._record('Text')
+        self._document.checklist.set_cell_text(*self._position, str(value))
+
+    def Information(self, Type):
+        """支持 wdWithInTable(12)、wdStartOfRangeRowNumber(13)、wdStartOfRangeColumnNumber(16)"""
+        self._record('Information')
+        if Type == 12:
+            return True
+        if Type == 13:
+            return self._position[1]
+        if Type == 16:
+            return self._position[2]
+        raise FakeComError(f"不支持的Information类型: {Type}")
+
+    @property
+    def ParagraphFormat(self):
+        self._record('ParagraphFormat')
+        return FakeParagraphFormat(self._backend)
+
+    @property
+    def InlineShapes(self):
+        self._record('InlineShapes')
+        return FakeInlineShapes(self._backend, self._document, self._position)
+
+
+class FakeInlineShapes(_FakeCollection):
+    _type_name = 'InlineShapes'
+
+    def __init__(self, backend, document, position):
+        super().__init__(backend)
+        self._document = document
+        self._position = position
+
+    def _items(self):
+        controls = [FakeInlineShape(self._backend, self._document, self._position, part_name)
+                    for part_name in self._document.checklist.get_cell_controls(*self._position)]
+        return controls + self._document._pictures.get(self._position, [])
+
+    def AddPicture(self, FileName, LinkToFile=False, SaveWithDocument=True, *args, **kwargs):
+        self._record('AddPicture')
+        self._document.checklist.add_cell_image(*self._position, str(FileName))
+        shape = FakeInlineShape(self._backend, self._document, self._position)
+        self._document._pictures.setdefault(self._position, []).append(shape)
+        return shape
+
+
+class FakeInlineShape(_FakeComObject):
+    _type_name = 'InlineShape'
+    Width = _ComProperty(80)
+    Height = _ComProperty(20)
+
+    def __init__(self, backend, document, position, part_name=None):
+        """
+        :param part_name: ActiveX控件的.bin部件，为None时为图片
+        """
+        super().__init__(backend)
+        self._document = document
+        self._position = position
+        self._part_name = part_name
+
+    @property
+    def Range(self):
+        self._record('Range')
+        return FakeRange(self._backend, self._document, self._position)
+
+    @property
+    def OLEFormat(self):
+        self._record('OLEFormat')
+        if self._part_name is None:
+            return None
+        return FakeOLEFormat(self._backend, self._document, self._part_name)
+
+    def ConvertToShape(self):
+        """转换为浮动图形后不再属于单元格的 InlineShapes"""
+        self._record('ConvertToShape')
+        pictures = self._document._pictures.get(self._position, [])
+        if self in pictures:
+            pictures.remove(self)
+        return FakeShape(self._backend)
+
+
+class FakeShape(_FakeComObject):
+    _type_name = 'Shape'
+    RelativeVerticalPosition = _ComProperty(0)
+    Left = _ComProperty(0)
+    Top = _ComProperty(0)
+
+
+class FakeOLEFormat(_FakeComObject):
+    _type_name = 'OLEFormat'
+
+    def __init__(self, backend, document, part_name):
+        super().__init__(backend)
+        self._document = document
+        self._part_name = part_name
+
+    @property
+    def Object(self):
+        self._record('Object')
+        return FakeOptionButton(self._backend, self._document, self._part_name)
+
+
+class FakeOptionButton(_FakeComObject):
+    _type_name = 'OptionButton'
+
+    def __init__(self, backend, document, part_name):
+        super().__init__(backend)
+        self._document = document
+        self._part_name = part_name
+
+    @property
+    def Value(self):
+        self._record('Value')
+        return self._document.checklist.get_option_value(self._part_name)
+
+    @Value.setter
+    def Value(self, value):
+        self._record('Value')
+        self._document.checklist.set_option_value(self._part_name, bool(value))
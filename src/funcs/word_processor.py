@@ -4,34 +4,48 @@ Word文档处理模块
 """
 import json
 from datetime import date
-import glob
 import os
-import shutil
+import time
 from numpy import number
-import win32com.client as win32
 from pathlib import Path
+from typing import NamedTuple, Optional
 from array import array
 from src.config import config_manager
-from src.funcs.process_manager import kill_all_word_processes
-from src.funcs.file_utils import detect_folders_status
+from src.config.compiled_cache import file_hash, hash_bytes
+from src.funcs.com_profiler import com_profiler
 from src.funcs.file_utils import detect_folders_status
+from src.funcs.file_utils import detect_checklist_folders_status
+from src.funcs.fill_plan import OP_DATE, OP_IMAGE, OP_OPTION, FillPlan, compile_fill_plan
+from src.funcs.fill_policy import (FAILURE_LABELS, FAILURE_OTHER, FAILURE_TRANSIENT, ComCircuitOpenError,
+                                   CorruptChecklistError, classify_fill_error, com_circuit_breaker,
+                                   get_downgrade_engine, get_max_retries, get_retry_delay)
+from src.funcs.folder_snapshot import JobFolderSnapshot
+from src.funcs.signature_cache import signature_cache
+from src.funcs.table_proxy import TableProxy, harvest_activex_controls
+from src.funcs.template_store import copy_file_atomic, template_store
+from src.funcs.word_automation import get_word_backend
 from src.logger.logger import log_info, log_error, log_warning, log_debug
 
 # 全局变量，用于缓存ActiveX配置和Word应用程序实例
 _activex_config_cache = None
+_activex_config_hash = None
+_fill_plan_cache = {}
 _word_app_cache = None
+_word_app_backend = None
 _word_app_lock = False
 
 
 def get_cached_word_app():
     """获取缓存的Word应用程序实例，如果不存在则创建新的"""
-    global _word_app_cache, _word_app_lock
+    global _word_app_cache, _word_app_backend, _word_app_lock
     
     if _word_app_lock:
         # 如果正在使用中，创建新实例
         return create_optimized_word_app()
     
-    if _word_app_cache is None:
+    if _word_app_cache is None or _word_app_backend is not get_word_backend():
+        # 切换了Word自动化后端时不再使用之前的实例
+        _word_app_backend = get_word_backend()
         _word_app_cache = create_optimized_word_app()
     
     try:
@@ -48,7 +62,7 @@ def get_cached_word_app():
 def create_optimized_word_app():
     """创建优化配置的Word应用程序实例"""
     try:
-        word = win32.Dispatch('Word.Application')
+        word = get_word_backend().dispatch()
         word.Visible = False  # 不显示界面
         
         # 性能优化设置
@@ -88,12 +102,12 @@ def release_word_app_cache():
             log_error(f"释放Word应用程序时出错: {str(e)}", "WORD")
         finally:
             _word_app_cache = None
-            kill_all_word_processes()
+            get_word_backend().kill_processes()
 
 
 def load_activex_config():
     """加载ActiveX控件位置配置文件"""
-    global _activex_config_cache
+    global _activex_config_cache, _activex_config_hash
     
     if _activex_config_cache is not None:
         return _activex_config_cache
@@ -102,10 +116,12 @@ def load_activex_config():
     
     try:
         if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                _activex_config_cache = json.load(f)
-                log_debug(f"已加载ActiveX配置文件: {config_path}", "WORD")
-                return _activex_config_cache
+            with open(config_path, 'rb') as f:
+                data = f.read()
+            _activex_config_cache = json.loads(data.decode('utf-8'))
+            _activex_config_hash = hash_bytes(data)
+            log_debug(f"已加载ActiveX配置文件: {config_path}", "WORD")
+            return _activex_config_cache
         else:
             log_warning(f"ActiveX配置文件不存在: {config_path}", "WORD")
             return {}
@@ -114,6 +130,19 @@ def load_activex_config():
         return {}
 
 
+def reset_activex_config_cache():
+    """activex_config.json 更新后丢弃已加载的配置和填写计划"""
+    global _activex_config_cache, _activex_config_hash
+    _activex_config_cache = None
+    _activex_config_hash = None
+    _fill_plan_cache.clear()
+
+
+def get_template_path(template_name):
+    """模板文件路径（程序目录下的 templates 文件夹）"""
+    return Path.cwd() / 'templates' / f"{template_name}.docx"
+
+
 def get_template_name_from_team(team):
     """根据团队名称获取模板名称"""
     if team.lower() == 'ppt':
@@ -122,6 +151,47 @@ def get_template_name_from_team(team):
         return 'general_template'
 
 
+def get_fill_plan(team, subFolderConfig, use_config=True):
+    """
+    获取编译好的填写计划，每个团队/模板只编译一次
+    :param use_config: 是否使用 activex_config.json 中的选项位置，为False时填写时在行内查找
+    """
+    template_name = get_template_name_from_team(team)
+    plan = _fill_plan_cache.get((team, template_name, use_config))
+    # 调用方传入同一个子文件夹配置对象时直接使用内存中的计划；内容相同的其他对象按下面的哈希查找磁盘缓存
+    if plan is not None and plan.source is subFolderConfig:
+        return plan
+
+    if use_config:
+        from src.funcs.template_registry import ensure_activex_map_current
+        # 模板修改后位置配置已过期时先重新生成，无法重新生成时不使用过期的位置
+        if not ensure_activex_map_current(template_name):
+            log_warning(f"ActiveX位置配置与模板 {template_name} 不一致，填写时在行内查找ActiveX控件", "WORD")
+            use_config = False
+    activex_config = load_activex_config() if use_config else {}
+    # 填写计划由子文件夹配置、ActiveX位置配置和模板决定，三者都未变化时使用磁盘缓存
+    hashes = {
+        'system.json': config_manager.get_system_config_hash(),
+        'subFolderConfig': hash_bytes(json.dumps(subFolderConfig, sort_keys=True, ensure_ascii=False).encode('utf-8')),
+        'activex_config.json': _activex_config_hash if use_config else None,
+        'template': file_hash(get_template_path(template_name))
+    }
+    section = f"fill_plan:{team}:{template_name}:{use_config}"
+    cached = config_manager.get_compiled_cache().get(section, hashes)
+    if cached is not None:
+        # 磁盘缓存中只有计划的数据，source 指向调用方的子文件夹配置
+        plan = FillPlan.from_dict(cached, source=subFolderConfig)
+    else:
+        template_config = activex_config.get(template_name) if use_config else None
+        if use_config and not template_config:
+            log_warning(f"未找到模板配置: {template_name}，填写时在行内查找ActiveX控件", "WORD")
+        plan = compile_fill_plan(team, subFolderConfig, template_name, template_config)
+        config_manager.get_compiled_cache().put(section, hashes, plan.to_dict())
+    # 按实际使用的 use_config 保存：位置配置过期时不占用 use_config=True 的位置，下次调用仍会重新检查模板
+    _fill_plan_cache[(team, template_name, use_config)] = plan
+    return plan
+
+
 def batch_set_activex_controls(table, controls_data, table_index=0, team='general'):
     """
     批量设置ActiveX控件，减少COM调用次数
@@ -138,6 +208,15 @@ def batch_set_activex_controls(table, controls_data, table_index=0, team='genera
             row_index = control_data['row']
             value = control_data['value']
             
+            if isinstance(table, TableProxy) and table.harvested:
+                # 已收集表格中的控件和当前值，只写入值不同的按钮
+                column = table.find_activex_column(row_index)
+                if column is None:
+                    log_warning(f"未找到行{row_index}的ActiveX控件", "WORD")
+                else:
+                    table.set_option(row_index, column, value)
+                continue
+
             # 使用配置快速定位
             cell = get_cell_with_activeX_by_config(table, row_index, table_index, team)
             if cell:
@@ -173,6 +252,9 @@ def get_cell_with_activeX_by_config(table, row_index, table_index=0, team='gener
     :param team: 团队名称，用于确定使用哪个模板配置
     :return: 包含ActiveX控件的单元格对象，如果没有找到则返回None
     """
+    if isinstance(table, TableProxy) and table.harvested:
+        # 已收集表格中的控件，直接使用该行实际包含控件的单元格
+        return get_cell_with_activeX_in_row(table, row_index)
     try:
         # 验证参数
         if row_index < 1 or row_index > table.Rows.Count:
@@ -251,18 +333,14 @@ def get_signature_image(staff_name):
     if not staff_name or not staff_name.strip():
         return None
 
-    signs_folder = Path.cwd() / 'signs'
-    if not signs_folder.exists():
-        log_warning(f"签名文件夹不存在: {signs_folder}", "WORD")
+    if not signature_cache.folder_exists():
+        log_warning(f"签名文件夹不存在: {signature_cache.folder}", "WORD")
         return None
     
-    # 支持多种图片格式
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif']
-    
-    for ext in image_extensions:
-        image_path = signs_folder / f"{staff_name.strip()}{ext}"
-        if image_path.exists():
-            return str(image_path)
+    # 支持多种图片格式，文件夹只建立一次索引，文件名不区分大小写
+    image_path = signature_cache.find(staff_name)
+    if image_path:
+        return image_path
 
     log_warning(f"未找到工程师 {staff_name} 的签名图片", "WORD")
     return None
@@ -320,39 +398,104 @@ def insert_image_in_cell(cell, image_path, width=80, height=20):
         raise
 
 
-def get_only_word_file_path(folder_path):
-    """获取文件夹中的Word检查清单文件路径"""
+class ChecklistTarget(NamedTuple):
+    """
+    要填写的检查清单
+    path 为项目文件夹中的检查清单路径；覆盖模式下 template_path 为生成新检查清单的模板，
+    replaced 为新检查清单完成后才删除的原检查清单
+    """
+    path: str
+    template_path: Optional[Path] = None
+    replaced: Optional[str] = None
+
+
+def get_checklist_source(folder_path, snapshot=None):
+    """
+    确定要填写的检查清单
+    覆盖模式下不复制模板也不删除原检查清单，由调用方从模板生成新检查清单后通过 publish_checklist 写入
+    :param folder_path: 项目文件夹路径
+    :param snapshot: 项目文件夹目录快照，为None时新建
+    :return: ChecklistTarget
+    """
     user_config = config_manager.get_user_config()
     if not user_config.get('checklist', None):
         raise ValueError("User configuration for checklist not found. Please ensure the user config is set up correctly.")
-    checklist_files = glob.glob(os.path.join(folder_path, '*checklist*.doc*'))
-    checklist_files = [f for f in checklist_files if not os.path.basename(f).startswith(('~$', '.', '__'))]
+    if snapshot is None:
+        snapshot = JobFolderSnapshot(folder_path)
+    checklist_files = snapshot.checklist_files()
     if user_config['checklist']=='cover':
-        if len(checklist_files)>0:
-            #删除找到的第一个checklist文件
-            os.remove(checklist_files[0])
-            log_info(f"已删除现有的检查清单文件: {checklist_files[0]}", "WORD")
         team_category = user_config['team'].lower() if user_config['team'] == 'PPT' else 'general'
-        template_name=f"{team_category}_template.docx"
-        template_path = Path.cwd() / 'templates' / template_name
-        if template_path.exists():
-            # Copy the default checklist file to the target folder
-            target_path = Path(folder_path) / 'E-filing checklist.docx'
-            shutil.copy2(template_path, target_path)
-            log_info(f"已复制默认检查清单文件到: {target_path}", "WORD")
-            return str(target_path)
-        else:
+        template_path = get_template_path(f"{team_category}_template")
+        if not template_path.exists():
             raise FileNotFoundError("Checklist template's not found in the 'templates' directory of program folder. Please ensure 'E-filing checklist.docx' exists.")
+        #找到的第一个checklist文件在新检查清单完成后删除
+        replaced = checklist_files[0] if checklist_files else None
+        return ChecklistTarget(str(Path(folder_path) / 'E-filing checklist.docx'), template_path, replaced)
 
     if checklist_files:
         if len(checklist_files) > 1 and user_config['checklist'] != 'cover':
             log_error(f"在文件夹 {folder_path} 中找到多个检查清单文件，只有第一个会被填写。")
-        return checklist_files[0]
+        return ChecklistTarget(checklist_files[0])
     else:
         # 如果既不符合复制默认文件的条件，又没有找到检查清单文件
         raise FileNotFoundError(f"在文件夹 {folder_path} 中未找到检查清单文件，且不符合使用默认文件的条件。")
 
 
+def publish_checklist(target, save, snapshot=None):
+    """
+    写入填写好的检查清单，写入完成后才删除被替换的原检查清单
+    :param target: ChecklistTarget
+    :param save: 保存函数，参数为目标路径，需要一次写入完整文件（见 write_file_atomic）
+    :param snapshot: 项目文件夹目录快照，覆盖模式下写入后丢弃根目录列表
+    """
+    save(target.path)
+    if target.template_path is None:
+        return
+    if target.replaced and os.path.normcase(os.path.abspath(target.replaced)) != os.path.normcase(os.path.abspath(target.path)):
+        try:
+            os.remove(target.replaced)
+            log_info(f"已删除原检查清单文件: {target.replaced}", "WORD")
+        except FileNotFoundError:
+            pass
+    if snapshot is not None:
+        # 根目录内容已变化，丢弃快照中的根目录列表
+        snapshot.invalidate()
+
+
+def open_word_checklist(folder_path, snapshot=None):
+    """
+    确定Word要打开的检查清单文件
+    覆盖模式下在本地生成模板副本，Word填写保存并关闭后用 finish_word_checklist 写入项目文件夹
+    :return: (ChecklistTarget, Word要打开的文件路径)
+    """
+    target = get_checklist_source(folder_path, snapshot)
+    if target.template_path is None:
+        return target, target.path
+    working_path = template_store.create_working_copy(target.template_path)
+    log_debug(f"已在本地生成检查清单: {working_path}", "WORD")
+    return target, working_path
+
+
+def finish_word_checklist(target, working_path, snapshot=None):
+    """覆盖模式下把Word保存好的本地检查清单一次写入项目文件夹"""
+    if target.template_path is None:
+        return
+    try:
+        publish_checklist(target, lambda path: copy_file_atomic(working_path, path), snapshot)
+    finally:
+        discard_word_checklist(target, working_path)
+
+
+def discard_word_checklist(target, working_path):
+    """删除覆盖模式下的本地检查清单副本"""
+    if target is None or target.template_path is None or working_path is None:
+        return
+    try:
+        os.remove(working_path)
+    except OSError:
+        pass
+
+
 def get_cell_with_activeX_in_row(table, row_index):
     """
     获取指定行中包含ActiveX控件的单元格
@@ -360,6 +503,10 @@ def get_cell_with_activeX_in_row(table, row_index):
     :param row_index: 行索引（从1开始）
     :return: 包含ActiveX控件的单元格对象，如果没有找到则返回None
     """
+    if isinstance(table, TableProxy):
+        # 代理缓存了行列数和每个单元格的控件信息
+        column_index = table.find_activex_column(row_index)
+        return table.Cell(row_index, column_index) if column_index is not None else None
     try:
         # Validate row_index
         if row_index < 1 or row_index > table.Rows.Count:
@@ -461,6 +608,78 @@ def set_fields_value(table, task, field_config):
                 set_text_in_cell(cell, task[field_name])
 
 
+def get_option_column_by_plan(table, op):
+    """
+    获取填写计划中选项操作对应的列，计划中没有位置或位置无法访问时在行内查找
+    :param table: TableProxy
+    :return: 包含ActiveX控件的列索引，如果没有找到则返回None
+    """
+    if table.harvested:
+        # 已收集表格中的控件：优先使用计划中的位置，没有控件时使用该行实际包含控件的列
+        if op.col is not None and table.has_activex(op.row, op.col):
+            return op.col
+        column = table.find_activex_column(op.row)
+        if column is not None and op.col is not None:
+            log_debug(f"配置位置({op.row},{op.col})没有ActiveX控件，使用第{column}列", "WORD")
+        return column
+    if op.col is None:
+        return table.find_activex_column(op.row)
+    try:
+        if table.activex_count(op.row, op.col) > 0:
+            return op.col
+    except Exception as e:
+        log_error(f"访问配置位置({op.row},{op.col})时出错: {str(e)}", "WORD")
+        return table.find_activex_column(op.row)
+    log_warning(f"配置位置({op.row},{op.col})没有ActiveX控件", "WORD")
+    return None
+
+
+def apply_fill_plan(word_doc, plan, task, folder_statuses):
+    """
+    按填写计划填写Word文档
+    :param plan: get_fill_plan 编译的填写计划
+    :param folder_statuses: 各表格文件夹状态（见 detect_checklist_folders_status）
+    """
+    today = date.today().strftime("%Y-%m-%d")
+    # 表格代理在文档打开期间缓存行列数、单元格和选项按钮
+    tables = {}
+    for op in plan.ops:
+        if op.table_index not in tables:
+            tables[op.table_index] = TableProxy(word_doc.Tables[op.table_index])
+    if any(op.op == OP_OPTION for op in plan.ops):
+        try:
+            # 遍历一次表格得到所有选项按钮的位置和当前值
+            harvest_activex_controls(tables)
+        except Exception as e:
+            log_warning(f"收集ActiveX控件失败，逐行查找: {str(e)}", "WORD")
+
+    for op in plan.ops:
+        table = tables[op.table_index]
+
+        if op.op == OP_OPTION:
+            value = plan.option_value(op, folder_statuses[op.table_index])
+            if value is None:
+                continue
+            column = get_option_column_by_plan(table, op)
+            if column is None:
+                if op.key is None:
+                    raise CorruptChecklistError(f"No ActiveX control found in row {op.row} for folder: {op.folder}, please check if the row setting is correct or if the file is damaged.")
+                log_warning(f"未找到文件夹 {op.folder} 的选项单元格", "WORD")
+                continue
+            table.set_option(op.row, column, value)
+            continue
+
+        cell = table.Cell(op.row, op.col)
+        if op.op == OP_IMAGE:
+            # 使用预先缩放的签名图片，Word不需要加载原图
+            signature_image = signature_cache.get_signature_file(task[op.field], width=80, height=20)
+            insert_image_in_cell(cell, signature_image, width=80, height=20)
+        elif op.op == OP_DATE:
+            set_text_in_cell(cell, today)
+        else:
+            set_text_in_cell(cell, task[op.field])
+
+
 def set_all_option_cells_for_ppt_optimized(table, status, map, table_index=0, use_config=True):
     """
     优化的PPT团队选项单元格批量设置方法
@@ -661,14 +880,22 @@ def set_option_cells(table, team, folder_status, option_config, table_index=0, u
         set_option_cells_for_general(table, folder_status, option_config, table_index, use_config)
 
 
-def set_checklist_optimized(task, target_path, team, subFolderConfig, use_config=True, use_cached_word=True):
-    """优化的检查清单设置方法"""
+def set_checklist_optimized(task, target_path, team, subFolderConfig, use_config=True, use_cached_word=True, snapshot=None,
+                            folder_statuses=None):
+    """
+    优化的检查清单设置方法
+    :param folder_statuses: 已检测好的各表格文件夹状态（见 detect_checklist_folders_status），为None时在填写时检测
+    """
     global _word_app_lock
     
     word = None
     word_doc = None
     original_screen_updating = None
+    target = checklist_path = None
     
+    # 配置错误在编译填写计划时抛出，不回退到原方法
+    plan = get_fill_plan(team, subFolderConfig, use_config)
+
     try:
         log_debug(f"subFolderConfig length: {len(subFolderConfig)}", "WORD")
         
@@ -678,6 +905,8 @@ def set_checklist_optimized(task, target_path, team, subFolderConfig, use_config
             word = get_cached_word_app()
         else:
             word = create_optimized_word_app()
+        # 启用COM调用统计时包装为统计代理
+        word = com_profiler.wrap(word)
         
         # 保存原始设置
         original_screen_updating = word.ScreenUpdating
@@ -686,8 +915,10 @@ def set_checklist_optimized(task, target_path, team, subFolderConfig, use_config
         word.ScreenUpdating = False
         word.DisplayAlerts = 0
         log_info(f"target_path: {target_path}", "WORD")
-        checklist_path = get_only_word_file_path(target_path)
-        log_info(f"检查清单路径: {checklist_path}", "WORD")
+        if snapshot is None:
+            snapshot = JobFolderSnapshot(target_path)
+        target, checklist_path = open_word_checklist(target_path, snapshot)
+        log_info(f"检查清单路径: {target.path}", "WORD")
         
         # 打开文档
         word_doc = word.Documents.Open(checklist_path)
@@ -700,60 +931,40 @@ def set_checklist_optimized(task, target_path, team, subFolderConfig, use_config
         
         # 验证表格
         if word_doc.Tables.Count == 0:
-            raise ValueError("文档中没有找到表格")
+            raise CorruptChecklistError("文档中没有找到表格")
         if word_doc.Tables.Count < len(subFolderConfig):
-            raise ValueError(f"文档中的表格数量({word_doc.Tables.Count})少于配置要求的数量({len(subFolderConfig)})")
+            raise CorruptChecklistError(f"文档中的表格数量({word_doc.Tables.Count})少于配置要求的数量({len(subFolderConfig)})")
         
         # 记录使用的方法
         method_name = "优化配置文件方法" if use_config else "优化原始搜索方法"
         log_info(f"使用{method_name}处理ActiveX控件", "WORD")
         
-        # 批量处理表格
-        for i, item in enumerate(subFolderConfig):
-            log_debug(f"正在处理表格索引: {i}", "WORD")
-            current_table = word_doc.Tables[i]
-            
-            # 字段设置（保持原有逻辑）
-            if 'fields' in item and item['fields'] is not None:
-                set_fields_value(current_table, task, item["fields"])
-                log_debug(f"设置字段值完成", "WORD")
-                
-            # 选项设置使用优化方法
-            if 'options' in item and item["options"] is not None:
-                folder_status = detect_folders_status(target_path, team, item["options"])
-                log_debug(f"检测文件夹状态: {folder_status}", "WORD")
-                log_info("开始在checklist中填写文件状态，请稍候......", "WORD")
-                # 使用优化的选项设置方法
-                set_option_cells_optimized(current_table, team, folder_status, item["options"], i, use_config)
+        # 按编译好的填写计划处理所有表格
+        if folder_statuses is None and plan.option_configs:
+            folder_statuses = detect_checklist_folders_status(target_path, team, subFolderConfig, snapshot)
+        log_debug(f"检测文件夹状态: {folder_statuses}", "WORD")
+        log_info("开始在checklist中填写文件状态，请稍候......", "WORD")
+        apply_fill_plan(word_doc, plan, task, folder_statuses)
 
         # 保存文档
         word_doc.Save()
+        if target.template_path is not None:
+            # 覆盖模式下关闭本地文档后再一次写入项目文件夹
+            word_doc.Close()
+            word_doc = None
+            finish_word_checklist(target, checklist_path, snapshot)
         log_info("检查清单保存成功", "WORD")
         
     except Exception as e:
         log_error(f"优化检查清单设置失败: {str(e)}", "WORD")
-        if str(e).find("denied")>=0:
+        if isinstance(e, PermissionError) or str(e).find("denied")>=0:
             log_error("你没有写入权限", "WORD")
             #抛出异常
-            raise PermissionError("你没有写入权限")
+            raise PermissionError("你没有写入权限") from e
         if str(e).find("folder not found") >= 0:
             log_error("找不到文件夹，请检查文件路径是否正确", "WORD")
-            raise e
-        # 回退到原方法
-        log_info("回退到原始方法", "WORD")
-        if word_doc:
-            try:
-                word_doc.Close()
-            except:
-                pass
-        if word and not use_cached_word:
-            try:
-                word.Quit()
-            except:
-                pass
-        # 调用原方法
-        set_checklist(task, target_path, team, subFolderConfig, use_config)
-        return
+        # 是否重试或回退到原方法由 set_checklist_word 按失败类型决定
+        raise
         
     finally:
         # 恢复设置
@@ -770,6 +981,7 @@ def set_checklist_optimized(task, target_path, team, subFolderConfig, use_config
                 log_debug("Word文档已关闭", "WORD")
             except Exception as e:
                 log_error(f"关闭Word文档时出错: {str(e)}", "WORD")
+        discard_word_checklist(target, checklist_path)
         
         if not use_cached_word and word:
             try:
@@ -778,42 +990,108 @@ def set_checklist_optimized(task, target_path, team, subFolderConfig, use_config
             except Exception as e:
                 log_error(f"退出Word应用程序时出错: {str(e)}", "WORD")
             finally:
-                kill_all_word_processes()
+                get_word_backend().kill_processes()
         
         # 释放锁
         if use_cached_word:
             _word_app_lock = False
 
 
-def set_checklist(task, target_path, team, subFolderConfig, use_config=True, use_optimized=True):
-    """设置检查清单 - 默认使用优化版本"""
-    if use_optimized:
+def set_checklist(task, target_path, team, subFolderConfig, use_config=True, use_optimized=True, engine=None, snapshot=None,
+                  folder_statuses=None):
+    """
+    设置检查清单 - 默认使用优化版本
+    :param engine: 填写引擎，'word' 使用Word COM，'docx' 直接编辑OOXML；为None时读取用户配置 fill_engine
+    :param snapshot: 项目文件夹目录快照，与预检查共用，为None时新建
+    :param folder_statuses: 已检测好的各表格文件夹状态（见 detect_checklist_folders_status），为None时在填写时检测
+    """
+    if snapshot is None:
+        snapshot = JobFolderSnapshot(target_path)
+    if engine is None:
+        engine = config_manager.get_user_config('fill_engine', 'word')
+    if engine == 'word' and com_circuit_breaker.is_open:
+        downgrade_engine = get_downgrade_engine()
+        if downgrade_engine:
+            log_warning(f"Word熔断期间使用{downgrade_engine}引擎填写: {task.get('job_no')}", "WORD")
+            engine = downgrade_engine
+    if engine == 'docx':
+        from src.funcs.docx_processor import set_checklist_docx
+        set_checklist_docx(task, target_path, team, subFolderConfig, use_config, snapshot, folder_statuses)
+        return
+    # 启用COM调用统计时，每个检查清单生成一份报告
+    with com_profiler.job(task.get('job_no')):
+        set_checklist_word(task, target_path, team, subFolderConfig, use_config, use_optimized, snapshot,
+                           folder_statuses)
+
+
+def set_checklist_word(task, target_path, team, subFolderConfig, use_config=True, use_optimized=True, snapshot=None,
+                       folder_statuses=None):
+    """
+    使用Word COM设置检查清单，按失败类型处理（见 fill_policy）：
+    权限不足、模板或检查清单不存在、文档损坏、配置错误直接失败；COM暂时性错误有限次数重试，间隔递增；
+    优化方法的其他错误回退到原方法一次
+    :param snapshot: 项目文件夹目录快照
+    :param folder_statuses: 已检测好的各表格文件夹状态，为None时在填写时检测
+    :raises ComCircuitOpenError: Word连续失败后熔断，冷却期间不再调用Word
+    """
+    optimized = use_optimized
+    retries = 0
+    while True:
+        if not com_circuit_breaker.allow():
+            raise ComCircuitOpenError(f"Word连续{com_circuit_breaker.failures}次COM调用失败，熔断中")
         try:
-            set_checklist_optimized(task, target_path, team, subFolderConfig, use_config, use_cached_word=True)
-            return
+            if optimized:
+                set_checklist_optimized(task, target_path, team, subFolderConfig, use_config, use_cached_word=True,
+                                        snapshot=snapshot, folder_statuses=folder_statuses)
+            else:
+                set_checklist_original(task, target_path, team, subFolderConfig, use_config, snapshot, folder_statuses)
         except Exception as e:
-            if isinstance(e, PermissionError):
-                raise
-            log_warning(f"优化方法失败，回退到原方法: {str(e)}", "WORD")
-    
-    # 原始实现（作为回退方案）
+            failure = classify_fill_error(e)
+            if failure == FAILURE_TRANSIENT:
+                # Word可能已无响应，重试时重新启动
+                release_word_app_cache()
+                if com_circuit_breaker.record_failure():
+                    get_word_backend().kill_processes()
+                elif retries < get_max_retries():
+                    delay = get_retry_delay(retries)
+                    retries += 1
+                    log_warning(f"Word暂时性错误，{delay:.1f}秒后第{retries}次重试: {str(e)}", "WORD")
+                    time.sleep(delay)
+                    continue
+            elif failure == FAILURE_OTHER and optimized:
+                log_warning(f"优化方法失败，回退到原方法: {str(e)}", "WORD")
+                optimized = False
+                continue
+            log_error(f"填写检查清单失败（{FAILURE_LABELS[failure]}）: {str(e)}", "WORD")
+            raise
+        com_circuit_breaker.record_success()
+        return
+
+
+def set_checklist_original(task, target_path, team, subFolderConfig, use_config=True, snapshot=None, folder_statuses=None):
+    """
+    使用Word COM逐个表格设置检查清单的原始实现（作为回退方案），每次启动新的Word实例
+    :param snapshot: 项目文件夹目录快照
+    :param folder_statuses: 已检测好的各表格文件夹状态，为None时在填写时检测
+    """
     word = None
     word_doc = None
+    target = checklist_path = None
     try:
         # 启动Word应用程序
         log_debug(f"subFolderConfig length: {len(subFolderConfig)}", "WORD")
-        word = win32.Dispatch('Word.Application')
+        word = com_profiler.wrap(get_word_backend().dispatch())
         word.Visible = False  # 让Word不可见，避免干扰用户操作
-        checklist_path = get_only_word_file_path(target_path)
-        log_debug(f"检查清单路径: {checklist_path}", "WORD")
+        target, checklist_path = open_word_checklist(target_path, snapshot)
+        log_debug(f"检查清单路径: {target.path}", "WORD")
         
         # 打开指定的文档
         word_doc = word.Documents.Open(checklist_path)
         # 确保文档有表格且数量足够
         if word_doc.Tables.Count == 0:
-            raise ValueError("文档中没有找到表格")
+            raise CorruptChecklistError("文档中没有找到表格")
         if word_doc.Tables.Count < len(subFolderConfig):
-            raise ValueError(f"文档中的表格数量({word_doc.Tables.Count})少于配置要求的数量({len(subFolderConfig)})")
+            raise CorruptChecklistError(f"文档中的表格数量({word_doc.Tables.Count})少于配置要求的数量({len(subFolderConfig)})")
         
         # 记录使用的方法
         method_name = "配置文件方法" if use_config else "原始搜索方法"
@@ -821,7 +1099,7 @@ def set_checklist(task, target_path, team, subFolderConfig, use_config=True, use
         
         for i, item in enumerate(subFolderConfig):
             log_debug(f"正在处理表格索引: {i}, 配置项: {item}", "WORD")
-            current_table = word_doc.Tables[i]
+            current_table = TableProxy(word_doc.Tables[i])
             log_debug(f"当前表格索引: {i}, 表格行数: {current_table.Rows.Count}, 列数: {current_table.Columns.Count}", "WORD")
             log_debug(f"fields: {item.get('fields')}, options: {item.get('options')}", "WORD")
             
@@ -830,7 +1108,10 @@ def set_checklist(task, target_path, team, subFolderConfig, use_config=True, use
                 log_debug(f"设置字段值完成: {item['fields']}", "WORD")
                 
             if 'options' in item and item["options"] is not None:
-                folder_status = detect_folders_status(target_path, team, item["options"])
+                if folder_statuses is not None:
+                    folder_status = folder_statuses[i]
+                else:
+                    folder_status = detect_folders_status(target_path, team, item["options"], snapshot)
                 log_debug(f"检测文件夹状态: {folder_status}", "WORD")
                 # 设置选项单元格，传递表格索引和配置方法选择
                 
@@ -838,6 +1119,10 @@ def set_checklist(task, target_path, team, subFolderConfig, use_config=True, use
 
         # 保存并关闭文档
         word_doc.Save()
+        if target.template_path is not None:
+            word_doc.Close()
+            word_doc = None
+            finish_word_checklist(target, checklist_path, snapshot)
         log_info("检查清单保存成功", "WORD")
     except Exception as e:
         log_error(f"Error setting checklist: {str(e)}", "WORD")
@@ -850,6 +1135,7 @@ def set_checklist(task, target_path, team, subFolderConfig, use_config=True, use
                 log_debug("Word文档已关闭", "WORD")
             except Exception as e:
                 log_error(f"关闭Word文档时出错: {str(e)}", "WORD")
+        discard_word_checklist(target, checklist_path)
         
         if word:
             try:
@@ -858,17 +1144,19 @@ def set_checklist(task, target_path, team, subFolderConfig, use_config=True, use
             except Exception as e:
                 log_error(f"退出Word应用程序时出错: {str(e)}", "WORD")
             finally:
-                kill_all_word_processes()
+                get_word_backend().kill_processes()
 
 
 # 添加模块清理函数
 def cleanup_word_resources():
     """清理所有Word相关资源"""
-    global _word_app_cache, _activex_config_cache
+    global _word_app_cache, _activex_config_cache, _activex_config_hash
     
     try:
         release_word_app_cache()
         _activex_config_cache = None
+        _activex_config_hash = None
+        _fill_plan_cache.clear()
         log_info("Word处理模块资源已清理", "WORD")
     except Exception as e:
         log_error(f"清理Word资源时出错: {str(e)}", "WORD")
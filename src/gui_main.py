@@ -1,16 +1,15 @@
-import glob
 import webview
 import threading
 import json
 import os
 import sys
-import pandas as pd
 import subprocess
 from datetime import datetime
-from src.funcs.file_utils import folder_precheck
-from src.funcs.path_resolver import get_working_folder_path
-from src.funcs.process_manager import kill_all_word_processes
-from src.funcs.word_processor import get_only_word_file_path, set_checklist
+from src.funcs.folder_snapshot import JobFolderSnapshot
+from src.funcs.pipeline import build_checklist_pipeline, log_pipeline_report
+from src.funcs.template_registry import check_activex_maps
+from src.funcs.task_utils import (STATUS_COMPLETED, STATUS_RESOLVED, fill_resolved_task, read_tasks_from_excel,
+                                  resolve_task)
 from src.data.data_manager import data_manager
 from src.logger.logger import global_logger, log_info, log_error, log_warning, log_debug, log_critical
 from src.config.config_manager import config_manager, get_system_config, set_user_config
@@ -23,6 +22,7 @@ class ProjectFileChecker:
         self.log_callback = "None"
         self.cancel_requested = False
         self.current_thread = None
+        self.pipeline = None
         
         try:
             print("=== 初始化ProjectFileChecker ===")
@@ -50,6 +50,9 @@ class ProjectFileChecker:
             self.task_list_map = config_manager.get_user_config('task_list_map', {})
             print(f"任务列表映射: {self.task_list_map}")
             
+            # 模板修改后重新生成ActiveX位置配置，保证填写时使用配置中的位置
+            check_activex_maps()
+
             # 设置全局日志的前端回调
             global_logger.set_frontend_callback(self._frontend_log_callback)
             self.log("=== ProjectFileChecker 初始化完成 ===")
@@ -116,17 +119,17 @@ class ProjectFileChecker:
         """从Excel文件读取任务列表"""
         tasks = []
         try:
-            df = pd.read_excel(excel_file_path)
-            for _, row in df.iloc[0:].iterrows():
-                task = {key: str(row.iloc[value]) for key, value in self.task_list_map.items()}
-                tasks.append(task)
+            tasks = read_tasks_from_excel(excel_file_path, self.task_list_map)
             self.log(f"成功读取 {len(tasks)} 个任务")
         except Exception as e:
             self.log(f"读取Excel文件失败: {e}")
         return tasks
     
-    def process_tasks(self):
-        """处理任务"""
+    def process_tasks(self, force_rescan=False):
+        """
+        处理任务
+        :param force_rescan: 为True时忽略子文件夹检测缓存，重新检测所有子文件夹，检查清单未变化时也重新填写
+        """
         if not self.task_file_path:
             self.log("请先选择任务列表文件")
             return {'success': False, 'message': '请先选择任务列表文件'}
@@ -135,6 +138,8 @@ class ProjectFileChecker:
             # 如果正在运行，则请求取消
             self.log("请求取消任务处理...")
             self.cancel_requested = True
+            if self.pipeline is not None:
+                self.pipeline.cancel()
             return {'success': True, 'message': '已请求取消'}
         
         def run_process():
@@ -160,77 +165,21 @@ class ProjectFileChecker:
                     return
                 self.log(f"共计 {len(self.tasks)} 个任务")
                 
-                # 处理每个任务
-                for i, task in enumerate(self.tasks):
-                    # 检查是否请求取消
-                    if self.cancel_requested:
-                        self.log("用户请求取消，停止处理任务")
-                        break
-                    
-                    self.log(f"处理任务 {i+1}/{len(self.tasks)}: {task['job_no']}")
-                    
-                    # 获取工作目录
-                    target_path = get_working_folder_path(self.base_dir,self.team, task['job_no'].strip())
-                    log_info(f"target_path: {target_path}", "GUI")
-                    s_status = '未找到目录' if target_path is None else ('快捷方式已损坏' if str(target_path).strip() == "." else '已处理')
-                    result = {
-                        'job_no': task['job_no'],
-                        'job_creator': task['job_creator'],
-                        'engineers': task['engineers'],
-                        'target_path': str(target_path) if target_path is not None else None,
-                        'status': s_status,
-                        'folders': {}
-                    }
-                    if target_path is None or str(target_path).strip() == ".":
-                        log_error(f"任务 {task['job_no']} 的工作目录未找到")
-                        data_manager.add_result(result)
-                        webview.windows[0].evaluate_js(f'updateResults({json.dumps(data_manager.get_results())})')
-                        continue
-                    self.log(f"找到目录: {target_path}")
-                    if not folder_precheck(target_path, self.team):
-                        log_error(f"任务 {task['job_no']} 的文件夹预检查失败")
-                        result['status'] = '文件夹预检查失败'
-                        data_manager.add_result(result)
-                        webview.windows[0].evaluate_js(f'updateResults({json.dumps(data_manager.get_results())})')
-                        continue
-                    # 检测文件夹
-                    self.log("开始检查子文件夹...")
-                    
-                    # 再次检查是否请求取消
-                    if self.cancel_requested:
-                        self.log("用户请求取消，停止处理任务")
-                        break
-                    
-                    # 结束所有Word进程
-                    self.log("确保文件夹检查不受干扰,结束所有Word进程...")
-                    kill_all_word_processes()
-                    
-                    # 再次检查是否请求取消
-                    if self.cancel_requested:
-                        self.log("用户请求取消，停止处理任务")
-                        break
-                    
-                    # 设置检查列表
-                    self.log(f"{task['job_no']}开始写入检查列表...")
-                    try:
-                        set_checklist(task, target_path, self.team, self.subFolderConfig)
-                        self.log(f"{task['job_no']}检查列表写入完成")
-                        result['status'] = '完成'
-                    except Exception as e:
-                        log_error(f"{task['job_no']}设置检查列表失败: {e}")
-                        if isinstance(e,PermissionError):
-                            result['status']='无写入权限'
-                        else:
-                            result['status'] = '失败'
-                            
-                    self.log(f"任务 {task['job_no']} 处理完成:结果为：{result['status']}")
-                    
-                    
-                    # 使用数据管理器添加结果
+                # 读取、路径解析、子文件夹检测、填写、发布结果分阶段并行进行：
+                # 无法处理的任务在路径解析后立即显示，检测下一个任务时同时填写当前任务
+                published = []
+
+                def publish(result):
+                    published.append(result)
+                    self.log(f"任务 {result['job_no']} 处理完成({len(published)}/{len(self.tasks)}):结果为：{result['status']}")
                     data_manager.add_result(result)
-                    
-                    # 更新表格
                     webview.windows[0].evaluate_js(f'updateResults({json.dumps(data_manager.get_results())})')
+
+                self.pipeline = build_checklist_pipeline(
+                    self.base_dir, self.team, self.subFolderConfig, publish, force_rescan=force_rescan
+                )
+                report = self.pipeline.run(self.tasks)
+                log_pipeline_report(report)
                 
                 if self.cancel_requested:
                     self.log(f"任务处理已取消，已处理 {len(data_manager.get_results())} 个任务")
@@ -259,8 +208,11 @@ class ProjectFileChecker:
         
         return {'success': True, 'message': '开始处理任务'}
 
-    def rerun_task(self, job_no):
-        """重新运行单个任务"""
+    def rerun_task(self, job_no, force_rescan=False):
+        """
+        重新运行单个任务
+        :param force_rescan: 为True时忽略子文件夹检测缓存，重新检测所有子文件夹
+        """
         if self.is_running:
             return {'success': False, 'message': '有任务正在运行，请等待完成或取消后再试'}
 
@@ -286,50 +238,28 @@ class ProjectFileChecker:
                 
                 self.log(f"开始重新运行任务: {job_no}")
                 
-                # 获取工作目录
-                target_path = get_working_folder_path(self.base_dir, self.team, task_to_rerun['job_no'])
-                result = {
-                    'job_no': task_to_rerun['job_no'],
-                    'job_creator': task_to_rerun['job_creator'],
-                    'engineers': task_to_rerun['engineers'],
-                    'target_path': str(target_path) if target_path is not None else None,
-                    'status': '未找到目录' if target_path is None else '处理中',
-                    'folders': {}
-                }
-                
-                # 更新现有结果中的这一项为处理中状态
-                data_manager.update_result_by_job_no(job_no, result)
-                webview.windows[0].evaluate_js(f'updateResults({json.dumps(data_manager.get_results())})')
-                
-                if target_path is None:
-                    self.log(f"任务 {task_to_rerun['job_no']} 的工作目录未找到")
-                    result['status'] = '未找到目录'
+                # 获取工作目录并预检查
+                resolved = resolve_task(self.base_dir, self.team, task_to_rerun, force_rescan)
+                target_path = resolved['target_path']
+                result = resolved['result']
+                if result['status'] != STATUS_RESOLVED:
+                    self.log(f"任务 {task_to_rerun['job_no']} 无法处理: {result['status']}")
                     data_manager.update_result_by_job_no(job_no, result)
                     webview.windows[0].evaluate_js(f'updateResults({json.dumps(data_manager.get_results())})')
                     return
                 
+                # 更新现有结果中的这一项为处理中状态
+                result['status'] = '处理中'
+                data_manager.update_result_by_job_no(job_no, result)
+                webview.windows[0].evaluate_js(f'updateResults({json.dumps(data_manager.get_results())})')
                 self.log(f"找到目录: {target_path}")
                 
-                if not folder_precheck(target_path, self.team):
-                    self.log(f"任务 {task_to_rerun['job_no']} 的文件夹预检查失败")
-                    result['status'] = '文件夹预检查失败'
-                    data_manager.update_result_by_job_no(job_no, result)
-                    webview.windows[0].evaluate_js(f'updateResults({json.dumps(data_manager.get_results())})')
-                    return
-                
-                # 结束所有Word进程
-                self.log("确保文件夹检查不受干扰,结束所有Word进程...")
-                kill_all_word_processes()
-                
-                # 设置检查列表
-                self.log(f"{task_to_rerun['job_no']}开始写入检查列表...")
-                try:
-                    set_checklist(task_to_rerun, target_path, self.team, self.subFolderConfig)
+                # 检测文件夹并设置检查列表
+                self.log(f"{task_to_rerun['job_no']}开始检查子文件夹并写入检查列表...")
+                # 单独重新运行的任务总是重新填写
+                fill_resolved_task(resolved, self.team, self.subFolderConfig, force=True)
+                if result['status'] == STATUS_COMPLETED:
                     self.log(f"{task_to_rerun['job_no']}检查列表写入完成")
-                    result['status'] = '完成'
-                except Exception as e:
-                    self.log(f"{task_to_rerun['job_no']}设置检查列表失败: {e}")
-                    result['status'] = '失败'
                 
                 self.log(f"任务 {task_to_rerun['job_no']} 处理完成: 结果为：{result['status']}")
                 
@@ -374,8 +304,7 @@ class ProjectFileChecker:
                 return {'success': False, 'message': '路径为空'}
             
             # 查找checklist文件
-            checklist_files = glob.glob(os.path.join(target_path, '*checklist*.doc*'))
-            checklist_files = [f for f in checklist_files if not os.path.basename(f).startswith(('~$', '.', '__'))]
+            checklist_files = JobFolderSnapshot(target_path).checklist_files()
 
             if checklist_files and os.path.exists(checklist_files[0]):
                 os.startfile(checklist_files[0])
@@ -440,7 +369,8 @@ class ProjectFileChecker:
                     'job_creator': 1,
                     'engineers': 2
                 }),
-                'efilling_tool_path': config_manager.get_user_config('efilling_tool_path', '')
+                'efilling_tool_path': config_manager.get_user_config('efilling_tool_path', ''),
+                'fill_engine': config_manager.get_user_config('fill_engine', 'word')
             }
             return {'success': True, 'config': config}
         except Exception as e:
@@ -465,6 +395,7 @@ class ProjectFileChecker:
                 'engineers': 2
             }))
             config_manager.set_user_config('efilling_tool_path', new_config.get('efilling_tool_path', ''))
+            config_manager.set_user_config('fill_engine', new_config.get('fill_engine', 'word'))
             
             # 保存到文件
             config_manager.save_user_config()
@@ -18,7 +18,8 @@ async function selectFile() {
 
 async function runProcess() {
     try {
-        const result = await pywebview.api.process_tasks();
+        const forceRescan = document.getElementById('forceRescan').checked;
+        const result = await pywebview.api.process_tasks(forceRescan);
         if (!result.success) {
             addLog(`操作失败: ${result.message}`);
         } else {
@@ -187,7 +188,7 @@ function updateResults(results) {
             </thead>
             <tbody>
     `;    results.forEach((result, index) => {
-        const statusClass = result.status === '完成' ? 'status-completed' : 'status-error';
+        const statusClass = result.status === '完成' ? 'status-completed' : result.status === '未变化' ? 'status-unchanged' : 'status-error';
         const displayPath = result.target_path ? result.target_path.substring(result.target_path.lastIndexOf('\\') + 1) : '未找到';
         
         tableHTML += `
@@ -352,7 +353,8 @@ async function rerunTask(buttonElement) {
     
     try {
         addLog(`开始重新运行任务: ${jobNo}`);
-        const result = await pywebview.api.rerun_task(jobNo);
+        const forceRescan = document.getElementById('forceRescan').checked;
+        const result = await pywebview.api.rerun_task(jobNo, forceRescan);
         if (result.success) {
             addLog(`任务 ${jobNo} 重新运行完成`);
         } else {
@@ -470,7 +472,8 @@ let currentConfig = {
         job_creator: 1,
         engineers: 2
     },
-    efilling_tool_path: ''
+    efilling_tool_path: '',
+    fill_engine: 'word'
 };
 
 async function openConfigModal() {
@@ -513,6 +516,13 @@ function populateConfigModal(config) {
         checklistRadio.checked = true;
     }
     
+    // 设置填写引擎
+    const engineValue = config.fill_engine || 'word';
+    const engineRadio = document.querySelector(`input[name="fillEngine"][value="${engineValue}"]`);
+    if (engineRadio) {
+        engineRadio.checked = true;
+    }
+    
     // 设置任务列表映射
     const taskMap = config.task_list_map || { job_no: 0, job_creator: 1, engineers: 2 };
     document.getElementById('mapJobNo').value = (taskMap.job_no || 0) + 1;
@@ -531,6 +541,7 @@ async function saveAllConfig() {
             base_dir: document.getElementById('currentBaseDir').value,
             archive_path: document.getElementById('archivePath').value,
             checklist: document.querySelector('input[name="checklist"]:checked')?.value || 'cover',
+            fill_engine: document.querySelector('input[name="fillEngine"]:checked')?.value || 'word',
             task_list_map: {
                 job_no: (parseInt(document.getElementById('mapJobNo').value) || 1) - 1,
                 job_creator: (parseInt(document.getElementById('mapJobCreator').value) || 2) - 1,
@@ -0,0 +1,47 @@
+import shutil
+from pathlib import Path
+import pytest
+from src.config.config_manager import config_manager
+from src.funcs.folder_snapshot import JobFolderSnapshot
+from src.funcs.task_utils import STATUS_RESOLVED, build_task_result
+
+ROOT_DIR = Path(__file__).parent.parent
+TEMPLATES_DIR = ROOT_DIR / 'templates'
+JPEG_DATA = b'\xff\xd8\xff\xe0' + b'\x00' * 32
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    填写检查清单用的程序目录：模板、activex_config.json 和默认签名，
+    当前目录切换到该目录，检查清单使用填写模式，并清空填写计划和Word实例的缓存
+    """
+    shutil.copytree(TEMPLATES_DIR, tmp_path / 'templates')
+    shutil.copy(ROOT_DIR / 'activex_config.json', tmp_path / 'activex_config.json')
+    (tmp_path / 'signs').mkdir()
+    (tmp_path / 'signs' / 'default.jpg').write_bytes(JPEG_DATA)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(config_manager.get_user_config(), 'checklist', 'fill')
+    monkeypatch.setattr('src.funcs.word_processor._fill_plan_cache', {})
+    monkeypatch.setattr('src.funcs.word_processor._word_app_cache', None)
+    return tmp_path
+
+
+@pytest.fixture
+def make_resolved():
+    """构造已通过预检查的任务（resolve_task 的结果），参数为项目文件夹和任务号"""
+    def make(job_folder, job_no='250100032HZH'):
+        task = {'job_no': job_no, 'job_creator': 'creator', 'engineers': 'engineer'}
+        return {'task': task, 'target_path': str(job_folder), 'snapshot': JobFolderSnapshot(str(job_folder)),
+                'folder_statuses': None, 'result': build_task_result(task, str(job_folder), STATUS_RESOLVED)}
+    return make
+
+
+@pytest.fixture
+def open_checklist(tmp_path):
+    """把通用模板复制为 tmp_path 下的检查清单并用模拟的Word打开，返回 (路径, Word文档)"""
+    def open_with(backend):
+        path = tmp_path / 'checklist.docx'
+        path.write_bytes((TEMPLATES_DIR / 'general_template.docx').read_bytes())
+        return path, backend.dispatch().Documents.Open(str(path))
+    return open_with
@@ -0,0 +1,55 @@
+import json
+import shutil
+from pathlib import Path
+import pytest
+from src.cli import EXIT_JOBS_FAILED, EXIT_OK, main
+from src.config.config_manager import config_manager
+
+TEMPLATES_DIR = Path(__file__).parent.parent / 'templates'
+
+
+def _prepare(tmp_path, monkeypatch, tasks):
+    job_folder = tmp_path / 'base' / '2025' / '250100032HZH_Project'
+    (job_folder / '1 Application documents').mkdir(parents=True)
+    (job_folder / '1 Application documents' / 'app form.pdf').write_bytes(b'pdf')
+    shutil.copy(TEMPLATES_DIR / 'general_template.docx', job_folder / 'E-filing checklist.docx')
+    # 命令行会在内存中覆盖团队配置，测试结束后恢复
+    monkeypatch.setitem(config_manager.get_user_config(), 'team', config_manager.get_team())
+    monkeypatch.setattr('src.cli.read_tasks_from_excel', lambda path, task_list_map: tasks)
+    return job_folder
+
+
+def _task(job_no):
+    return {'job_no': job_no, 'job_creator': 'creator', 'engineers': 'engineer'}
+
+
+@pytest.mark.usefixtures('workspace')
+def test_cli_run_writes_report(tmp_path, monkeypatch):
+    _prepare(tmp_path, monkeypatch, [_task('250100032HZH')])
+    report_path = tmp_path / 'report.json'
+    exit_code = main(['run', '--tasks', 'list.xlsx', '--team', 'LUM', '--base-dir', str(tmp_path / 'base'),
+                      '--engine', 'docx', '--workers', '2', '--report', str(report_path)])
+    assert exit_code == EXIT_OK
+    report = json.loads(report_path.read_text(encoding='utf-8'))
+    assert report['summary'] == {'完成': 1}
+    assert report['timing']['filled_jobs'] == 1
+
+
+@pytest.mark.usefixtures('workspace')
+def test_cli_run_exit_code_when_jobs_unresolved(tmp_path, monkeypatch):
+    _prepare(tmp_path, monkeypatch, [_task('250100032HZH'), _task('250100099HZH')])
+    exit_code = main(['run', '--tasks', 'list.xlsx', '--team', 'LUM', '--base-dir', str(tmp_path / 'base'),
+                      '--engine', 'docx'])
+    assert exit_code == EXIT_JOBS_FAILED
+
+
+@pytest.mark.usefixtures('workspace')
+def test_cli_run_with_fill_processes(tmp_path, monkeypatch):
+    _prepare(tmp_path, monkeypatch, [_task('250100032HZH')])
+    report_path = tmp_path / 'report.json'
+    exit_code = main(['run', '--tasks', 'list.xlsx', '--team', 'LUM', '--base-dir', str(tmp_path / 'base'),
+                      '--engine', 'docx', '--processes', '2', '--report', str(report_path)])
+    assert exit_code == EXIT_OK
+    report = json.loads(report_path.read_text(encoding='utf-8'))
+    assert report['processes'] == 2
+    assert report['timing']['stages']['fill']['workers'] == 2
@@ -0,0 +1,61 @@
+import shutil
+from pathlib import Path
+import pytest
+from src.config.config_manager import config_manager
+from src.funcs.com_profiler import KIND_CALL, KIND_GET, KIND_SET, ComProfiler
+from src.funcs.word_automation import FakeWordBackend
+from src.funcs.word_processor import set_checklist
+
+TEMPLATES_DIR = Path(__file__).parent.parent / 'templates'
+
+
+def test_profiler_disabled_returns_original_object():
+    backend = FakeWordBackend()
+    word = backend.dispatch()
+    assert ComProfiler(enabled=False).wrap(word) is word
+
+
+def _toggle_option(word_doc):
+    shapes = word_doc.Tables[0].Cell(5, 3).Range.InlineShapes
+    if shapes.Count >= 2:
+        shapes[0].OLEFormat.Object.Value = False
+
+
+def test_profiler_groups_calls_by_site(tmp_path):
+    path = tmp_path / 'checklist.docx'
+    shutil.copy(TEMPLATES_DIR / 'general_template.docx', path)
+    profiler = ComProfiler(enabled=True)
+    backend = FakeWordBackend()
+    with profiler.job('250100032HZH'):
+        word = profiler.wrap(backend.dispatch())
+        word_doc = word.Documents.Open(str(path))
+        _toggle_option(word_doc)
+
+    summary = profiler.summary()
+    assert summary['checklists'] == 1
+    assert summary['calls'] == summary['calls_per_checklist'] == backend.total_calls - 1
+    rows = {(row['member'], row['kind']): row for row in summary['jobs'][0]['sites']}
+    assert rows[('Documents.Open', KIND_CALL)]['site'].startswith('test_com_profiler.test_profiler_groups_calls_by_site:')
+    assert rows[('Object.Value', KIND_SET)]['site'].startswith('test_com_profiler._toggle_option:')
+    assert rows[('InlineShapes.Count', KIND_GET)]['calls'] == 1
+
+
+@pytest.mark.usefixtures('workspace')
+def test_profiler_reports_word_fill_per_job(tmp_path, monkeypatch):
+    job_folder = tmp_path / '250100032HZH_Project'
+    job_folder.mkdir()
+    shutil.copy(TEMPLATES_DIR / 'general_template.docx', job_folder / 'E-filing checklist.docx')
+    backend = FakeWordBackend()
+    monkeypatch.setattr('src.funcs.word_automation._backend', backend)
+    profiler = ComProfiler(enabled=True, top_sites=100)
+    monkeypatch.setattr('src.funcs.word_processor.com_profiler', profiler)
+
+    task = {'job_no': '250100032HZH', 'job_creator': 'creator', 'engineers': 'engineer'}
+    set_checklist(task, str(job_folder), 'LUM', config_manager.get_subfolder_config('LUM'), engine='word')
+
+    summary = profiler.summary()
+    assert summary['checklists'] == 1
+    assert summary['jobs'][0]['job_no'] == '250100032HZH'
+    value_calls = sum(row['calls'] for row in summary['jobs'][0]['sites'] if row['member'] == 'Object.Value')
+    assert value_calls == backend.calls['OptionButton.Value']
+    assert summary['calls_per_checklist'] > 0
@@ -0,0 +1,85 @@
+import json
+import shutil
+from pathlib import Path
+from src.config import compiled_cache as compiled_cache_module
+from src.config.compiled_cache import CACHE_FILE_NAME, CompiledCache, file_hash
+from src.config.config_manager import ConfigManager, config_manager
+from src.funcs import word_processor
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def test_compiled_cache_round_trip_and_hash_mismatch(tmp_path):
+    cache = CompiledCache(tmp_path / CACHE_FILE_NAME)
+    cache.put('plan', {'system.json': 'a'}, {'value': 1})
+
+    reloaded = CompiledCache(tmp_path / CACHE_FILE_NAME)
+    assert reloaded.get('plan', {'system.json': 'a'}) == {'value': 1}
+    assert reloaded.get('plan', {'system.json': 'b'}) is None
+    assert reloaded.get('other', {'system.json': 'a'}) is None
+
+
+def test_compiled_cache_ignores_other_versions_and_corrupt_files(tmp_path, monkeypatch):
+    path = tmp_path / CACHE_FILE_NAME
+    CompiledCache(path).put('plan', {}, 1)
+    monkeypatch.setattr(compiled_cache_module, 'CACHE_VERSION', compiled_cache_module.CACHE_VERSION + 1)
+    assert CompiledCache(path).get('plan', {}) is None
+
+    path.write_bytes(b'not json')
+    assert CompiledCache(path).get('plan', {}) is None
+
+
+def test_file_hash_follows_content(tmp_path):
+    path = tmp_path / 'template.docx'
+    path.write_bytes(b'one')
+    first = file_hash(path)
+    path.write_bytes(b'two!')
+    assert file_hash(path) != first
+    assert file_hash(tmp_path / 'missing.docx') is None
+
+
+def test_config_manager_skips_validation_when_system_config_unchanged(tmp_path, monkeypatch):
+    shutil.copy(ROOT_DIR / 'system.json', tmp_path / 'system.json')
+    shutil.copy(ROOT_DIR / 'user.json', tmp_path / 'user.json')
+    first = ConfigManager(str(tmp_path))
+    assert (tmp_path / CACHE_FILE_NAME).exists()
+
+    def fail():
+        raise AssertionError("system.json 未变化时不应重新验证")
+
+    monkeypatch.setattr(ConfigManager, '_validate_system_config', lambda self: fail())
+    second = ConfigManager(str(tmp_path))
+    assert set(second.get_file_matchers()) == set(first.get_file_matchers())
+    assert second.get_file_matcher('JobSheet').match('250100032HZH Job Sheet.pdf')
+
+
+def test_fill_plan_loaded_from_disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_manager, 'compiled_cache', CompiledCache(tmp_path / CACHE_FILE_NAME))
+    monkeypatch.setattr(word_processor, '_fill_plan_cache', {})
+    sub_folder_config = config_manager.get_subfolder_config('LUM')
+    plan = word_processor.get_fill_plan('LUM', sub_folder_config)
+
+    # 新进程：内存中没有计划，从磁盘缓存读取，不重新编译
+    monkeypatch.setattr(config_manager, 'compiled_cache', CompiledCache(tmp_path / CACHE_FILE_NAME))
+    monkeypatch.setattr(word_processor, '_fill_plan_cache', {})
+    monkeypatch.setattr(word_processor, 'compile_fill_plan', lambda *args: (_ for _ in ()).throw(AssertionError()))
+    cached = word_processor.get_fill_plan('LUM', sub_folder_config)
+    assert cached.ops == plan.ops
+    assert cached.option_configs == plan.option_configs
+    assert cached.source is sub_folder_config
+    # 缓存文件为JSON，只保存普通数据
+    data = json.loads((tmp_path / CACHE_FILE_NAME).read_text(encoding='utf-8'))
+    assert any(section.startswith('fill_plan:LUM:') for section in data['entries'])
+
+
+def test_fill_plan_recompiled_when_sub_folder_config_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_manager, 'compiled_cache', CompiledCache(tmp_path / CACHE_FILE_NAME))
+    monkeypatch.setattr(word_processor, '_fill_plan_cache', {})
+    sub_folder_config = config_manager.get_subfolder_config('LUM')
+    word_processor.get_fill_plan('LUM', sub_folder_config)
+
+    changed = json.loads(json.dumps(sub_folder_config))
+    changed[0]['fields'] = {'job_no': {'indexes': [1, 2]}}
+    plan = word_processor.get_fill_plan('LUM', changed)
+    assert plan.source is changed
+    assert [op.field for op in plan.field_ops] == ['job_no']
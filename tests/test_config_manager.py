@@ -1,4 +1,4 @@
-from src.config.config_manager import ConfigManager
+from src.config.config_manager import ConfigManager, FileMatcher
 
 
 def test_config_init():
@@ -21,3 +21,22 @@ def test_base_dir_is_valid():
     base_dir = user_config.get('base_dir')
     assert base_dir is not None and isinstance(base_dir, str) and len(base_dir) > 0
 
+
+def test_file_matchers_compiled_from_file_map():
+    cfg_manager = ConfigManager()
+    file_matchers = cfg_manager.get_file_matchers()
+    assert set(file_matchers) == set(cfg_manager.get_file_map())
+
+    job_sheet = cfg_manager.get_file_matcher('JobSheet')
+    assert job_sheet.match('250100032HZH Job Sheet.pdf')
+    assert job_sheet.match('250100032hzh.PDF')
+    assert not job_sheet.match('250100032HZH.docx')
+    assert not job_sheet.match('.250100032HZH.pdf')
+
+
+def test_file_matcher_any_file_fast_path():
+    matcher = FileMatcher('Other', ['*.*', ''])
+    assert matcher.any_file
+    assert matcher.match('photo.JPG')
+    assert not matcher.match('README')
+    assert not FileMatcher('Certificate', ['*cer*.pdf', '*.*']).any_file
@@ -0,0 +1,135 @@
+import io
+import json
+import shutil
+import zipfile
+from pathlib import Path
+import pytest
+from src.config.config_manager import config_manager
+from src.funcs.docx_processor import DocxChecklist, _read_raw_member, scan_activex_positions_docx, set_checklist_docx
+
+ROOT_DIR = Path(__file__).parent.parent
+TEMPLATES_DIR = ROOT_DIR / 'templates'
+
+
+def test_docx_template_tables():
+    doc = DocxChecklist(str(TEMPLATES_DIR / 'general_template.docx'))
+    assert doc.table_count == 1
+    assert doc.row_count(0) == 30
+    assert doc.get_cell_text(0, 1, 1) == 'Job No.:'
+
+    ppt_doc = DocxChecklist(str(TEMPLATES_DIR / 'ppt_template.docx'))
+    assert ppt_doc.table_count == 2
+
+
+def test_docx_find_option_column_matches_activex_config():
+    doc = DocxChecklist(str(TEMPLATES_DIR / 'general_template.docx'))
+    assert doc.find_option_column(0, 5) == 3
+    assert doc.find_option_column(0, 9) == 5
+    assert doc.find_option_column(0, 13) == 4
+    assert doc.find_option_column(0, 1) is None
+
+
+def test_docx_set_text_and_option_roundtrip():
+    doc = DocxChecklist(str(TEMPLATES_DIR / 'general_template.docx'))
+    doc.set_cell_text(0, 1, 2, '250100032HZH & Co')
+    doc.set_option_cell(0, 5, 3, False)
+    doc.set_option_cell(0, 9, 5, True)
+
+    saved = DocxChecklist(doc.to_bytes())
+    assert saved.get_cell_text(0, 1, 2) == '250100032HZH & Co'
+    yes_button, no_button = saved.get_cell_controls(0, 5, 3)
+    assert saved.get_option_value(yes_button) is False
+    assert saved.get_option_value(no_button) is True
+    yes_button, no_button = saved.get_cell_controls(0, 9, 5)
+    assert saved.get_option_value(yes_button) is True
+    assert saved.get_option_value(no_button) is False
+
+
+def test_docx_add_cell_image(tmp_path):
+    image_path = tmp_path / 'sign.png'
+    image_path.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 32)
+
+    doc = DocxChecklist(str(TEMPLATES_DIR / 'general_template.docx'))
+    doc.set_cell_text(0, 2, 4, 'Alice')
+    doc.add_cell_image(0, 2, 4, str(image_path))
+    output = tmp_path / 'checklist.docx'
+    doc.save(str(output))
+
+    saved = DocxChecklist(str(output))
+    assert saved.get_cell_text(0, 2, 4) == 'Alice'
+    assert 'word/media/sign1.png' in saved._names
+
+
+def test_docx_same_image_shares_media_part(tmp_path):
+    image_data = b'\x89PNG\r\n\x1a\n' + b'\x00' * 32
+    doc = DocxChecklist(str(TEMPLATES_DIR / 'general_template.docx'))
+    doc.add_cell_image_data(0, 1, 4, image_data, 'png')
+    doc.add_cell_image_data(0, 2, 4, image_data, 'png')
+    output = tmp_path / 'checklist.docx'
+    doc.save(str(output))
+
+    saved = DocxChecklist(str(output))
+    assert [name for name in saved._names if name.startswith('word/media/sign')] == ['word/media/sign1.png']
+
+
+def test_scan_activex_positions_matches_activex_config():
+    activex_config = json.loads((ROOT_DIR / 'activex_config.json').read_text(encoding='utf-8'))
+    for template_name in ('general_template', 'ppt_template'):
+        positions = scan_activex_positions_docx(str(ROOT_DIR / 'templates' / f'{template_name}.docx'))
+        expected = {key: value for key, value in activex_config[template_name].items() if key.startswith('table_')}
+        assert positions == expected
+
+
+def test_scan_activex_positions_counts_merged_cells():
+    cell = '<w:tc><w:tcPr>{}</w:tcPr><w:p>{}</w:p></w:tc>'
+    control = '<w:r><w:object><w:control r:id="rId9"/></w:object></w:r>'
+    rows = [
+        cell.format('<w:gridSpan w:val="2"/>', '') + cell.format('<w:vMerge w:val="restart"/>', '') + cell.format('', control),
+        cell.format('<w:gridSpan w:val="2"/>', '') + cell.format('<w:vMerge/>', '') + cell.format('', control),
+    ]
+    document_xml = '<w:document><w:body><w:tbl>' + ''.join(f'<w:tr>{row}</w:tr>' for row in rows) + '</w:tbl></w:body></w:document>'
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w') as package:
+        package.writestr('word/document.xml', document_xml)
+
+    assert scan_activex_positions_docx(data.getvalue()) == {
+        'table_0': {'1': {'row': 1, 'column': 3}, '2': {'row': 2, 'column': 3}}
+    }
+
+
+def test_docx_save_copies_untouched_parts_without_recompression():
+    template = (TEMPLATES_DIR / 'general_template.docx').read_bytes()
+    doc = DocxChecklist(template)
+    doc.set_option_cell(0, 5, 3, False)
+    yes_button, no_button = doc.get_cell_controls(0, 5, 3)
+    saved = doc.to_bytes()
+
+    with zipfile.ZipFile(io.BytesIO(template)) as original, zipfile.ZipFile(io.BytesIO(saved)) as package:
+        assert package.testzip() is None
+        assert package.namelist() == original.namelist()
+        changed = {yes_button, no_button}
+        for info in original.infolist():
+            new_info = package.getinfo(info.filename)
+            if info.filename in changed:
+                continue
+            # 没有修改的部件（包括 document.xml）原样复制压缩数据
+            assert _read_raw_member(saved, new_info) == _read_raw_member(template, info)
+            assert (new_info.CRC, new_info.compress_size) == (info.CRC, info.compress_size)
+        assert package.read(no_button) != original.read(no_button)
+
+
+@pytest.mark.usefixtures('workspace')
+def test_set_checklist_docx_cover_mode_writes_from_template(tmp_path, monkeypatch):
+    job_folder = tmp_path / '250100032HZH_Project'
+    job_folder.mkdir()
+    (job_folder / 'E-filing checklist old.docx').write_bytes(b'old')
+    monkeypatch.setitem(config_manager.get_user_config(), 'checklist', 'cover')
+    monkeypatch.setitem(config_manager.get_user_config(), 'team', 'LUM')
+    monkeypatch.setattr('src.funcs.template_store.template_store._templates', {})
+
+    task = {'job_no': '250100032HZH', 'job_creator': 'creator', 'engineers': 'engineer'}
+    set_checklist_docx(task, str(job_folder), 'LUM', config_manager.get_subfolder_config('LUM'))
+
+    assert [path.name for path in job_folder.iterdir()] == ['E-filing checklist.docx']
+    saved = DocxChecklist(str(job_folder / 'E-filing checklist.docx'))
+    assert saved.get_cell_text(0, 1, 2) == '250100032HZH'
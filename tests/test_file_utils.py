@@ -1,4 +1,5 @@
 import os
+from src.data.folder_status_cache import FolderStatusCache
 from src.funcs.file_utils import detect_folder_has_file, detect_folders_status, folder_name_check
 from src.funcs.path_resolver import get_working_folder_path_for_general
 
@@ -72,4 +73,49 @@ def test_detect_folders_status():
     assert status["1 Application documents\\Others service app"]is False
     assert status["1 Application documents\\other application documents"] is False
     assert status["2 Certificate"] is False
-    assert status["3 Test report"] is True
\ No newline at end of file
+    assert status["3 Test report"] is True
+
+
+def test_detect_folders_status_concurrent_matches_serial(tmp_path, monkeypatch):
+    (tmp_path / "0 Job sheet & Quotation").mkdir()
+    (tmp_path / "0 Job sheet & Quotation" / "250100032HZH.pdf").write_bytes(b"pdf")
+    (tmp_path / "2 Certificate").mkdir()
+    (tmp_path / "3 Test report" / "draft").mkdir(parents=True)
+    (tmp_path / "3 Test report" / "draft" / "report.docx").write_bytes(b"docx")
+    options_config = {
+        "0 Job sheet & Quotation": {"JobSheet": 5, "Quotation": 6},
+        "1 Application documents": {"GS": 9, "Unknown": 10},
+        "2 Certificate": 7,
+        "3 Test report": 8,
+    }
+
+    monkeypatch.setattr("src.funcs.file_utils.folder_status_cache", FolderStatusCache(str(tmp_path / "cache.db"), 0))
+    results = []
+    for max_workers in (1, 4):
+        scan_config = {"max_workers": max_workers, "max_workers_per_share": 2}
+        monkeypatch.setattr("src.funcs.file_utils.get_system_config", lambda key, default=None: scan_config)
+        results.append(detect_folders_status(str(tmp_path), "general", options_config))
+
+    assert results[0] == results[1]
+    assert list(results[1]) == list(options_config)
+    assert results[1]["0 Job sheet & Quotation"] == {"JobSheet": True, "Quotation": False}
+    assert results[1]["1 Application documents"] == {"GS": False, "Unknown": False}
+    assert results[1]["2 Certificate"] is False
+    assert results[1]["3 Test report"] is True
+
+
+def test_get_working_folder_path_for_general_index_refresh(tmp_path):
+    year_folder = tmp_path / "2025"
+    (year_folder / "250100032HZH_Shangyu Shunhe_Luminaire_ETL").mkdir(parents=True)
+    (year_folder / "250100033HZH_Other").mkdir()
+    (year_folder / "250100032HZH.txt").write_bytes(b"")
+
+    assert get_working_folder_path_for_general(str(tmp_path), "250100032HZH") == \
+        str(year_folder / "250100032HZH_Shangyu Shunhe_Luminaire_ETL")
+    assert get_working_folder_path_for_general(str(tmp_path), "250100034HZH") is None
+
+    # 年份文件夹修改时间变化后重新建立索引
+    (year_folder / "250100034HZH_New").mkdir()
+    os.utime(year_folder, ns=(0, 0))
+    assert get_working_folder_path_for_general(str(tmp_path), "250100034HZH") == str(year_folder / "250100034HZH_New")
+    assert get_working_folder_path_for_general(str(tmp_path / "missing"), "250100032HZH") is None
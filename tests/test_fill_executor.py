@@ -0,0 +1,35 @@
+import pickle
+import shutil
+from pathlib import Path
+import pytest
+from src.funcs.fill_executor import FillExecutor, build_fill_job, run_fill_job
+from src.funcs.task_utils import STATUS_COMPLETED, STATUS_FAILED
+
+TEMPLATES_DIR = Path(__file__).parent.parent / 'templates'
+
+
+def test_fill_job_is_picklable(tmp_path, make_resolved):
+    job = build_fill_job(make_resolved(tmp_path), 'LUM', 'docx')
+    assert 'snapshot' not in job
+    assert pickle.loads(pickle.dumps(job)) == job
+
+
+def test_run_fill_job_reports_errors(tmp_path, make_resolved):
+    outcome = run_fill_job(build_fill_job(make_resolved(tmp_path / 'missing'), 'LUM', 'docx'))
+    assert outcome['status'] == STATUS_FAILED
+    assert outcome['error']
+
+
+@pytest.mark.usefixtures('workspace')
+def test_fill_executor_fills_in_worker_processes(tmp_path, make_resolved):
+    resolved_tasks = []
+    for job_no in ('250100032HZH', '250100033HZH'):
+        job_folder = tmp_path / f'{job_no}_Project'
+        job_folder.mkdir()
+        shutil.copy(TEMPLATES_DIR / 'general_template.docx', job_folder / 'E-filing checklist.docx')
+        resolved_tasks.append(make_resolved(job_folder, job_no))
+
+    with FillExecutor(2, 'docx') as executor:
+        results = [executor.fill(resolved, 'LUM') for resolved in resolved_tasks]
+
+    assert [result['status'] for result in results] == [STATUS_COMPLETED, STATUS_COMPLETED]
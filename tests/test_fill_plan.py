@@ -0,0 +1,57 @@
+import pytest
+from src.config.config_manager import config_manager
+from src.funcs.fill_plan import OP_DATE, OP_IMAGE, OP_OPTION, OP_TEXT, CellOp, FillPlanError, compile_fill_plan
+from src.funcs.word_processor import get_fill_plan
+
+
+def test_compile_fill_plan_flattens_fields_and_options():
+    sub_folder_config = [{
+        'fields': {
+            'job_no': {'type': 'text', 'indexes': [1, 2]},
+            'date': {'type': 'date', 'indexes': [2, 2]},
+            'engineers': [{'type': 'text', 'indexes': [1, 4]}, {'type': 'image', 'indexes': [1, 4]}]
+        },
+        'options': {'1 Application documents': {'GS': 9, 'CB': 7}}
+    }]
+    template_config = {'table_0': {'7': {'row': 7, 'column': 3}}}
+
+    plan = compile_fill_plan('LUM', sub_folder_config, 'general_template', template_config)
+
+    assert plan.ops == (
+        CellOp(0, 1, 2, OP_TEXT, 'job_no'),
+        CellOp(0, 2, 2, OP_DATE, 'date'),
+        CellOp(0, 1, 4, OP_TEXT, 'engineers'),
+        CellOp(0, 1, 4, OP_IMAGE, 'engineers'),
+        CellOp(0, 7, 3, OP_OPTION, folder='1 Application documents', key='CB'),
+        CellOp(0, 9, None, OP_OPTION, folder='1 Application documents', key='GS'),
+    )
+    assert plan.table_count == 1
+    assert plan.option_value(plan.ops[4], {'1 Application documents': {'GS': False, 'CB': True}}) is True
+    assert plan.option_value(plan.ops[4], {}) is None
+
+
+def test_compile_fill_plan_ppt_options_map_to_rows():
+    plan = compile_fill_plan('PPT', [{'options': {'Photo': 14, 'App': 4}}], 'ppt_template')
+    assert [(op.row, op.folder, op.key) for op in plan.option_ops] == [(4, 'App', None), (14, 'Photo', None)]
+    assert plan.option_value(plan.option_ops[0], {'App': False}) is False
+
+
+def test_compile_fill_plan_reports_all_errors():
+    sub_folder_config = [{
+        'fields': {'job_no': {'type': 'text', 'indexes': [1]}},
+        'options': {'0 Job sheet & Quotation': {'JobSheet': 'five'}, '1 Application documents': 9}
+    }]
+    with pytest.raises(FillPlanError) as error:
+        compile_fill_plan('LUM', sub_folder_config, 'general_template')
+    message = str(error.value)
+    assert 'job_no' in message and 'JobSheet' in message and '1 Application documents' in message
+
+
+def test_get_fill_plan_compiles_once_per_team(monkeypatch):
+    # 其他测试可能在没有 activex_config.json 的目录中编译过计划
+    monkeypatch.setattr('src.funcs.word_processor._fill_plan_cache', {})
+    sub_folder_config = config_manager.get_subfolder_config('LUM')
+    plan = get_fill_plan('LUM', sub_folder_config)
+    assert get_fill_plan('LUM', sub_folder_config) is plan
+    assert all(op.col is not None for op in plan.option_ops)
+    assert get_fill_plan('LUM', sub_folder_config, use_config=False) is not plan
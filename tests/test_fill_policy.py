@@ -0,0 +1,124 @@
+import shutil
+import zipfile
+from pathlib import Path
+import pytest
+from src.config.config_manager import config_manager
+from src.funcs.fill_plan import FillPlanError
+from src.funcs.fill_policy import (FAILURE_CONFIG, FAILURE_CORRUPT, FAILURE_MISSING_TEMPLATE, FAILURE_OTHER,
+                                   FAILURE_PERMISSION, FAILURE_TRANSIENT, ComCircuitBreaker, ComCircuitOpenError,
+                                   CorruptChecklistError, classify_fill_error)
+from src.funcs.word_automation import FakeComError, FakeWordBackend
+from src.funcs.word_processor import set_checklist
+
+TEMPLATES_DIR = Path(__file__).parent.parent / 'templates'
+TASK = {'job_no': '250100032HZH', 'job_creator': 'creator', 'engineers': 'engineer'}
+
+
+class com_error(Exception):
+    """与 pywintypes.com_error 相同的参数格式"""
+
+
+def test_classify_fill_error():
+    assert classify_fill_error(PermissionError("你没有写入权限")) == FAILURE_PERMISSION
+    assert classify_fill_error(Exception("Access is denied.")) == FAILURE_PERMISSION
+    assert classify_fill_error(FileNotFoundError("template")) == FAILURE_MISSING_TEMPLATE
+    assert classify_fill_error(CorruptChecklistError("文档中没有找到表格")) == FAILURE_CORRUPT
+    assert classify_fill_error(zipfile.BadZipFile("File is not a zip file")) == FAILURE_CORRUPT
+    assert classify_fill_error(FakeComError("Word无法打开文档: a.docx")) == FAILURE_CORRUPT
+    assert classify_fill_error(FillPlanError("bad config")) == FAILURE_CONFIG
+    assert classify_fill_error(FakeComError("The RPC server is unavailable.")) == FAILURE_TRANSIENT
+    assert classify_fill_error(com_error(-2147418111, 'Call was rejected by callee.', None, None)) == FAILURE_TRANSIENT
+    opened = com_error(-2147352567, 'Exception occurred.',
+                       (0, 'Microsoft Word', 'Word experienced an error trying to open the file.', None, 0, -2146822494), None)
+    assert classify_fill_error(opened) == FAILURE_CORRUPT
+    assert classify_fill_error(KeyError('x')) == FAILURE_OTHER
+
+
+def test_circuit_breaker_opens_after_consecutive_failures(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('src.funcs.fill_policy.time.monotonic', lambda: now[0])
+    breaker = ComCircuitBreaker(threshold=2, cooldown=30)
+    assert breaker.record_failure() is False
+    breaker.record_success()
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is True
+    assert breaker.is_open and not breaker.allow()
+    # 冷却结束后允许一次尝试，仍然失败时重新打开
+    now[0] += 31
+    assert breaker.allow()
+    assert breaker.record_failure() is True
+    assert not breaker.allow()
+    now[0] += 31
+    breaker.record_success()
+    assert breaker.allow() and breaker.failures == 0
+
+
+class UnavailableWordBackend(FakeWordBackend):
+    """Word始终无响应"""
+
+    def dispatch(self):
+        self.record('Application.Dispatch')
+        raise FakeComError("The RPC server is unavailable.")
+
+
+def _prepare(monkeypatch, backend, breaker):
+    monkeypatch.setattr('src.funcs.word_automation._backend', backend)
+    monkeypatch.setattr('src.funcs.word_processor.com_circuit_breaker', breaker)
+    monkeypatch.setattr('src.funcs.word_processor.get_retry_delay', lambda retry: 0)
+    monkeypatch.setattr('src.funcs.word_processor.get_max_retries', lambda: 2)
+
+
+def _job_folder(tmp_path, name, data=None):
+    job_folder = tmp_path / name
+    job_folder.mkdir()
+    path = job_folder / 'E-filing checklist.docx'
+    if data is None:
+        shutil.copy(TEMPLATES_DIR / 'general_template.docx', path)
+    else:
+        path.write_bytes(data)
+    return job_folder
+
+
+@pytest.mark.usefixtures('workspace')
+def test_transient_failures_retry_bounded_then_downgrade(tmp_path, monkeypatch):
+    backend = UnavailableWordBackend()
+    breaker = ComCircuitBreaker(threshold=5, cooldown=60)
+    _prepare(monkeypatch, backend, breaker)
+    sub_folder_config = config_manager.get_subfolder_config('LUM')
+
+    with pytest.raises(FakeComError):
+        set_checklist(dict(TASK), str(_job_folder(tmp_path, 'a')), 'LUM', sub_folder_config, engine='word')
+    # 首次尝试加2次重试，不回退到原方法
+    assert backend.calls['Application.Dispatch'] == 3
+    assert breaker.failures == 3
+
+    # 再失败2次后熔断，不再重试
+    with pytest.raises(FakeComError):
+        set_checklist(dict(TASK), str(_job_folder(tmp_path, 'b')), 'LUM', sub_folder_config, engine='word')
+    assert backend.calls['Application.Dispatch'] == 5
+    assert breaker.is_open
+
+    # 熔断期间改用docx引擎填写
+    job_folder = _job_folder(tmp_path, 'c')
+    set_checklist(dict(TASK), str(job_folder), 'LUM', sub_folder_config, engine='word')
+    assert backend.calls['Application.Dispatch'] == 5
+
+    # 不降级时直接失败
+    monkeypatch.setattr('src.funcs.word_processor.get_downgrade_engine', lambda: None)
+    with pytest.raises(ComCircuitOpenError):
+        set_checklist(dict(TASK), str(_job_folder(tmp_path, 'd')), 'LUM', sub_folder_config, engine='word')
+    assert backend.calls['Application.Dispatch'] == 5
+
+
+@pytest.mark.usefixtures('workspace')
+def test_corrupt_document_fails_without_retry(tmp_path, monkeypatch):
+    backend = FakeWordBackend()
+    breaker = ComCircuitBreaker(threshold=3, cooldown=60)
+    _prepare(monkeypatch, backend, breaker)
+    job_folder = _job_folder(tmp_path, 'broken', b'not a docx')
+
+    with pytest.raises(FakeComError):
+        set_checklist(dict(TASK), str(job_folder), 'LUM', config_manager.get_subfolder_config('LUM'), engine='word')
+    # 文档损坏不重试也不回退到原方法，不计入熔断
+    assert backend.calls['Documents.Open'] == 1
+    assert breaker.failures == 0
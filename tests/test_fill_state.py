@@ -0,0 +1,52 @@
+import os
+import shutil
+from pathlib import Path
+import pytest
+from src.config.config_manager import config_manager
+from src.data.fill_state_store import FillStateStore
+from src.funcs.fill_plan import compile_fill_plan
+from src.funcs.fill_state import compute_desired_state
+from src.funcs.task_utils import STATUS_COMPLETED, STATUS_UNCHANGED, fill_resolved_task, scan_resolved_task
+
+TEMPLATES_DIR = Path(__file__).parent.parent / 'templates'
+TASK = {'job_no': '250100032HZH', 'job_creator': 'creator', 'engineers': 'engineer'}
+
+
+def test_desired_state_depends_on_fields_and_folder_statuses():
+    sub_folder_config = config_manager.get_subfolder_config('LUM')
+    plan = compile_fill_plan('LUM', sub_folder_config, 'general_template')
+    folder_statuses = [{'0 Job sheet & Quotation': {'JobSheet': True, 'Quotation': False}}]
+    state_hash = compute_desired_state(TASK, plan, folder_statuses)
+
+    assert compute_desired_state(dict(TASK), plan, folder_statuses) == state_hash
+    assert compute_desired_state(dict(TASK, job_creator='other'), plan, folder_statuses) != state_hash
+    assert compute_desired_state(TASK, plan, [{'0 Job sheet & Quotation': {'JobSheet': False, 'Quotation': False}}]) != state_hash
+
+
+@pytest.mark.usefixtures('workspace')
+def test_fill_skips_unchanged_checklist(tmp_path, monkeypatch, make_resolved):
+    job_folder = tmp_path / 'base' / '250100032HZH_Project'
+    (job_folder / '0 Job sheet & Quotation').mkdir(parents=True)
+    checklist = job_folder / 'E-filing checklist.docx'
+    shutil.copy(TEMPLATES_DIR / 'general_template.docx', checklist)
+    monkeypatch.setattr('src.funcs.fill_state.fill_state_store', FillStateStore(str(tmp_path / 'fill_state.db')))
+    team = 'LUM'
+    sub_folder_config = config_manager.get_subfolder_config(team)
+
+    def fill(force=False):
+        resolved = make_resolved(job_folder)
+        assert scan_resolved_task(resolved, team, sub_folder_config)
+        return fill_resolved_task(resolved, team, sub_folder_config, 'docx', force=force)['status']
+
+    assert fill() == STATUS_COMPLETED
+    assert fill() == STATUS_UNCHANGED
+    assert fill(force=True) == STATUS_COMPLETED
+
+    # 检查清单在上次填写之后被修改时重新填写
+    stat = os.stat(checklist)
+    os.utime(checklist, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert fill() == STATUS_COMPLETED
+
+    # 子文件夹状态变化时重新填写
+    (job_folder / '0 Job sheet & Quotation' / '250100032HZH Job Sheet.pdf').write_bytes(b'pdf')
+    assert fill() == STATUS_COMPLETED
@@ -0,0 +1,77 @@
+import os
+from src.funcs.folder_snapshot import JobFolderSnapshot, is_ignored_file, scan_folder_has_file
+from src.config.config_manager import FileMatcher
+
+
+def _make_job_folder(root):
+    (root / '1 Application documents').mkdir()
+    (root / '1 Application documents' / 'form.pdf').write_bytes(b'pdf')
+    (root / '2 Test report' / 'draft').mkdir(parents=True)
+    (root / '3 Empty').mkdir()
+    (root / 'E-filing checklist.docx').write_bytes(b'docx')
+    (root / '~$E-filing checklist.docx').write_bytes(b'lock')
+    return root
+
+
+def test_snapshot_lists_each_directory_once(tmp_path):
+    snapshot = JobFolderSnapshot(_make_job_folder(tmp_path))
+    assert snapshot.exists()
+    assert snapshot.exists('1 Application documents')
+    assert not snapshot.exists('4 Missing')
+    assert snapshot.glob('1 Application documents', '*.pdf') == [
+        os.path.join(str(tmp_path), '1 Application documents', 'form.pdf')
+    ]
+    scandir_count = snapshot.scandir_count
+    snapshot.exists('1 Application documents')
+    snapshot.glob('1 Application documents', '*.*')
+    assert snapshot.scandir_count == scandir_count
+
+
+def test_snapshot_has_file(tmp_path):
+    snapshot = JobFolderSnapshot(_make_job_folder(tmp_path))
+    assert snapshot.has_file('1 Application documents') is True
+    assert snapshot.has_file('2 Test report') is False
+    assert snapshot.has_file('3 Empty') is False
+    assert snapshot.has_file('4 Missing') is False
+
+
+def test_snapshot_checklist_files_and_invalidate(tmp_path):
+    snapshot = JobFolderSnapshot(_make_job_folder(tmp_path))
+    assert snapshot.checklist_files() == [os.path.join(str(tmp_path), 'E-filing checklist.docx')]
+
+    os.remove(tmp_path / 'E-filing checklist.docx')
+    snapshot.invalidate()
+    assert snapshot.checklist_files() == []
+
+
+def test_snapshot_match_file_matcher(tmp_path):
+    snapshot = JobFolderSnapshot(_make_job_folder(tmp_path))
+    assert snapshot.match('1 Application documents', FileMatcher('App', ['*FORM*.pdf']))
+    assert not snapshot.match('1 Application documents', FileMatcher('App', ['*.doc*']))
+    assert not snapshot.match('4 Missing', FileMatcher('Other', ['*.*']))
+
+
+def test_scan_folder_has_file_ignores_lock_files(tmp_path):
+    (tmp_path / '~$report.docx').write_bytes(b'lock')
+    (tmp_path / 'Thumbs.db').write_bytes(b'thumbs')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'DESKTOP.INI').write_bytes(b'ini')
+    assert is_ignored_file('~$report.docx')
+    assert scan_folder_has_file(str(tmp_path)) is False
+
+    (tmp_path / 'sub' / 'photo.jpg').write_bytes(b'jpg')
+    assert scan_folder_has_file(str(tmp_path)) is True
+
+
+def test_scan_folder_has_file_limits(tmp_path):
+    deep = tmp_path / 'a' / 'b' / 'c'
+    deep.mkdir(parents=True)
+    (deep / 'photo.jpg').write_bytes(b'jpg')
+    assert scan_folder_has_file(str(tmp_path), max_depth=3) is True
+    assert scan_folder_has_file(str(tmp_path), max_depth=2) is False
+    # 达到目录项上限时没有查找完，视为有内容
+    assert scan_folder_has_file(str(tmp_path), max_depth=2, max_entries=2) is True
+    empty = tmp_path / 'empty'
+    empty.mkdir()
+    assert scan_folder_has_file(str(empty), max_entries=0) is False
+    assert scan_folder_has_file(str(tmp_path / 'missing')) is False
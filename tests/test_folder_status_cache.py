@@ -0,0 +1,98 @@
+import os
+from src.data.folder_status_cache import FolderStatusCache
+from src.funcs.file_utils import detect_folders_status
+from src.funcs.folder_snapshot import JobFolderSnapshot, ScanRecord, dir_mtime
+
+
+def _record(*dirs):
+    record = ScanRecord()
+    for dir_path in dirs:
+        record.add(dir_path, dir_mtime(dir_path))
+    return record
+
+
+def test_cache_revalidates_by_directory_mtime(tmp_path):
+    folder = tmp_path / 'job' / '2 Certificate'
+    folder.mkdir(parents=True)
+    cache = FolderStatusCache(str(tmp_path / 'cache.db'))
+    cache.put(str(folder), 'hash', _record(str(folder)), False)
+    assert cache.get(str(folder), 'hash') is False
+    assert cache.get(str(folder), 'other-hash') is None
+
+    (folder / 'cert.pdf').write_bytes(b'pdf')
+    os.utime(folder, ns=(0, 0))
+    assert cache.get(str(folder), 'hash') is None
+    cache.close()
+
+
+def test_cache_skips_truncated_scan_and_changes_during_scan(tmp_path):
+    folder = tmp_path / 'job' / '3 Test report'
+    (folder / 'sub').mkdir(parents=True)
+    (folder / 'sub' / 'report.docx').write_bytes(b'docx')
+    cache = FolderStatusCache(str(tmp_path / 'cache.db'))
+
+    record = ScanRecord()
+    snapshot = JobFolderSnapshot(str(tmp_path / 'job'))
+    assert snapshot.has_file('3 Test report', max_entries=1, record=record) is True
+    assert record.truncated
+    cache.put(str(folder), 'hash', record, True)
+    assert cache.count() == 0
+
+    # 修改时间在列出目录之前读取，检测期间目录被修改时之后的有效性检查能发现
+    record = _record(str(folder))
+    (folder / 'new.pdf').write_bytes(b'pdf')
+    os.utime(folder, ns=(10 ** 18, 10 ** 18))
+    cache.put(str(folder), 'hash', record, False)
+    assert cache.get(str(folder), 'hash') is None
+    cache.close()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = FolderStatusCache(str(tmp_path / 'cache.db'), max_entries=2)
+    for name in ('a', 'b'):
+        (tmp_path / name).mkdir()
+        cache.put(str(tmp_path / name), 'hash', _record(str(tmp_path / name)), True)
+    cache.get(str(tmp_path / 'a'), 'hash')
+    (tmp_path / 'c').mkdir()
+    cache.put(str(tmp_path / 'c'), 'hash', _record(str(tmp_path / 'c')), True)
+
+    assert cache.count() == 2
+    assert cache.get(str(tmp_path / 'b'), 'hash') is None
+    assert cache.get(str(tmp_path / 'a'), 'hash') is True
+
+    # 覆盖已有记录不增加记录数，也不会淘汰其他记录
+    cache.put(str(tmp_path / 'a'), 'hash', _record(str(tmp_path / 'a')), False)
+    assert cache.count() == 2
+    assert cache.get(str(tmp_path / 'c'), 'hash') is True
+    cache.close()
+
+    # 重新连接时从数据库统计记录数
+    reopened = FolderStatusCache(str(tmp_path / 'cache.db'), max_entries=2)
+    assert reopened.count() == 2
+    reopened.close()
+
+
+def test_detect_folders_status_uses_cache_unless_force_rescan(tmp_path, monkeypatch):
+    cache = FolderStatusCache(str(tmp_path / 'cache.db'))
+    monkeypatch.setattr('src.funcs.file_utils.folder_status_cache', cache)
+    job = tmp_path / 'job'
+    (job / '3 Test report').mkdir(parents=True)
+    (job / '3 Test report' / 'report.docx').write_bytes(b'docx')
+    options_config = {'3 Test report': 8}
+
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr('src.funcs.folder_snapshot.os.scandir', lambda path: listed.append(path) or scandir(path))
+
+    assert detect_folders_status(str(job), 'general', options_config) == {'3 Test report': True}
+    assert cache.count() == 1
+
+    listed.clear()
+    assert detect_folders_status(str(job), 'general', options_config) == {'3 Test report': True}
+    # 缓存有效时只列出项目根目录，不再列出子文件夹
+    assert listed == [str(job)]
+
+    listed.clear()
+    detect_folders_status(str(job), 'general', options_config, JobFolderSnapshot(str(job), force_rescan=True))
+    assert len(listed) == 2
+    cache.close()
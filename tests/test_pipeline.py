@@ -0,0 +1,63 @@
+import threading
+from src.config.config_manager import config_manager
+from src.funcs.pipeline import (STAGE_FILL, STAGE_PUBLISH, STAGE_RESOLVE, STAGE_SCAN, TaskPipeline,
+                                build_checklist_pipeline)
+from src.funcs.task_utils import STATUS_NOT_FOUND
+
+
+def test_pipeline_routes_items_and_reports_stats():
+    results = []
+    lock = threading.Lock()
+
+    def double(item, emit):
+        emit('publish', item * 2)
+
+    def publish(item, emit):
+        with lock:
+            results.append(item)
+
+    pipeline = TaskPipeline()
+    pipeline.add_stage('double', double, 3, ('publish',), 2)
+    pipeline.add_stage('publish', publish, 1, (), 2)
+    report = pipeline.run(range(20))
+
+    assert sorted(results) == [i * 2 for i in range(20)]
+    assert report['stages']['double']['processed'] == 20
+    assert report['stages']['publish']['processed'] == 20
+    assert report['stages']['double']['max_queue_depth'] <= 2
+
+
+def test_pipeline_cancel_drops_pending_items():
+    processed = []
+    pipeline = TaskPipeline()
+
+    def handle(item, emit):
+        processed.append(item)
+        pipeline.cancel()
+
+    pipeline.add_stage('handle', handle, 1, (), 1)
+    pipeline.run(range(10))
+    assert len(processed) < 10
+
+
+def test_checklist_pipeline_publishes_unresolved_tasks(tmp_path, monkeypatch):
+    (tmp_path / '2025' / '250100032HZH_Project').mkdir(parents=True)
+    monkeypatch.setitem(config_manager.get_user_config(), 'checklist', 'fill')
+    filled = []
+    monkeypatch.setattr('src.funcs.pipeline.fill_resolved_task',
+                        lambda resolved, team, sub_folder_config, engine, force: filled.append(resolved['task']['job_no']))
+    published = []
+    tasks = [{'job_no': job_no, 'job_creator': 'creator', 'engineers': 'engineer'}
+             for job_no in ('250100032HZH', '250100099HZH')]
+
+    pipeline = build_checklist_pipeline(str(tmp_path), 'LUM', config_manager.get_subfolder_config('LUM'),
+                                        published.append, engine='docx')
+    report = pipeline.run(tasks)
+
+    assert sorted(result['job_no'] for result in published) == ['250100032HZH', '250100099HZH']
+    assert [result['status'] for result in published if result['job_no'] == '250100099HZH'] == [STATUS_NOT_FOUND]
+    assert filled == ['250100032HZH']
+    assert report['stages'][STAGE_RESOLVE]['processed'] == 2
+    assert report['stages'][STAGE_SCAN]['processed'] == 1
+    assert report['stages'][STAGE_FILL]['processed'] == 1
+    assert report['stages'][STAGE_PUBLISH]['processed'] == 2
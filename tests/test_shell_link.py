@@ -0,0 +1,87 @@
+import struct
+import uuid
+from src.funcs.path_resolver import get_working_folder_path_for_ppt
+from src.funcs.shell_link import (HAS_LINK_INFO, HAS_LINK_TARGET_ID_LIST, HAS_RELATIVE_PATH, HAS_WORKING_DIR,
+                                  IS_UNICODE, ShellLinkError, parse_shell_link, read_shell_link)
+
+LINK_CLSID = uuid.UUID('00021401-0000-0000-c000-000000000046')
+
+
+def _header(link_flags):
+    return struct.pack('<I16sII', 0x4C, LINK_CLSID.bytes_le, link_flags, 0x10) + b'\x00' * (0x4C - 28)
+
+
+def _string_data(*values):
+    return b''.join(struct.pack('<H', len(value)) + value.encode('utf-16le') for value in values)
+
+
+def _local_link_info(base_path, suffix=''):
+    """带Unicode偏移的LinkInfo（VolumeIDAndLocalBasePath）"""
+    header_size = 0x24
+    volume_id = struct.pack('<IIII', 0x11, 3, 0x12345678, 0x10) + b'\x00'
+    ansi_base = base_path.encode('ascii', errors='replace') + b'\x00'
+    ansi_suffix = suffix.encode('ascii', errors='replace') + b'\x00'
+    unicode_base = base_path.encode('utf-16le') + b'\x00\x00'
+    unicode_suffix = suffix.encode('utf-16le') + b'\x00\x00'
+    volume_offset = header_size
+    base_offset = volume_offset + len(volume_id)
+    suffix_offset = base_offset + len(ansi_base)
+    unicode_base_offset = suffix_offset + len(ansi_suffix)
+    unicode_suffix_offset = unicode_base_offset + len(unicode_base)
+    body = volume_id + ansi_base + ansi_suffix + unicode_base + unicode_suffix
+    size = header_size + len(body)
+    return struct.pack('<9I', size, header_size, 0x1, volume_offset, base_offset, 0, suffix_offset,
+                       unicode_base_offset, unicode_suffix_offset) + body
+
+
+def _network_link_info(net_name, suffix):
+    """只有ANSI字段的LinkInfo（CommonNetworkRelativeLinkAndPathSuffix）"""
+    header_size = 0x1C
+    network = struct.pack('<5I', 0x14 + len(net_name) + 1, 0, 0x14, 0, 0x20000) + net_name.encode('ascii') + b'\x00'
+    network_offset = header_size
+    suffix_offset = network_offset + len(network)
+    body = network + suffix.encode('ascii') + b'\x00'
+    size = header_size + len(body)
+    return struct.pack('<7I', size, header_size, 0x2, 0, 0, network_offset, suffix_offset) + body
+
+
+def test_parse_shell_link_local_unicode_path():
+    id_list = struct.pack('<H', 4) + b'\x00' * 4
+    data = (_header(HAS_LINK_TARGET_ID_LIST | HAS_LINK_INFO | HAS_WORKING_DIR | IS_UNICODE) + id_list
+            + _local_link_info('D:\\PPT\\2025\\250100032HZH_测试项目') + _string_data('D:\\PPT\\2025'))
+    link_info = parse_shell_link(data)
+    assert link_info['target_path'] == 'D:\\PPT\\2025\\250100032HZH_测试项目'
+    assert link_info['working_dir'] == 'D:\\PPT\\2025'
+    assert link_info['has_id_list'] is True
+
+
+def test_parse_shell_link_network_path():
+    data = _header(HAS_LINK_INFO) + _network_link_info('\\\\server\\share', 'PPT\\250100032HZH')
+    assert parse_shell_link(data)['target_path'] == '\\\\server\\share\\PPT\\250100032HZH'
+
+
+def test_parse_shell_link_rejects_other_files():
+    try:
+        parse_shell_link(b'\x00' * 0x4C)
+    except ShellLinkError:
+        pass
+    else:
+        assert False, 'ShellLinkError expected'
+
+
+def test_read_shell_link_relative_path(tmp_path):
+    lnk_path = tmp_path / 'shortcuts' / '250100032HZH.lnk'
+    lnk_path.parent.mkdir()
+    lnk_path.write_bytes(_header(HAS_RELATIVE_PATH | IS_UNICODE) + _string_data('..\\jobs\\250100032HZH'))
+    assert read_shell_link(str(lnk_path))['target_path'] == str(tmp_path / 'jobs' / '250100032HZH')
+
+
+def test_get_working_folder_path_for_ppt_uses_shortcut_index(tmp_path):
+    (tmp_path / '250100032hzh_Project.lnk').write_bytes(
+        _header(HAS_LINK_INFO | IS_UNICODE) + _local_link_info('D:\\PPT\\250100032HZH_Project'))
+    (tmp_path / '250100033HZH_Broken.lnk').write_bytes(b'broken')
+    (tmp_path / 'notes.txt').write_bytes(b'')
+
+    assert str(get_working_folder_path_for_ppt(str(tmp_path), '250100032HZH')) == 'D:\\PPT\\250100032HZH_Project'
+    assert get_working_folder_path_for_ppt(str(tmp_path), '250100033HZH') is None
+    assert get_working_folder_path_for_ppt(str(tmp_path), '250100034HZH') is None
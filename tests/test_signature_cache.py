@@ -0,0 +1,71 @@
+import io
+import os
+import pytest
+from src.funcs.signature_cache import SignatureCache
+
+JPEG_DATA = b'\xff\xd8\xff\xe0' + b'\x00' * 32
+
+
+def _touch_folder(folder, offset):
+    # 保证文件夹修改时间变化，不依赖文件系统的时间精度
+    stat = os.stat(folder)
+    os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset))
+
+
+def test_find_is_case_insensitive_and_prefers_jpg(tmp_path):
+    (tmp_path / 'Alice Wang.PNG').write_bytes(b'png')
+    (tmp_path / 'alice wang.jpg').write_bytes(JPEG_DATA)
+    (tmp_path / 'notes.txt').write_bytes(b'')
+    cache = SignatureCache(tmp_path)
+
+    assert cache.find(' ALICE WANG ') == str(tmp_path / 'alice wang.jpg')
+    assert cache.find('notes') is None
+    assert cache.find('') is None
+
+
+def test_index_refreshes_when_folder_changes(tmp_path):
+    cache = SignatureCache(tmp_path)
+    assert cache.find('bob') is None
+    (tmp_path / 'Bob.jpg').write_bytes(JPEG_DATA)
+    _touch_folder(tmp_path, 1000)
+    assert cache.find('bob') == str(tmp_path / 'Bob.jpg')
+
+
+def test_get_signature_falls_back_to_default_and_caches(tmp_path):
+    (tmp_path / 'default.jpg').write_bytes(JPEG_DATA)
+    cache = SignatureCache(tmp_path)
+
+    image = cache.get_signature('nobody')
+    assert image.source == str(tmp_path / 'default.jpg')
+    assert cache.get_signature('nobody') is image
+    assert cache.get_signature_file('nobody') == cache.get_signature_file('nobody')
+
+
+def test_signature_file_is_written_atomically(tmp_path, monkeypatch):
+    signs = tmp_path / 'signs'
+    signs.mkdir()
+    (signs / 'default.jpg').write_bytes(JPEG_DATA)
+    monkeypatch.setattr('src.funcs.signature_cache.tempfile.gettempdir', lambda: str(tmp_path))
+    cache = SignatureCache(signs)
+
+    path = cache.get_signature_file('nobody')
+    with open(path, 'rb') as f:
+        assert f.read() == cache.get_signature('nobody').data
+    # 只留下最终文件，没有残留的临时文件
+    assert os.listdir(tmp_path / 'checklist_signs') == [os.path.basename(path)]
+
+
+def test_get_signature_without_default_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SignatureCache(tmp_path).get_signature('nobody')
+
+
+def test_signature_is_prescaled_to_png(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    Image.new('RGB', (1200, 300), (255, 255, 255)).save(tmp_path / 'Carol.jpg', 'JPEG')
+    cache = SignatureCache(tmp_path, dpi=72)
+
+    image = cache.get_signature('carol', width=80, height=20)
+    assert image.extension == 'png'
+    with Image.open(io.BytesIO(image.data)) as scaled:
+        assert scaled.size == (80, 20)
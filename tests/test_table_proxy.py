@@ -0,0 +1,76 @@
+from src.funcs.docx_processor import DocxChecklist
+from src.funcs.fill_plan import OP_OPTION, CellOp
+from src.funcs.table_proxy import TableProxy, harvest_activex_controls
+from src.funcs.word_automation import FakeWordBackend
+from src.funcs.word_processor import get_cell_with_activeX_in_row, get_option_column_by_plan
+
+
+def test_table_proxy_caches_geometry_and_cells(open_checklist):
+    backend = FakeWordBackend()
+    path, word_doc = open_checklist(backend)
+    table = TableProxy(word_doc.Tables[0])
+    backend.reset_calls()
+    assert table.Rows.Count == 30
+    assert table.row_count == 30
+    table.Columns.Count
+    assert table.Cell(1, 1) is table.Cell(1, 1)
+    assert backend.calls['Table.Rows'] == 1
+    assert backend.calls['Table.Columns'] == 1
+    assert backend.calls['Table.Cell'] == 1
+
+    # 原有的按行查找函数使用代理的缓存
+    assert get_cell_with_activeX_in_row(table, 5) is table.Cell(5, 3)
+    calls = backend.total_calls
+    assert table.find_activex_column(5) == 3
+    assert backend.total_calls == calls
+
+
+def test_table_proxy_writes_only_changed_buttons(open_checklist):
+    backend = FakeWordBackend()
+    path, word_doc = open_checklist(backend)
+    table = TableProxy(word_doc.Tables[0])
+    table.set_option(5, 3, True)
+    backend.reset_calls()
+    # 按钮和当前值已缓存，值不变时不产生COM调用
+    assert table.set_option(5, 3, True) == 0
+    assert backend.total_calls == 0
+    # 值变化时每个按钮一次写入
+    assert table.set_option(5, 3, False) == 2
+    assert backend.total_calls == 2
+    assert backend.calls['OptionButton.Value'] == 2
+    word_doc.Save()
+
+    saved = DocxChecklist(str(path))
+    yes_button, no_button = saved.get_cell_controls(0, 5, 3)
+    assert (saved.get_option_value(yes_button), saved.get_option_value(no_button)) == (False, True)
+
+
+def test_harvest_activex_controls_builds_row_map(open_checklist):
+    backend = FakeWordBackend()
+    path, word_doc = open_checklist(backend)
+    table = TableProxy(word_doc.Tables[0])
+    backend.reset_calls()
+    count = harvest_activex_controls({0: table})
+    assert count == 52
+    assert table.harvested
+    # 每个控件读取一次行号、每行读取一次列号
+    assert backend.calls['Range.Information'] == count + 26
+    assert backend.calls['OptionButton.Value'] == count
+    assert table.find_activex_column(5) == 3
+    assert table.find_activex_column(1) is None
+
+    # 当前值已收集，填写时不再读取，只写入值不同的按钮（模板中该行选中"是"）
+    backend.reset_calls()
+    assert table.set_option(5, 3, True) == 0
+    assert table.set_option(5, 3, False) == 2
+    assert backend.total_calls == 2
+
+
+def test_plan_column_falls_back_to_harvested_column(open_checklist):
+    backend = FakeWordBackend()
+    path, word_doc = open_checklist(backend)
+    table = TableProxy(word_doc.Tables[0])
+    harvest_activex_controls({0: table})
+    # 配置的列与模板不一致时使用该行实际包含控件的列
+    op = CellOp(0, 5, 1, OP_OPTION, folder='folder')
+    assert get_option_column_by_plan(table, op) == 3
@@ -0,0 +1,22 @@
+from src.funcs.task_utils import STATUS_NOT_FOUND, STATUS_PRECHECK_FAILED, STATUS_RESOLVED, resolve_task
+
+
+def _task(job_no):
+    return {'job_no': job_no, 'job_creator': 'creator', 'engineers': 'engineer'}
+
+
+def test_resolve_task_statuses(tmp_path):
+    year_folder = tmp_path / '2025'
+    (year_folder / '250100032HZH_Project').mkdir(parents=True)
+    (year_folder / '250100033HZH_Project').mkdir()
+    # 多个检查清单时预检查失败
+    (year_folder / '250100033HZH_Project' / 'a checklist.docx').write_bytes(b'')
+    (year_folder / '250100033HZH_Project' / 'b checklist.docx').write_bytes(b'')
+    tasks = [_task('250100034HZH'), _task('250100032HZH'), _task('250100033HZH')]
+
+    resolved_tasks = [resolve_task(str(tmp_path), 'LUM', task) for task in tasks]
+
+    assert [resolved['result']['status'] for resolved in resolved_tasks] == \
+        [STATUS_NOT_FOUND, STATUS_RESOLVED, STATUS_PRECHECK_FAILED]
+    assert resolved_tasks[1]['snapshot'] is not None
+    assert resolved_tasks[1]['result']['target_path'] == str(year_folder / '250100032HZH_Project')
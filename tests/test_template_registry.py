@@ -0,0 +1,72 @@
+import json
+import shutil
+from pathlib import Path
+from src.config.compiled_cache import CompiledCache
+from src.config.config_manager import config_manager
+from src.funcs import word_processor
+from src.funcs.template_registry import (TEMPLATE_HASH_KEY, build_activex_map, check_activex_maps,
+                                         ensure_activex_map_current, is_activex_map_current)
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def _prepare(tmp_path, monkeypatch):
+    shutil.copytree(ROOT_DIR / 'templates', tmp_path / 'templates')
+    shutil.copy(ROOT_DIR / 'activex_config.json', tmp_path / 'activex_config.json')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_manager, 'compiled_cache', CompiledCache(tmp_path / 'compiled_cache.json'))
+    word_processor.reset_activex_config_cache()
+    return tmp_path / 'activex_config.json'
+
+
+def _mark_stale(config_path, template_name):
+    config = json.loads(config_path.read_text(encoding='utf-8'))
+    config[template_name][TEMPLATE_HASH_KEY] = 'stale'
+    config[template_name]['table_0'] = {'5': {'row': 5, 'column': 9}}
+    config_path.write_text(json.dumps(config), encoding='utf-8')
+
+
+def test_shipped_activex_maps_are_current(tmp_path, monkeypatch):
+    _prepare(tmp_path, monkeypatch)
+    assert check_activex_maps(regenerate=False) == {'general_template': True, 'ppt_template': True}
+
+
+def test_stale_map_is_regenerated_from_template(tmp_path, monkeypatch):
+    config_path = _prepare(tmp_path, monkeypatch)
+    _mark_stale(config_path, 'general_template')
+    assert not is_activex_map_current('general_template')
+
+    assert ensure_activex_map_current('general_template', regenerate=True)
+    config = json.loads(config_path.read_text(encoding='utf-8'))
+    assert config['general_template']['table_0']['5'] == {'row': 5, 'column': 3}
+    assert is_activex_map_current('general_template')
+    assert is_activex_map_current('ppt_template')
+
+
+def test_scan_script_writes_same_entry_as_registry(tmp_path, monkeypatch):
+    import scan_activex
+
+    config_path = _prepare(tmp_path, monkeypatch)
+    _mark_stale(config_path, 'general_template')
+    scan_activex.scan_specific_file(str(tmp_path / 'templates' / 'general_template.docx'))
+
+    config = json.loads(config_path.read_text(encoding='utf-8'))
+    assert config['general_template'] == build_activex_map('general_template')
+    assert config['general_template']['scanned_from'] == 'templates/general_template.docx'
+    assert is_activex_map_current('general_template')
+
+
+def test_stale_map_is_not_used_for_fill_plan(tmp_path, monkeypatch):
+    config_path = _prepare(tmp_path, monkeypatch)
+    _mark_stale(config_path, 'general_template')
+    monkeypatch.setitem(config_manager.get_system_config(), 'activex_map', {'auto_regenerate': False})
+
+    sub_folder_config = config_manager.get_subfolder_config('LUM')
+    plan = word_processor.get_fill_plan('LUM', sub_folder_config)
+    assert all(op.col is None for op in plan.option_ops)
+
+    # 过期配置下编译的计划不会当作使用位置配置的计划缓存，配置在程序外更新（scan_activex.py）后下一次调用即可使用
+    shutil.copy(ROOT_DIR / 'activex_config.json', config_path)
+    plan = word_processor.get_fill_plan('LUM', sub_folder_config)
+    assert any(op.col is not None for op in plan.option_ops)
+    word_processor.reset_activex_config_cache()
@@ -0,0 +1,73 @@
+import os
+import shutil
+from pathlib import Path
+import pytest
+from src.config.atomic_file import write_file_atomic
+from src.funcs.template_store import TemplateStore
+from src.funcs.word_processor import ChecklistTarget, publish_checklist
+
+TEMPLATES_DIR = Path(__file__).parent.parent / 'templates'
+
+
+def test_write_file_atomic_replaces_and_cleans_up(tmp_path):
+    path = tmp_path / 'E-filing checklist.docx'
+    path.write_bytes(b'old')
+    write_file_atomic(path, lambda f: f.write(b'new'))
+    assert path.read_bytes() == b'new'
+
+    def broken(f):
+        f.write(b'partial')
+        raise OSError('disk full')
+
+    with pytest.raises(OSError):
+        write_file_atomic(path, broken)
+    # 写入失败时原文件不变，也不留下临时文件
+    assert path.read_bytes() == b'new'
+    assert os.listdir(tmp_path) == ['E-filing checklist.docx']
+
+
+def test_template_store_reads_once_and_reloads_on_change(tmp_path, monkeypatch):
+    template_path = tmp_path / 'general_template.docx'
+    shutil.copy(TEMPLATES_DIR / 'general_template.docx', template_path)
+    store = TemplateStore()
+    data = store.get_bytes(template_path)
+
+    def fail_open(*args, **kwargs):
+        raise AssertionError('模板不应重复读取')
+
+    with monkeypatch.context() as m:
+        m.setattr('builtins.open', fail_open)
+        assert store.get_bytes(template_path) is data
+
+    stat = os.stat(template_path)
+    template_path.write_bytes(b'changed')
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert store.get_bytes(template_path) == b'changed'
+
+
+def test_template_store_documents_are_independent():
+    store = TemplateStore()
+    first = store.open_document(TEMPLATES_DIR / 'general_template.docx')
+    second = store.open_document(TEMPLATES_DIR / 'general_template.docx')
+    first.set_cell_text(0, 1, 2, '250100032HZH')
+    first.add_cell_image_data(0, 2, 4, b'\x89PNG\r\n\x1a\n' + b'\x00' * 32, 'png')
+
+    assert second.get_cell_text(0, 1, 2) == ''
+    assert second.to_bytes() == store.open_document(TEMPLATES_DIR / 'general_template.docx').to_bytes()
+
+
+def test_publish_checklist_keeps_old_checklist_until_new_one_is_written(tmp_path):
+    old_path = tmp_path / 'Old checklist.docx'
+    old_path.write_bytes(b'old')
+    target = ChecklistTarget(str(tmp_path / 'E-filing checklist.docx'), TEMPLATES_DIR / 'general_template.docx',
+                             str(old_path))
+
+    def broken(path):
+        raise OSError('network error')
+
+    with pytest.raises(OSError):
+        publish_checklist(target, broken)
+    assert old_path.read_bytes() == b'old'
+
+    publish_checklist(target, lambda path: write_file_atomic(path, lambda f: f.write(b'new')))
+    assert os.listdir(tmp_path) == ['E-filing checklist.docx']
@@ -0,0 +1,43 @@
+import time
+import pytest
+from src.funcs.docx_processor import DocxChecklist
+from src.funcs.word_automation import FakeComError, FakeWordBackend
+
+
+def test_fake_word_object_model_reads_and_writes_template(open_checklist):
+    backend = FakeWordBackend()
+    path, word_doc = open_checklist(backend)
+    assert word_doc.Tables.Count == 1
+    table = word_doc.Tables[0]
+    assert table.Rows.Count == 30
+    assert table.Cell(1, 1).Range.Text == 'Job No.:\r\x07'
+
+    table.Cell(1, 2).Range.Text = '250100032HZH'
+    shapes = table.Cell(5, 3).Range.InlineShapes
+    assert shapes.Count == 2
+    shapes[0].OLEFormat.Object.Value = False
+    shapes[1].OLEFormat.Object.Value = True
+    with pytest.raises(FakeComError):
+        table.Cell(99, 1)
+    word_doc.Save()
+    word_doc.Close()
+    with pytest.raises(FakeComError):
+        word_doc.Tables
+
+    saved = DocxChecklist(str(path))
+    assert saved.get_cell_text(0, 1, 2) == '250100032HZH'
+    yes_button, no_button = saved.get_cell_controls(0, 5, 3)
+    assert (saved.get_option_value(yes_button), saved.get_option_value(no_button)) == (False, True)
+    assert backend.calls['Table.Cell'] == 4
+    assert backend.calls['OptionButton.Value'] == 2
+
+
+def test_fake_word_latency_per_member(open_checklist):
+    backend = FakeWordBackend(latencies={'Cell': 0.01})
+    path, word_doc = open_checklist(backend)
+    table = word_doc.Tables[0]
+    start = time.perf_counter()
+    for row in range(1, 6):
+        table.Cell(row, 1)
+    assert time.perf_counter() - start >= 0.05
+    assert backend.calls['Table.Cell'] == 5
@@ -1,22 +1,54 @@
+import shutil
+from pathlib import Path
+import pytest
+from src.config.config_manager import config_manager
+from src.funcs.docx_processor import DocxChecklist
+from src.funcs.word_automation import FakeWordBackend
+from src.funcs.word_processor import load_activex_config, set_checklist
 
-from src.funcs.word_processor import get_cell_with_activeX_in_row,get_cell_with_activeX_by_config,load_activex_config
-import win32com.client as win32
-from contextlib import contextmanager
-import pythoncom
-@contextmanager
-def word_context(doc_path):
-    word = win32.Dispatch('Word.Application')
-    word.Visible = False
-    word_doc = word.Documents.Open(doc_path)
-    try:
-        yield word, word_doc
-    finally:
-        word_doc.Close(False)
-        word.Quit()
+TEMPLATES_DIR = Path(__file__).parent.parent / 'templates'
+TASK = {'job_no': '250100032HZH', 'job_creator': 'creator', 'engineers': 'engineer'}
 
 
 def test_activeX_config_okay():
     config=load_activex_config()
     general_config=config['general_template']
     assert general_config['table_0']["5"]["column"]==3
-    assert general_config['table_0']["5"]["row"]==5
\ No newline at end of file
+    assert general_config['table_0']["5"]["row"]==5
+
+
+def _prepare(tmp_path, name):
+    job_folder = tmp_path / name
+    (job_folder / '0 Job sheet & Quotation').mkdir(parents=True)
+    (job_folder / '0 Job sheet & Quotation' / '250100032HZH Job Sheet.pdf').write_bytes(b'pdf')
+    shutil.copy(TEMPLATES_DIR / 'general_template.docx', job_folder / 'E-filing checklist.docx')
+    return job_folder
+
+
+def _contents(path):
+    doc = DocxChecklist(str(path))
+    texts = [doc.get_cell_text(0, row, col) for row in range(1, doc.row_count(0) + 1)
+             for col in range(1, doc.cell_count(0, row) + 1)]
+    options = [doc.get_option_value(part) for row in range(1, doc.row_count(0) + 1)
+               for col in range(1, doc.cell_count(0, row) + 1) for part in doc.get_cell_controls(0, row, col)]
+    return texts, options
+
+
+@pytest.mark.usefixtures('workspace')
+def test_set_checklist_word_engine_with_fake_backend(tmp_path, monkeypatch):
+    backend = FakeWordBackend()
+    monkeypatch.setattr('src.funcs.word_automation._backend', backend)
+    sub_folder_config = config_manager.get_subfolder_config('LUM')
+
+    word_folder = _prepare(tmp_path, 'word')
+    set_checklist(dict(TASK), str(word_folder), 'LUM', sub_folder_config, engine='word')
+    docx_folder = _prepare(tmp_path, 'docx')
+    set_checklist(dict(TASK), str(docx_folder), 'LUM', sub_folder_config, engine='docx')
+
+    # Word引擎与docx引擎的填写结果一致
+    assert _contents(word_folder / 'E-filing checklist.docx') == _contents(docx_folder / 'E-filing checklist.docx')
+    assert backend.calls['Documents.Open'] == 1
+    assert backend.calls['Document.Save'] == 1
+    assert backend.calls['Application.Dispatch'] == 1
+    # COM调用次数的上限，填写流程增加COM调用时需要说明原因
+    assert backend.total_calls < 450